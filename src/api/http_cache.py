@@ -0,0 +1,194 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+
+# Browsers keep the body but must ask again before reusing it (the content behind the URL can change)
+REVALIDATE = "private, no-cache"
+# GridFS ids never point to different content, so photos can be reused without asking
+IMMUTABLE = "private, max-age=31536000, immutable"
+
+
+# Strong ETag for an opaque value (content hash, cache key or GridFS id)
+def make_etag(value) -> str:
+    return f'"{value}"'
+
+
+# Strong ETag from the bytes of a response body
+def content_etag(body: bytes) -> str:
+    return make_etag(hashlib.sha256(body).hexdigest()[:32])
+
+
+# HTTP-date (RFC 9110); naive datetimes are UTC (Mongo stores UTC and pymongo returns it without tzinfo)
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+# Validator and caching headers for a response
+def cache_headers(etag: str = None, last_modified: datetime = None, cache_control: str = REVALIDATE) -> dict:
+    headers = {"Cache-Control": cache_control}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str = None, last_modified: datetime = None) -> bool:
+    """
+    True when the client's copy is current: If-None-Match matches the ETag, or (only when no
+    If-None-Match was sent) the resource has not changed since If-Modified-Since.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have whole-second precision
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def not_modified_response(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+# Bytes sent per piece when streaming a file or a byte range
+STREAM_CHUNK_SIZE = 255 * 1024
+
+
+def parse_range(range_header: str, size: int):
+    """
+    (start, end) of a single "bytes=" range, end inclusive; None when the header should be
+    ignored (other units, several ranges, malformed). Raises ValueError when it cannot be satisfied.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, dash, last = spec.strip().partition("-")
+    if not dash or not (first or last) or (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+
+    if first:
+        start = int(first)
+        if start >= size:
+            raise ValueError(f"Range {range_header} not satisfiable for {size} bytes")
+        end = int(last) if last else size - 1
+        if end < start:
+            return None
+    else:
+        # Suffix range: the last N bytes
+        if int(last) == 0:
+            raise ValueError(f"Range {range_header} is empty")
+        if size == 0:
+            raise ValueError(f"Range {range_header} not satisfiable for an empty file")
+        start, end = max(0, size - int(last)), size - 1
+    return start, min(end, size - 1)
+
+
+# Yield a byte range of a GridFS file chunk by chunk (only these chunks are read)
+def iter_gridfs(grid_out, start: int = 0, end: int = None, on_complete=None):
+    end = grid_out.length - 1 if end is None else end
+    grid_out.seek(start)
+    remaining = end - start + 1
+    parts = [] if on_complete else None
+    while remaining > 0:
+        data = grid_out.read(min(STREAM_CHUNK_SIZE, remaining))
+        if not data:
+            break
+        remaining -= len(data)
+        if parts is not None:
+            parts.append(data)
+        yield data
+    if parts is not None and remaining == 0:
+        on_complete(b"".join(parts))
+
+
+def _iter_bytes(data: bytes, start: int, end: int):
+    for offset in range(start, end + 1, STREAM_CHUNK_SIZE):
+        yield data[offset:min(offset + STREAM_CHUNK_SIZE, end + 1)]
+
+
+def ranged_response(request: Request, size: int, read, media_type: str, headers: dict) -> Response:
+    """
+    Streaming response with Content-Length that serves a single Range request as 206 Partial Content.
+
+    read(start, end) returns an iterator over the bytes of that (inclusive) range. An If-Range that
+    does not match the ETag (or Last-Modified) in `headers` gets the full body, as RFC 9110 requires.
+    """
+    headers = {**headers, "Accept-Ranges": "bytes"}
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and if_range and if_range not in (headers.get("ETag"), headers.get("Last-Modified")):
+        range_header = None
+
+    byte_range = None
+    if range_header:
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        return StreamingResponse(read(0, size - 1), media_type=media_type,
+                                 headers={**headers, "Content-Length": str(size)})
+
+    start, end = byte_range
+    return StreamingResponse(read(start, end), status_code=206, media_type=media_type, headers={
+        **headers,
+        "Content-Length": str(end - start + 1),
+        "Content-Range": f"bytes {start}-{end}/{size}",
+    })
+
+
+# Ranged response for a body already in memory
+def bytes_response(request: Request, data: bytes, media_type: str, headers: dict) -> Response:
+    return ranged_response(request, len(data), lambda start, end: _iter_bytes(data, start, end), media_type, headers)
+
+
+# Ranged response streamed from a GridFS file; on_complete gets the bytes after a full download
+def gridfs_response(request: Request, grid_out, media_type: str, headers: dict, on_complete=None) -> Response:
+    def read(start, end):
+        full = start == 0 and end == grid_out.length - 1
+        return iter_gridfs(grid_out, start, end, on_complete if full else None)
+    return ranged_response(request, grid_out.length, read, media_type, headers)
+
+
+class StreamBuffer:
+    """
+    Write-only file object for producers like ZipFile: a streaming response takes out what was
+    written so far with take(), so only the piece being produced is held in memory.
+    """
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
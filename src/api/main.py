@@ -1,14 +1,17 @@
 import json
-import subprocess
 import sys
+import time
+import asyncio
 import tempfile
 from datetime import datetime, timedelta, timezone
 from io import BytesIO
 from pathlib import Path
 from typing import List
 import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from icecream import ic
-import shutil
 import jwt
 from dotenv import load_dotenv
 from argon2 import PasswordHasher
@@ -31,16 +34,42 @@ from collections import defaultdict
 from .logging_config import logger, log_requests_json
 from .auth_utils import create_access_token, get_current_user, get_current_user_no_redirect, require_role, log_action, get_client_ip, lookup_ip_with_db
 from .LatLngFinder import combined_largest_centers_and_plot 
+from .http_cache import (
+    make_etag, content_etag, cache_headers, is_not_modified, not_modified_response, IMMUTABLE,
+    bytes_response, gridfs_response, iter_gridfs, StreamBuffer, STREAM_CHUNK_SIZE
+)
+from .pdf_cache import (
+    photo_hash, get_cached_pdf, open_cached_pdf, SingleFlight, RenderLeases,
+    evict_pdf_cache, pdf_cache_usage, CacheJanitor, PDF_CACHE_MAX_MB, PDF_CACHE_MAX_AGE_DAYS, PDF_MEMORY_CACHE,
+    BackgroundRenders, PRERENDER_ON_UPLOAD, find_stale_pdf, PDF_STALE_WHILE_REVALIDATE, PDF_STALE_MAX_AGE_HOURS,
+    PDF_CACHE_EVICT_GRACE_SECONDS
+)
+from .photo_store import (
+    ensure_photo_indexes, store_photo_stream, publish_photos, discard_pending_photos, find_photos, is_sha256, backfill_photo_hashes, open_photo
+)
+from .upload_sessions import UploadSessions
+from .render_queue import (
+    RenderQueueWorker, RENDER_QUEUE_ENABLED, PRIORITY_INTERACTIVE, PRIORITY_BULK, PRIORITY_PRERENDER
+)
+from .mongo import (
+    client, db, uploads, users, audit_logs, known_locations, cached_pdfs, render_leases, export_jobs,
+    upload_sessions, upload_session_chunks, photo_aliases, fs
+)
+from .rendering import (
+    render_pool, render_queue, ensure_render_indexes, report_doc_cache_key, report_snapshot, render_and_cache_pdf,
+    process_render_job
+)
 
-import gridfs
 from bson.objectid import ObjectId
+from gridfs.errors import NoFile
 from fastapi import FastAPI, UploadFile, File, Form, Request, Response, Depends, HTTPException, status, BackgroundTasks, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, HTMLResponse, StreamingResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from pymongo import MongoClient
+from pymongo import ReturnDocument
 
 app = FastAPI()
 load_dotenv()
@@ -76,6 +105,7 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 sys.path.append(str(PROJECT_ROOT))
 
 from src.database.db_2 import get_report_entry
+from src.pdf.generate_pdf import plan_report_layout
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 STATIC_DIR = BASE_DIR / "web" / "static"
@@ -91,33 +121,6 @@ templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 # Ensure TEMP_DIR exists
 TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
-# -----------------------------
-# MongoDB Connection
-# -----------------------------
-# Environment variables from .env
-MONGO_USER = os.getenv("MONGO_USER", "")
-MONGO_PASSWORD = os.getenv("MONGO_PASSWORD", "")
-MONGO_HOST = os.getenv("MONGO_HOST", "mongo")
-MONGO_PORT = os.getenv("MONGO_PORT", "27017")
-MONGO_DB = os.getenv("MONGO_DB", "loto_pdf")
-
-# Build URI
-if MONGO_USER and MONGO_PASSWORD:
-    MONGO_URI = f"mongodb://{MONGO_USER}:{MONGO_PASSWORD}@{MONGO_HOST}:{MONGO_PORT}"
-else:
-    MONGO_URI = f"mongodb://{MONGO_HOST}:{MONGO_PORT}"
-
-client = MongoClient(MONGO_URI)
-db = client[MONGO_DB]
-
-# Collections
-uploads = db['reports']    # collection for metadata + JSON
-users = db['users']        # collection for users + metadata 
-audit_logs = db["audit_logs"]
-known_locations = db['known_locations']
-cached_pdfs = db['cached_pdfs']
-fs = gridfs.GridFS(db)     # GridFS for storing photos
-
 # JWT
 SECRET_KEY = os.getenv("SECRET_KEY")
 if not SECRET_KEY:
@@ -126,6 +129,127 @@ if not SECRET_KEY:
 # Hashing Passwords
 ph = PasswordHasher(time_cost=4, memory_cost=102400, parallelism=8, hash_len=32)
 
+# Concurrent requests for the same uncached PDF share one render (within this process, then across replicas)
+render_flights = SingleFlight()
+render_lease_manager = RenderLeases(render_leases)
+
+# One janitor pass: delete expired export ZIPs, then trim the PDF cache
+def run_cache_janitor() -> dict:
+    try:
+        expire_export_jobs()
+    except Exception as e:
+        print(f"Error expiring export jobs: {e}")
+    return evict_pdf_cache(
+        cached_pdfs, db["fs.files"], db["fs.chunks"], int(PDF_CACHE_MAX_MB * 1024 * 1024), PDF_CACHE_MAX_AGE_DAYS
+    )
+
+# Keeps cached PDFs within PDF_CACHE_MAX_MB (and PDF_CACHE_MAX_AGE_DAYS) and removes expired export ZIPs
+# from a background thread, and writes the access times of PDFs served from memory in bulk
+pdf_cache_janitor = CacheJanitor(
+    run_cache_janitor,
+    flush=lambda: PDF_MEMORY_CACHE.flush_access_times(cached_pdfs),
+)
+
+# Photos of one upload hashed, deduplicated and written to GridFS at the same time
+UPLOAD_PHOTO_WORKERS = int(os.getenv("UPLOAD_PHOTO_WORKERS", "4"))
+
+# Resumable uploads (UPLOAD_CHUNK_SIZE / UPLOAD_SESSION_TTL_HOURS / UPLOAD_SESSION_MAX_MB)
+upload_session_store = UploadSessions(upload_sessions, upload_session_chunks)
+
+# Reports fetched or rendered at the same time for one bulk download
+BULK_DOWNLOAD_WORKERS = int(os.getenv("BULK_DOWNLOAD_WORKERS", "4"))
+
+# Bulk ZIP export jobs (finished ZIPs are kept in GridFS for EXPORT_JOB_TTL_HOURS)
+EXPORT_JOB_WORKERS = int(os.getenv("EXPORT_JOB_WORKERS", "1"))
+EXPORT_JOB_TTL_HOURS = float(os.getenv("EXPORT_JOB_TTL_HOURS", "24"))
+EXPORT_JOB_STALE_SECONDS = float(os.getenv("EXPORT_JOB_STALE_SECONDS", "600"))    # running job without a heartbeat is taken over
+export_job_executor = ThreadPoolExecutor(max_workers=EXPORT_JOB_WORKERS, thread_name_prefix="export-job")
+export_job_worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+# Renders queued right after an upload or to revalidate a stale PDF
+# (PRERENDER_ON_UPLOAD / PRERENDER_WORKERS / PRERENDER_MAX_QUEUED)
+prerenders = BackgroundRenders()
+
+# RENDER_QUEUE_WORKERS threads of this process serve the render queue (when RENDER_QUEUE_ENABLED),
+# more render capacity can be added with `python -m src.api.render_worker`
+def handle_render_job(job: dict):
+    process_render_job(job)
+    # Let the janitor trim the cache if this PDF pushed it over budget
+    pdf_cache_janitor.trigger()
+
+render_queue_worker = RenderQueueWorker(render_queue, handle_render_job)
+
+@app.on_event("startup")
+def start_render_pool():
+    render_pool.start()
+
+@app.on_event("startup")
+def create_cache_indexes():
+    try:
+        ensure_render_indexes()
+        render_lease_manager.ensure_indexes()
+        upload_session_store.ensure_indexes()
+    except Exception as e:
+        print(f"DEBUG: Could not create cached_pdfs / render_leases / render_jobs / upload_sessions indexes: {e}")
+
+@app.on_event("shutdown")
+def stop_render_pool():
+    render_pool.shutdown()
+
+@app.on_event("startup")
+def start_pdf_cache_janitor():
+    pdf_cache_janitor.start()
+
+@app.on_event("shutdown")
+def stop_pdf_cache_janitor():
+    pdf_cache_janitor.stop()
+
+@app.on_event("shutdown")
+def stop_prerenders():
+    prerenders.shutdown()
+
+@app.on_event("startup")
+def prepare_photo_hashes():
+    # The unique hash index exists before the first upload is served
+    try:
+        ensure_photo_indexes(db["fs.files"])
+    except Exception as e:
+        print(f"DEBUG: Could not create the photo hash index: {e}")
+
+    # Photos stored before content hashing get their hash in the background (duplicates are merged)
+    def backfill():
+        try:
+            result = backfill_photo_hashes(fs, db["fs.files"], uploads, photo_aliases)
+            if any(result.values()):
+                print(f"DEBUG: Photo hash backfill: {result}")
+        except Exception as e:
+            print(f"DEBUG: Could not backfill photo hashes: {e}")
+
+    threading.Thread(target=backfill, name="photo-hash-backfill", daemon=True).start()
+
+@app.on_event("startup")
+def start_render_queue_worker():
+    if RENDER_QUEUE_ENABLED:
+        render_queue_worker.start()
+
+@app.on_event("shutdown")
+def stop_render_queue_worker():
+    render_queue_worker.stop()
+
+@app.on_event("startup")
+def resume_export_jobs():
+    # Jobs left queued or running by a restart are picked up again (and expired ZIPs removed)
+    try:
+        expire_export_jobs()
+        for job in export_jobs.find({"status": {"$in": ["queued", "running"]}}, {"_id": 1}):
+            export_job_executor.submit(run_export_job, job["_id"])
+    except Exception as e:
+        print(f"DEBUG: Could not resume export jobs: {e}")
+
+@app.on_event("shutdown")
+def stop_export_jobs():
+    export_job_executor.shutdown(wait=False, cancel_futures=True)
+
 # Get email and password from .env file
 sender_email = os.getenv("SENDER_EMAIL")
 sender_password = os.getenv("SENDER_PASSWORD")
@@ -177,56 +301,14 @@ def send_email_auto(to_email, subject, body):
         raise ValueError(f"Unknown APP_ENV value: {ENV}")
 
 # -----------------------------
-# Upload JSON + images
+# Insert a new report or update an existing one with its JSON and stored photos
+# (shared by every upload path; returns "insert" or "update")
 # -----------------------------
-@app.post("/upload/")
-async def upload_report(
-    request: Request,
-    username: str = Depends(get_current_user_no_redirect),
-    files: List[UploadFile] = File(...),
-    uploaded_by: str = Form("anonymous"),
-    tags: List[str] = Form([]),
-    notes: str = Form(""),
-    background_tasks: BackgroundTasks = None
-):
-    json_file = None
-    include_files = []
-
-    # Save uploaded files to temp folder
-    for file in files:
-        file_location = TEMP_DIR / file.filename
-        contents = await file.read()
-        with open(file_location, "wb") as f:
-            f.write(contents)
-        if file.filename.lower().endswith(".json"):
-            json_file = file_location
-        else:
-            include_files.append(file_location)
-
-    if not json_file:
-        return {"error": "No JSON file uploaded"}
-
-    # Load JSON
-    with open(json_file, "r", encoding="utf-8") as f:
-        json_data = json.load(f)
-
-    report_name = json_file.stem
-    now = datetime.now()
+def save_report(request: Request, username: dict, report_name: str, json_data: dict, photos_data: list,
+                tags: list, notes: str, background_tasks: BackgroundTasks) -> str:
+    now = datetime.now(timezone.utc)
     existing_report = uploads.find_one({"report_name": report_name})
 
-    # Process photos
-    photos_data = []
-    for path in include_files:
-        file_bytes = path.read_bytes()
-        duplicate = None
-        for file in fs.find({"filename": path.name}):
-            if file.read() == file_bytes:
-                duplicate = file
-                break
-        photo_id = duplicate._id if duplicate else fs.put(file_bytes, filename=path.name)
-        photos_data.append({"photo_name": path.name, "photo_id": photo_id})
-
-    # Insert or update report
     if existing_report:
         uploads.update_one(
             {"_id": existing_report["_id"]},
@@ -275,7 +357,345 @@ async def upload_report(
             background_tasks=background_tasks
         )
 
-    return {"report_name": report_name, "photos": [p["photo_name"] for p in photos_data]}
+    return "update" if existing_report else "insert"
+
+# -----------------------------
+# Warm the PDF cache so the first person to open the report does not wait for a cold render
+# -----------------------------
+def prerender_report(report_name: str) -> bool:
+    doc = uploads.find_one({"report_name": report_name})
+    return queue_background_render(doc, report_name, report_doc_cache_key(doc))
+
+# -----------------------------
+# Store uploaded photos: each one is streamed into GridFS chunk by chunk (off the event loop) and
+# hashed on the way; a photo already stored with the same content is reused, whatever its name.
+# Up to UPLOAD_PHOTO_WORKERS photos are processed at once.
+# Takes (file name, file object) pairs; returns (photo entry, reused, seconds) per file, in upload order.
+# With pending=True new photos stay private to the upload until publish_photos (see photo_store).
+# If a photo fails, the others are still waited for, then the new pending ones are deleted and the error raised.
+# -----------------------------
+async def store_uploaded_photos(files: list, pending: bool = False) -> list:
+    photo_slots = asyncio.Semaphore(UPLOAD_PHOTO_WORKERS)
+
+    async def store(filename: str, stream) -> tuple:
+        photo_name = Path(filename).name
+        async with photo_slots:
+            photo_started = time.perf_counter()
+            photo_id, sha256, reused = await run_in_threadpool(
+                store_photo_stream, fs, db["fs.files"], stream, photo_name, pending
+            )
+        photo = {"photo_name": photo_name, "photo_id": photo_id, "sha256": sha256}
+        return photo, reused, time.perf_counter() - photo_started
+
+    results = await asyncio.gather(*(store(filename, stream) for filename, stream in files), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        await discard_uploaded_photos([result for result in results if not isinstance(result, BaseException)])
+        raise errors[0]
+    return results
+
+# Delete the photos a failed upload stored that are still pending (published or reused ones may be in use)
+async def discard_uploaded_photos(results: list):
+    await run_in_threadpool(
+        discard_pending_photos, fs, db["fs.files"], [photo["photo_id"] for photo, reused, _ in results if not reused]
+    )
+
+# -----------------------------
+# Upload JSON + images
+# -----------------------------
+@app.post("/upload/")
+async def upload_report(
+    request: Request,
+    username: str = Depends(get_current_user_no_redirect),
+    files: List[UploadFile] = File(...),
+    uploaded_by: str = Form("anonymous"),
+    tags: List[str] = Form([]),
+    notes: str = Form(""),
+    prerender: bool = Form(PRERENDER_ON_UPLOAD),
+    background_tasks: BackgroundTasks = None
+):
+    # Milliseconds spent in each phase, returned for diagnostics
+    timings = {}
+    started = phase_started = time.perf_counter()
+
+    def end_phase(phase: str):
+        nonlocal phase_started
+        timings[phase] = round((time.perf_counter() - phase_started) * 1000, 1)
+        phase_started = time.perf_counter()
+
+    json_file = next((file for file in files if file.filename.lower().endswith(".json")), None)
+    include_files = [file for file in files if file is not json_file]
+
+    if not json_file:
+        return {"error": "No JSON file uploaded"}
+
+    # Load JSON (report files are small, it is parsed straight from memory)
+    json_data = json.loads(await json_file.read())
+
+    report_name = Path(json_file.filename).stem
+    end_phase("parse_json")
+
+    # Process photos (pending until the report is saved, so a failed upload leaves none behind)
+    results = await store_uploaded_photos([(file.filename, file.file) for file in include_files], pending=True)
+    end_phase("photos")
+    # Time spent on the photos one by one (compare with "photos" to see what concurrency saved)
+    timings["photos_sequential"] = round(sum(seconds for _, _, seconds in results) * 1000, 1)
+
+    # Insert or update report (once every photo is stored)
+    try:
+        photos_data = await run_in_threadpool(publish_photos, fs, db["fs.files"], [photo for photo, _, _ in results])
+        await run_in_threadpool(save_report, request, username, report_name, json_data, photos_data,
+                                tags, notes, background_tasks)
+    except Exception:
+        await discard_uploaded_photos(results)
+        raise
+    end_phase("save_report")
+
+    # Warm the PDF cache so the first person to open the report does not wait for a cold render
+    prerender_queued = prerender and await run_in_threadpool(prerender_report, report_name)
+    end_phase("prerender")
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+
+    return {
+        "report_name": report_name,
+        "photos": [p["photo_name"] for p in photos_data],
+        "photos_reused": sum(1 for _, reused, _ in results if reused),
+        "prerender_queued": prerender_queued,
+        "timings_ms": timings
+    }
+
+# -----------------------------
+# Delta upload, step 1: report JSON + photo content hashes (no photo bytes)
+# -----------------------------
+@app.post("/upload_manifest")
+async def upload_manifest(
+    request: Request,
+    data: dict,
+    username: str = Depends(get_current_user_no_redirect),
+    background_tasks: BackgroundTasks = None
+):
+    """
+    Save a report whose photos the server may already hold, so only new photos are transferred.
+
+    Request body:
+    {
+        "report_name": "report_1",
+        "json_data": {...},
+        "photos": [{"photo_name": "photo_1.jpg", "sha256": "<hex digest of the photo bytes>"}],
+        "tags": ["web"], "notes": "", "prerender": true
+    }
+
+    Photos whose content is not stored yet are returned in "missing" and nothing is saved; the
+    client sends those files to /upload_photos and posts the manifest again. Once no photo is
+    missing the report is inserted or updated like a regular /upload/.
+    """
+    report_name = data.get("report_name")
+    json_data = data.get("json_data")
+    photos = data.get("photos", [])
+    if not isinstance(report_name, str) or not report_name.strip() or not isinstance(json_data, dict):
+        return JSONResponse(status_code=400, content={"error": "'report_name' and 'json_data' are required"})
+    if not isinstance(photos, list) or not all(
+        isinstance(photo, dict) and isinstance(photo.get("photo_name"), str) and is_sha256(photo.get("sha256"))
+        for photo in photos
+    ):
+        return JSONResponse(status_code=400, content={"error": "'photos' must list a photo_name and sha256 per photo"})
+
+    stored = await run_in_threadpool(find_photos, db["fs.files"], [photo["sha256"].lower() for photo in photos])
+    photos_data, missing = [], []
+    for photo in photos:
+        photo_name, sha256 = Path(photo["photo_name"]).name, photo["sha256"].lower()
+        if sha256 in stored:
+            photos_data.append({"photo_name": photo_name, "photo_id": stored[sha256], "sha256": sha256})
+        else:
+            missing.append({"photo_name": photo_name, "sha256": sha256})
+
+    if missing:
+        return {"report_name": report_name, "committed": False, "missing": missing}
+
+    status = await run_in_threadpool(save_report, request, username, report_name, json_data, photos_data,
+                                     data.get("tags", []), data.get("notes", ""), background_tasks)
+    prerender_queued = bool(data.get("prerender", PRERENDER_ON_UPLOAD)) and \
+        await run_in_threadpool(prerender_report, report_name)
+
+    return {
+        "report_name": report_name,
+        "committed": True,
+        "status": status,
+        "missing": [],
+        "photos": [p["photo_name"] for p in photos_data],
+        "prerender_queued": prerender_queued
+    }
+
+# -----------------------------
+# Delta upload, step 2: the photos the manifest reported missing
+# -----------------------------
+@app.post("/upload_photos")
+async def upload_photos(
+    username: str = Depends(get_current_user_no_redirect),
+    files: List[UploadFile] = File(...)
+):
+    results = await store_uploaded_photos([(file.filename, file.file) for file in files])
+    return {
+        "photos": [
+            {"photo_name": photo["photo_name"], "sha256": photo["sha256"], "reused": reused}
+            for photo, reused, _ in results
+        ]
+    }
+
+# -----------------------------
+# Resumable upload: create a session for the report's files (JSON + photos)
+# -----------------------------
+@app.post("/upload_sessions")
+def create_upload_session(
+    data: dict,
+    username: str = Depends(get_current_user_no_redirect)
+):
+    """
+    Start a resumable upload. The files are then sent as numbered chunks of chunk_size bytes
+    (PUT /upload_sessions/{id}/files/{index}/chunks/{n}), in any order; after a dropped connection
+    GET /upload_sessions/{id} shows what was received so only the missing chunks are sent again.
+    POST /upload_sessions/{id}/commit saves the report like a regular /upload/.
+
+    Request body:
+    {
+        "files": [{"name": "report_1.json", "size": 2048}, {"name": "photo_1.jpg", "size": 3145728, "sha256": "..."}],
+        "tags": ["web"], "notes": "", "prerender": true
+    }
+    """
+    options = {
+        "tags": data.get("tags", []),
+        "notes": data.get("notes", ""),
+        "prerender": bool(data.get("prerender", PRERENDER_ON_UPLOAD)),
+    }
+    try:
+        session = upload_session_store.create(username["username"], data.get("files"), options)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    return JSONResponse(status_code=201, content=upload_session_store.session_json(session))
+
+
+# Received byte ranges and missing chunks of every file in the session
+@app.get("/upload_sessions/{session_id}")
+def upload_session_status(
+    session_id: str,
+    username: str = Depends(get_current_user_no_redirect)
+):
+    session = upload_session_store.get(session_id, username["username"])
+    if not session:
+        return JSONResponse(status_code=404, content={"error": f"Upload session '{session_id}' not found or expired"})
+    return upload_session_store.session_json(session)
+
+
+# One chunk of a file (request body = the chunk's bytes); chunks already received may be sent again
+@app.put("/upload_sessions/{session_id}/files/{file_index}/chunks/{n}")
+async def put_upload_chunk(
+    request: Request,
+    session_id: str,
+    file_index: int,
+    n: int,
+    username: str = Depends(get_current_user_no_redirect)
+):
+    session = await run_in_threadpool(upload_session_store.get, session_id, username["username"])
+    if not session or session["status"] != "open":
+        return JSONResponse(status_code=404, content={"error": f"Upload session '{session_id}' not found or expired"})
+
+    # The body is read only up to one byte past the chunk size, with or without a Content-Length
+    too_large = JSONResponse(status_code=413, content={"error": f"Chunks are at most {session['chunk_size']} bytes"})
+    if int(request.headers.get("content-length") or 0) > session["chunk_size"]:
+        return too_large
+    data = bytearray()
+    async for piece in request.stream():
+        data.extend(piece[:session["chunk_size"] + 1 - len(data)])
+        if len(data) > session["chunk_size"]:
+            return too_large
+    data = bytes(data)
+
+    try:
+        await run_in_threadpool(upload_session_store.put_chunk, session, file_index, n, data)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    return {"file_index": file_index, "n": n, "size": len(data)}
+
+
+# Save the report from the session's files (all chunks must have arrived)
+@app.post("/upload_sessions/{session_id}/commit")
+async def commit_upload_session(
+    request: Request,
+    session_id: str,
+    username: str = Depends(get_current_user_no_redirect),
+    background_tasks: BackgroundTasks = None
+):
+    session = await run_in_threadpool(upload_session_store.get, session_id, username["username"])
+    if not session:
+        return JSONResponse(status_code=404, content={"error": f"Upload session '{session_id}' not found or expired"})
+
+    progress = await run_in_threadpool(upload_session_store.progress, session)
+    if any(file["missing_chunks"] for file in progress):
+        return JSONResponse(status_code=409, content={
+            "error": "Upload is incomplete",
+            **upload_session_store.session_json(session),
+        })
+
+    session = await run_in_threadpool(upload_session_store.begin_commit, session)
+    if not session:
+        return JSONResponse(status_code=409, content={"error": "Upload session is already being committed"})
+
+    # Until the session is deleted any failure reopens it. Photos this commit stores stay pending (out of
+    # the hash index, so no other upload can reuse them) until the hashes are checked; a failure before
+    # they are published deletes them again
+    results = []
+    try:
+        json_file = next(file for file in session["files"] if file["name"].lower().endswith(".json"))
+        photo_files = [file for file in session["files"] if file is not json_file]
+
+        # Load JSON (small, read from its chunks into memory)
+        json_bytes = await run_in_threadpool(upload_session_store.open_file(session, json_file["index"]).read)
+        if json_file["sha256"] and photo_hash(json_bytes) != json_file["sha256"]:
+            raise ValueError(f"{json_file['name']} does not match its sha256")
+        json_data = json.loads(json_bytes)
+        report_name = Path(json_file["name"]).stem
+
+        # Photos are streamed from their chunks into GridFS, like a regular upload
+        results = await store_uploaded_photos(
+            [(file["name"], upload_session_store.open_file(session, file["index"])) for file in photo_files],
+            pending=True
+        )
+        for file, (photo, _, _) in zip(photo_files, results):
+            if file["sha256"] and photo["sha256"] != file["sha256"]:
+                raise ValueError(f"{file['name']} does not match its sha256")
+        photos_data = await run_in_threadpool(publish_photos, fs, db["fs.files"], [photo for photo, _, _ in results])
+
+        options = session["options"]
+        await run_in_threadpool(save_report, request, username, report_name, json_data, photos_data,
+                                options["tags"], options["notes"], background_tasks)
+        prerender_queued = options["prerender"] and await run_in_threadpool(prerender_report, report_name)
+        await run_in_threadpool(upload_session_store.delete, session)
+    except Exception as e:
+        await run_in_threadpool(upload_session_store.abort_commit, session)
+        await discard_uploaded_photos(results)
+        if isinstance(e, ValueError):
+            return JSONResponse(status_code=422, content={"error": str(e)})
+        raise
+
+    return {
+        "report_name": report_name,
+        "photos": [p["photo_name"] for p in photos_data],
+        "photos_reused": sum(1 for _, reused, _ in results if reused),
+        "prerender_queued": prerender_queued
+    }
+
+
+# Abandon a resumable upload and drop its chunks
+@app.delete("/upload_sessions/{session_id}")
+def delete_upload_session(
+    session_id: str,
+    username: str = Depends(get_current_user_no_redirect)
+):
+    session = upload_session_store.get(session_id, username["username"])
+    if not session:
+        return JSONResponse(status_code=404, content={"error": f"Upload session '{session_id}' not found or expired"})
+    upload_session_store.delete(session)
+    return {"message": f"Upload session {session_id} deleted"}
 
 # -----------------------------
 # Download PDF (streams PDF directly to client with caching)
@@ -291,94 +711,78 @@ def download_pdf(
     if not doc:
         return JSONResponse(status_code=404, content={"error": f"Report '{report_name}' not found"})
         
+    # The cache is keyed on the report content, so a re-upload with changes misses automatically
+    cache_key = report_doc_cache_key(doc, hash_missing=False)
+
+    # --- 0. CONDITIONAL REQUEST (client already has the PDF of this content) ---
+    # Only answered from photo hashes already stored; a report with unhashed photos (uploaded before
+    # hashing) gets them hashed once below and is sent in full
+    not_modified = cache_key is not None and is_not_modified(request, make_etag(cache_key), doc.get("last_modified"))
+    if cache_key is None:
+        cache_key = report_doc_cache_key(doc)
+    headers = {
+        "Content-Disposition": f"attachment; filename={report_name}.pdf",
+        **cache_headers(make_etag(cache_key), doc.get("last_modified")),
+    }
+    if not_modified:
+        log_action(
+            request=request, audit_logs_collection=audit_logs, known_locations_collection=known_locations,
+            username=username["username"], action="download_pdf_not_modified",
+            details={"report": report_name}, background_tasks=background_tasks
+        )
+        return not_modified_response(headers)
+
     # --- 1. CHECK CACHE (Cache Hit) ---
-    cached_doc = cached_pdfs.find_one({"report_name": report_name})
-    if cached_doc:
-        try:
-            # Retrieve PDF from GridFS
-            pdf_bytes = fs.get(cached_doc["gridfs_id"]).read()
+    # Hot PDFs come from memory, others are streamed from GridFS chunk by chunk (Range requests get 206)
+    cached = open_cached_pdf(cached_pdfs, fs, cache_key)
+    if cached is not None:
+        # Log cache hit
+        log_action(
+            request=request, audit_logs_collection=audit_logs, known_locations_collection=known_locations,
+            username=username["username"], action="download_pdf_cache_hit", 
+            details={"report": report_name}, background_tasks=background_tasks
+        )
+
+        print(f"DEBUG: Cache hit for {report_name}")
+        if isinstance(cached, bytes):
+            return bytes_response(request, cached, "application/pdf", headers)
+        # A fully streamed PDF is kept in memory for the next hit, unless it could never fit there
+        keep_in_memory = None
+        if cached.length <= PDF_MEMORY_CACHE.max_bytes:
+            keep_in_memory = lambda pdf_bytes: PDF_MEMORY_CACHE.put(cache_key, pdf_bytes)
+        return gridfs_response(request, cached, "application/pdf", headers, on_complete=keep_in_memory)
+
+    # --- 2. STALE WHILE REVALIDATE (report changed since its last render) ---
+    # Serve the report's last rendered PDF right away and re-render the current content in the background
+    if PDF_STALE_WHILE_REVALIDATE:
+        stale_doc = find_stale_pdf(cached_pdfs, report_name, PDF_STALE_MAX_AGE_HOURS)
+        stale = open_cached_pdf(cached_pdfs, fs, stale_doc["cache_key"]) if stale_doc else None
+        if stale is not None:
+            revalidating = queue_background_render(doc, report_name, cache_key)
 
-            # Log cache hit
             log_action(
                 request=request, audit_logs_collection=audit_logs, known_locations_collection=known_locations,
-                username=username["username"], action="download_pdf_cache_hit", 
-                details={"report": report_name}, background_tasks=background_tasks
+                username=username["username"], action="download_pdf_stale",
+                details={"report": report_name, "revalidating": revalidating}, background_tasks=background_tasks
             )
 
-            # Update timestamp in cache to keep it "fresh" and prevent deletion
-            cached_pdfs.update_one(
-                {"_id": cached_doc["_id"]},
-                {"$set": {"last_accessed": datetime.now(timezone.utc)}} # Use UTC for consistency
-            )
-
-            print(f"DEBUG: Cache hit for {report_name}")
-            return StreamingResponse(
-                BytesIO(pdf_bytes),
-                media_type="application/pdf",
-                headers={"Content-Disposition": f"attachment; filename={report_name}.pdf"}
-            )
-        except Exception as e:
-            # If GridFS retrieval fails, proceed to regenerate (Cache Miss path)
-            print(f"DEBUG: Cache retrieval failed for {report_name}: {e}. Regenerating.")
-            pass # continue to the generation path below
-
-    # --- 2. CACHE MISS / PDF GENERATION (Expensive operation) ---
+            print(f"DEBUG: Serving stale PDF for {report_name}")
+            stale_headers = {
+                **headers,
+                **cache_headers(make_etag(stale_doc["cache_key"]), stale_doc.get("created_at")),
+                "X-PDF-Stale": "true",
+                "Warning": '110 - "Response is Stale"',
+            }
+            if isinstance(stale, bytes):
+                return bytes_response(request, stale, "application/pdf", stale_headers)
+            return gridfs_response(request, stale, "application/pdf", stale_headers)
+
+    # --- 3. CACHE MISS / PDF GENERATION (Expensive operation) ---
     pdf_bytes = None
     
     try:
-        # ** Your existing PDF generation logic starts here **
-        
-        TEMP_DIR.mkdir(exist_ok=True) 
-
-        # Write JSON data
-        json_file_path = TEMP_DIR / f"{report_name}.json"
-        with open(json_file_path, "w", encoding="utf-8") as f:
-            json.dump(doc["json_data"], f, ensure_ascii=False, indent=2)
-
-        # Write photos
-        for photo in doc["photos"]:
-            photo_file_path = TEMP_DIR / photo["photo_name"]
-            with open(photo_file_path, "wb") as f:
-                f.write(fs.get(photo["photo_id"]).read())
-
-        # Generate PDF
-        pdf_file_path = TEMP_DIR / f"{report_name}.pdf"
-        subprocess.run(
-            ["python", str(PROCESS_DIR / "generate_pdf.py"), str(json_file_path)],
-            check=True
-        )
-
-        pdf_bytes = pdf_file_path.read_bytes() # Store the generated bytes
-
-        # Update last_generated timestamp on the main report document
-        uploads.update_one(
-            {"_id": doc["_id"]},
-            {"$set": {"last_generated": datetime.now()}}
-        )
-
-        # Clear TEMP_DIR (Your existing cleanup logic)
-        for item in TEMP_DIR.iterdir():
-            if item.is_file():
-                item.unlink()
-            elif item.is_dir():
-                shutil.rmtree(item)
-
-        # --- 3. CACHE UPDATE (After successful generation) ---
-        if pdf_bytes:
-            # Store the new PDF bytes in GridFS
-            gridfs_id = fs.put(pdf_bytes, filename=f"{report_name}.pdf", content_type="application/pdf")
-            
-            # Record the cache metadata
-            cached_pdfs.insert_one({
-                "report_name": report_name,
-                "gridfs_id": gridfs_id,
-                "created_at": datetime.now(timezone.utc),
-                "last_accessed": datetime.now(timezone.utc),
-            })
-            
-            # Schedule cache cleanup to run in the background
-            background_tasks.add_task(clean_pdf_cache, cached_pdfs, fs)
-
+        # Generate and cache the PDF (joins a render already running for the same content)
+        pdf_bytes = render_report_pdf(doc, report_name, cache_key)
 
         # Log successful generation and stream response
         log_action(
@@ -388,24 +792,9 @@ def download_pdf(
             background_tasks=background_tasks
         )
 
-        return StreamingResponse(
-            BytesIO(pdf_bytes),
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={report_name}.pdf"}
-        )
+        return bytes_response(request, pdf_bytes, "application/pdf", headers)
 
     # --- 4. ERROR HANDLING ---
-    except subprocess.CalledProcessError as e:
-        log_action(
-            request=request,
-            audit_logs_collection=audit_logs,
-            known_locations_collection=known_locations,
-            username=username["username"],
-            action="download_pdf",
-            details={"report": report_name, "status": "Failed", "message": e.stderr },
-            background_tasks=background_tasks
-        )
-        return JSONResponse(status_code=500, content={"error": "PDF generation failed.", "details": e.stderr})
     except Exception as e:
         import traceback
         log_action(
@@ -419,6 +808,40 @@ def download_pdf(
         )
         return JSONResponse(status_code=500, content={"error": "Unexpected error.", "details": traceback.format_exc()})
     
+# ---------------------------------------------------------
+# Render a report and store it in the PDF cache.
+# Only one render per cache key runs at a time; concurrent callers wait for it and get its bytes.
+# Requests in this process share a flight; across replicas the render goes through the render queue
+# (in the lane given by priority), or a lease in render_leases when the queue is disabled.
+# ---------------------------------------------------------
+def render_report_pdf(doc: dict, report_name: str, cache_key: str, priority: int = PRIORITY_INTERACTIVE) -> bytes:
+    def lookup():
+        return get_cached_pdf(cached_pdfs, fs, cache_key)
+
+    if RENDER_QUEUE_ENABLED:
+        return render_flights.run(
+            cache_key, lambda: lookup() or render_queue.run(cache_key, report_name, lookup, priority, report_snapshot(doc))
+        )
+
+    def render():
+        pdf_bytes = render_and_cache_pdf(doc, report_name, cache_key)
+        # Let the janitor trim the cache if this PDF pushed it over budget
+        pdf_cache_janitor.trigger()
+        return pdf_bytes
+
+    return render_flights.run(cache_key, lambda: render_lease_manager.run(cache_key, lookup, render))
+
+
+# ---------------------------------------------------------
+# Render a report without waiting for it (cache warming); False if it could not be queued
+# ---------------------------------------------------------
+def queue_background_render(doc: dict, report_name: str, cache_key: str) -> bool:
+    if RENDER_QUEUE_ENABLED:
+        render_queue.enqueue(cache_key, report_name, PRIORITY_PRERENDER, report_snapshot(doc))
+        return True
+    return prerenders.submit(cache_key, lambda: render_report_pdf(doc, report_name, cache_key))
+
+
 # ---------------------------------------------------------
 # Generate a single PDF and return the bytes
 # ---------------------------------------------------------
@@ -427,43 +850,23 @@ def generate_pdf_bytes(report_name: str):
     if not doc:
         raise Exception(f"Report '{report_name}' not found")
 
-    TEMP_DIR.mkdir(exist_ok=True)
-
-    # Write JSON file
-    json_file_path = TEMP_DIR / f"{report_name}.json"
-    with open(json_file_path, "w", encoding="utf-8") as f:
-        json.dump(doc["json_data"], f, ensure_ascii=False, indent=2)
-
-    # Write photos
-    for photo in doc["photos"]:
-        p = TEMP_DIR / photo["photo_name"]
-        with open(p, "wb") as f:
-            f.write(fs.get(photo["photo_id"]).read())
-
-    # Run PDF generator
-    pdf_file_path = TEMP_DIR / f"{report_name}.pdf"
-    subprocess.run(
-        ["python", str(PROCESS_DIR / "generate_pdf.py"), str(json_file_path)],
-        check=True
-    )
+    return render_report_pdf(doc, report_name, report_doc_cache_key(doc))
 
-    # Read PDF bytes
-    pdf_bytes = pdf_file_path.read_bytes()
 
-    # Clean up TEMP_DIR
-    for item in TEMP_DIR.iterdir():
-        if item.is_file():
-            item.unlink()
-        else:
-            shutil.rmtree(item)
-
-    # Update last_generated timestamp
-    uploads.update_one(
-        {"_id": doc["_id"]},
-        {"$set": {"last_generated": datetime.now()}}
-    )
+# ---------------------------------------------------------
+# Page plan of a report (page count and blocks per page, nothing is rendered)
+# ---------------------------------------------------------
+@app.get("/report_layout/{report_name}", name="report_layout")
+def report_layout(
+    report_name: str,
+    username: str = Depends(get_current_user_no_redirect)
+):
+    doc = uploads.find_one({"report_name": report_name}, {"json_data": 1})
+    if not doc:
+        return JSONResponse(status_code=404, content={"error": f"Report '{report_name}' not found"})
 
-    return pdf_bytes
+    layout = plan_report_layout(doc["json_data"])
+    return JSONResponse(content={"report_name": report_name, **layout})
 
 
 # ---------------------------------------------------------
@@ -519,7 +922,7 @@ async def rename_report(
             {"_id": old_doc["_id"]},
             {"$set": {
                 "report_name": new_name,
-                "last_modified": datetime.now()
+                "last_modified": datetime.now(timezone.utc)
             }}
         )
         
@@ -528,7 +931,7 @@ async def rename_report(
             {"report_name": old_name},
             {"$set": {
                 "report_name": new_name,
-                "last_accessed": datetime.now()
+                "last_accessed": datetime.now(timezone.utc)
             }}
         )
         
@@ -555,7 +958,91 @@ async def rename_report(
 
 
 # ---------------------------------------------------------
-# Bulk PDF Download (returns ZIP)
+# Cached PDF of a report for the bulk ZIP, rendering it on a miss.
+# Returns (report_name, bytes or GridFS file, error message)
+# ---------------------------------------------------------
+def fetch_bulk_pdf(report_name: str) -> tuple:
+    try:
+        doc = uploads.find_one({"report_name": report_name})
+        if not doc:
+            raise Exception(f"Report '{report_name}' not found")
+
+        cache_key = report_doc_cache_key(doc)
+        cached = open_cached_pdf(cached_pdfs, fs, cache_key)
+        if cached is not None:
+            print(f"DEBUG: Cache hit for {report_name}")
+            return report_name, cached, None
+
+        return report_name, render_report_pdf(doc, report_name, cache_key, PRIORITY_BULK), None
+    except Exception as e:
+        return report_name, None, str(e)
+
+
+# ---------------------------------------------------------
+# ZIP of the reports' PDFs, produced piece by piece.
+# Up to BULK_DOWNLOAD_WORKERS reports are fetched/rendered at once and each PDF is written (uncompressed,
+# PDFs are already compressed) as soon as it is ready, so memory does not grow with the number of reports.
+# on_result(report_name, error) is called once per report after its entry is written (error is None on success).
+# ---------------------------------------------------------
+def iter_bulk_zip(report_names: list, on_result=None):
+    from zipfile import ZipFile, ZIP_STORED
+
+    buffer = StreamBuffer()
+    errors = []
+    names = iter(report_names)
+    pending = set()
+
+    with ZipFile(buffer, "w", compression=ZIP_STORED) as zipf, \
+            ThreadPoolExecutor(max_workers=BULK_DOWNLOAD_WORKERS, thread_name_prefix="bulk-pdf") as pool:
+
+        def fill():
+            while len(pending) < BULK_DOWNLOAD_WORKERS:
+                report_name = next(names, None)
+                if report_name is None:
+                    break
+                pending.add(pool.submit(fetch_bulk_pdf, report_name))
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                report_name, pdf, error = future.result()
+                if error:
+                    errors.append(f"{report_name}: {error}")
+                    if on_result:
+                        on_result(report_name, error)
+                    continue
+
+                if isinstance(pdf, bytes):
+                    pieces = (pdf[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(pdf), STREAM_CHUNK_SIZE))
+                else:
+                    pieces = iter_gridfs(pdf)
+
+                try:
+                    with zipf.open(f"{report_name}.pdf", "w") as entry:
+                        for piece in pieces:
+                            entry.write(piece)
+                            yield buffer.take()
+                except Exception as e:
+                    # Entries already sent cannot be taken back; record the failure
+                    error = str(e)
+                    errors.append(f"{report_name}: {error}")
+                if on_result:
+                    on_result(report_name, error)
+                yield buffer.take()
+            fill()
+
+        # Add error log into ZIP
+        if errors:
+            zipf.writestr("errors.txt", "\n".join(errors))
+
+    # Central directory, written when the ZIP is closed
+    yield buffer.take()
+
+
+# ---------------------------------------------------------
+# Bulk PDF Download (streams a ZIP)
 # ---------------------------------------------------------
 @app.post("/download_pdf_bulk", name="download_pdf_bulk")
 async def download_pdf_bulk(
@@ -564,68 +1051,10 @@ async def download_pdf_bulk(
     username: str = Depends(get_current_user_no_redirect),
     background_tasks: BackgroundTasks = None
 ):
-    import io
-    from zipfile import ZipFile
-
     report_names = payload.get("reports", [])
     if not isinstance(report_names, list) or not report_names:
         return JSONResponse(status_code=400, content={"error": "Missing or invalid 'reports' list"})
 
-    zip_buffer = io.BytesIO()
-    errors = []
-
-    # Create ZIP in memory
-    with ZipFile(zip_buffer, "w") as zipf:
-
-        for report_name in report_names:
-            try:
-                # -----------------------------------------
-                # 1. Try Cache First
-                # -----------------------------------------
-                cached_doc = cached_pdfs.find_one({"report_name": report_name})
-                if cached_doc:
-                    try:
-                        pdf_bytes = fs.get(cached_doc["gridfs_id"]).read()
-
-                        # Refresh cache timestamp
-                        cached_pdfs.update_one(
-                            {"_id": cached_doc["_id"]},
-                            {"$set": {"last_accessed": datetime.now(timezone.utc)}}
-                        )
-
-                        zipf.writestr(f"{report_name}.pdf", pdf_bytes)
-                        print(f"DEBUG: Cache hit for {report_name}")
-                        continue
-                    except Exception:
-                        print(f"DEBUG: Cache retrieval failed for {report_name}: {e}. Regenerating.")
-                        pass  # Cache broken → regenerate
-
-                # -----------------------------------------
-                # 2. Cache miss → Regenerate (CPU-safe: sequential)
-                # -----------------------------------------
-                pdf_bytes = generate_pdf_bytes(report_name)
-
-                zipf.writestr(f"{report_name}.pdf", pdf_bytes)
-
-                # Save new PDF to cache
-                gridfs_id = fs.put(
-                    pdf_bytes, filename=f"{report_name}.pdf", content_type="application/pdf"
-                )
-
-                cached_pdfs.insert_one({
-                    "report_name": report_name,
-                    "gridfs_id": gridfs_id,
-                    "created_at": datetime.now(timezone.utc),
-                    "last_accessed": datetime.now(timezone.utc),
-                })
-
-            except Exception as e:
-                errors.append(f"{report_name}: {str(e)}")
-
-        # Add error log into ZIP
-        if errors:
-            zipf.writestr("errors.txt", "\n".join(errors))
-
     # Audit log
     log_action(
         request=request,
@@ -641,40 +1070,235 @@ async def download_pdf_bulk(
     timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M-%S")
     zip_filename = f"bulk_reports_{timestamp}.zip"
 
-    # Return zipped buffer
-    zip_buffer.seek(0)
+    # Entries are sent to the client as each PDF becomes ready
     return StreamingResponse(
-        zip_buffer,
+        iter_bulk_zip(report_names),
         media_type="application/zip",
         headers={"Content-Disposition": f"attachment; filename={zip_filename}"}
     )
 
-# -----------------------------
-# CACHE MAINTENANCE FUNCTION (MUST BE DEFINED)
-# -----------------------------
+# ---------------------------------------------------------
+# Bulk export jobs: the ZIP is built in the background and kept in GridFS
+# ---------------------------------------------------------
+def export_job_json(job: dict) -> dict:
+    reports = job.get("reports", [])
+    return {
+        "job_id": str(job["_id"]),
+        "status": job["status"],
+        "progress": {
+            "total": len(reports),
+            "done": sum(1 for r in reports if r["status"] == "done"),
+            "failed": sum(1 for r in reports if r["status"] == "failed"),
+        },
+        "reports": reports,
+        "error": job.get("error"),
+        "created_by": job.get("created_by"),
+        "created_at": job["created_at"].isoformat(),
+        "updated_at": job["updated_at"].isoformat(),
+        "expires_at": job["expires_at"].isoformat() if job.get("expires_at") else None,
+        "size": job.get("size"),
+        "download_url": f"/export_jobs/{job['_id']}/download" if job["status"] == "done" else None,
+    }
 
-def clean_pdf_cache(cached_pdfs_collection, fs_gridfs, max_cache_size=100):
-    """Deletes the oldest PDFs from the cache if the size exceeds the limit."""
-    
-    # Check current cache size
-    current_size = cached_pdfs_collection.count_documents({})
-    
-    if current_size > max_cache_size:
-        # Find the documents to delete (oldest first, based on last_accessed)
-        # We delete all documents beyond the max_cache_size limit.
-        docs_to_delete = cached_pdfs_collection.find().sort("last_accessed", 1).limit(current_size - max_cache_size)
-        
-        for doc in docs_to_delete:
+
+# Delete finished ZIPs (and their jobs) once they expire
+def expire_export_jobs():
+    expired = list(export_jobs.find({"expires_at": {"$lt": datetime.now(timezone.utc)}}, {"zip_gridfs_id": 1}))
+    for job in expired:
+        if job.get("zip_gridfs_id"):
+            fs.delete(job["zip_gridfs_id"])
+    if expired:
+        export_jobs.delete_many({"_id": {"$in": [job["_id"] for job in expired]}})
+
+
+# Build and store the ZIP of a claimed job, then mark it done (or failed)
+def build_export_zip(job: dict, record):
+    job_id = job["_id"]
+    report_names = [r["report_name"] for r in job["reports"]]
+    try:
+        with fs.new_file(filename=f"export_{job_id}.zip", content_type="application/zip", export_job=job_id) as grid_in:
+            for piece in iter_bulk_zip(report_names, on_result=record):
+                grid_in.write(piece)
+    except Exception as e:
+        export_jobs.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "failed", "error": str(e), "updated_at": datetime.now(timezone.utc)}}
+        )
+        return
+
+    # Replace the ZIP of an earlier attempt
+    if job.get("zip_gridfs_id"):
+        fs.delete(job["zip_gridfs_id"])
+
+    now = datetime.now(timezone.utc)
+    export_jobs.update_one(
+        {"_id": job_id},
+        {"$set": {
+            "status": "done",
+            "error": None,
+            "zip_gridfs_id": grid_in._id,
+            "size": grid_in.length,
+            "updated_at": now,
+            "expires_at": now + timedelta(hours=EXPORT_JOB_TTL_HOURS),
+        }}
+    )
+
+
+def run_export_job(job_id: ObjectId):
+    """
+    Build the ZIP of a job and store it in GridFS, recording each report's outcome as it goes.
+
+    The job is claimed first, so a job queued on several replicas (or resumed after a restart) is
+    only built once. The worker heartbeats the job while it runs, so however long one report takes,
+    only a job whose worker stopped (e.g. crashed) for EXPORT_JOB_STALE_SECONDS is taken over.
+    Reports are fetched through the PDF cache, so a retried job reuses every PDF already rendered.
+    """
+    now = datetime.now(timezone.utc)
+    job = export_jobs.find_one_and_update(
+        {"_id": job_id, "$or": [
+            {"status": "queued"},
+            {"status": "running", "updated_at": {"$lt": now - timedelta(seconds=EXPORT_JOB_STALE_SECONDS)}},
+        ]},
+        {"$set": {"status": "running", "worker": export_job_worker_id, "updated_at": now}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not job:
+        return
+
+    def record(report_name: str, error: str):
+        export_jobs.update_one(
+            {"_id": job_id, "reports.report_name": report_name},
+            {"$set": {
+                "reports.$.status": "failed" if error else "done",
+                "reports.$.error": error,
+                "updated_at": datetime.now(timezone.utc),
+            }}
+        )
+
+    # Heartbeat the job from a side thread while its reports are fetched and rendered
+    done = threading.Event()
+
+    def beat():
+        while not done.wait(EXPORT_JOB_STALE_SECONDS / 3):
             try:
-                # 1. Delete the actual file from GridFS
-                fs_gridfs.delete(doc["gridfs_id"])
-                
-                # 2. Delete the metadata record
-                cached_pdfs_collection.delete_one({"_id": doc["_id"]})
-                
+                result = export_jobs.update_one(
+                    {"_id": job_id, "status": "running", "worker": export_job_worker_id},
+                    {"$set": {"updated_at": datetime.now(timezone.utc)}}
+                )
+                if result.matched_count != 1:
+                    print(f"DEBUG: Lost export job {job_id}")
+                    return
             except Exception as e:
-                # Log error if deletion fails, but continue to clean the rest
-                print(f"Error cleaning cache document {doc.get('report_name', doc['_id'])}: {e}")
+                print(f"DEBUG: Export job heartbeat failed for {job_id}: {e}")
+
+    heartbeat = threading.Thread(target=beat, name=f"export-job-{job_id}", daemon=True)
+    heartbeat.start()
+    try:
+        build_export_zip(job, record)
+    finally:
+        done.set()
+        heartbeat.join()
+
+
+@app.post("/export_jobs", name="create_export_job")
+async def create_export_job(
+    request: Request,
+    payload: dict,
+    username: str = Depends(get_current_user_no_redirect),
+    background_tasks: BackgroundTasks = None
+):
+    report_names = payload.get("reports", [])
+    if not isinstance(report_names, list) or not report_names:
+        return JSONResponse(status_code=400, content={"error": "Missing or invalid 'reports' list"})
+
+    expire_export_jobs()
+
+    now = datetime.now(timezone.utc)
+    job = {
+        "status": "queued",
+        "reports": [{"report_name": name, "status": "pending", "error": None} for name in dict.fromkeys(report_names)],
+        "created_by": username["username"],
+        "created_at": now,
+        "updated_at": now,
+        "expires_at": None,
+    }
+    job_id = export_jobs.insert_one(job).inserted_id
+    export_job_executor.submit(run_export_job, job_id)
+
+    log_action(
+        request=request,
+        audit_logs_collection=audit_logs,
+        known_locations_collection=known_locations,
+        username=username["username"],
+        action="create_export_job",
+        details={"job_id": str(job_id), "reports": report_names},
+        background_tasks=background_tasks
+    )
+
+    return JSONResponse(status_code=202, content=export_job_json(export_jobs.find_one({"_id": job_id})))
+
+
+@app.get("/export_jobs/{job_id}", name="export_job_status")
+def export_job_status(
+    job_id: str,
+    username: str = Depends(get_current_user_no_redirect)
+):
+    job = export_jobs.find_one({"_id": ObjectId(job_id)}) if ObjectId.is_valid(job_id) else None
+    if not job:
+        return JSONResponse(status_code=404, content={"error": f"Export job '{job_id}' not found"})
+    return JSONResponse(content=export_job_json(job))
+
+
+# The whole ZIP is built again; PDFs already rendered come from the cache, so only failed reports are rendered
+@app.post("/export_jobs/{job_id}/retry", name="retry_export_job")
+def retry_export_job(
+    job_id: str,
+    username: str = Depends(get_current_user_no_redirect)
+):
+    job = export_jobs.find_one({"_id": ObjectId(job_id)}) if ObjectId.is_valid(job_id) else None
+    if not job:
+        return JSONResponse(status_code=404, content={"error": f"Export job '{job_id}' not found"})
+
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=EXPORT_JOB_STALE_SECONDS)
+    updated_at = job["updated_at"] if job["updated_at"].tzinfo else job["updated_at"].replace(tzinfo=timezone.utc)
+    if job["status"] == "running" and updated_at >= stale_before:
+        return JSONResponse(status_code=409, content={"error": "Export job is still running"})
+
+    export_jobs.update_one({"_id": job["_id"]}, {"$set": {
+        "status": "queued",
+        "reports": [r if r["status"] == "done" else {**r, "status": "pending", "error": None} for r in job["reports"]],
+        "updated_at": datetime.now(timezone.utc),
+    }})
+    export_job_executor.submit(run_export_job, job["_id"])
+    return JSONResponse(status_code=202, content=export_job_json(export_jobs.find_one({"_id": job["_id"]})))
+
+
+# Finished ZIP (supports Range, so an interrupted download can be resumed)
+@app.get("/export_jobs/{job_id}/download", name="download_export_job")
+def download_export_job(
+    request: Request,
+    job_id: str,
+    username: str = Depends(get_current_user_no_redirect)
+):
+    job = export_jobs.find_one({"_id": ObjectId(job_id)}) if ObjectId.is_valid(job_id) else None
+    if not job:
+        return JSONResponse(status_code=404, content={"error": f"Export job '{job_id}' not found"})
+    if job["status"] != "done":
+        return JSONResponse(status_code=409, content={"error": f"Export job is {job['status']}"})
+
+    try:
+        grid_out = fs.get(job["zip_gridfs_id"])
+    except Exception:
+        return JSONResponse(status_code=410, content={"error": "Export ZIP has expired"})
+
+    etag = make_etag(job["zip_gridfs_id"])
+    headers = {
+        "Content-Disposition": f"attachment; filename=bulk_reports_{job_id}.zip",
+        **cache_headers(etag, grid_out.upload_date, IMMUTABLE),
+    }
+    if is_not_modified(request, etag, grid_out.upload_date):
+        return not_modified_response(headers)
+    return gridfs_response(request, grid_out, "application/zip", headers)
 
 
 # -----------------------------
@@ -771,17 +1395,29 @@ async def view_report(
 # -----------------------------
 @app.get("/photo/{photo_id}")
 def get_photo(
+    request: Request,
     photo_id: str, 
     username: str = Depends(get_current_user_no_redirect)
 ):
-    photo = fs.get(ObjectId(photo_id))
-    return Response(photo.read(), media_type="image/jpeg")
+    # fs.get only reads the file document, so a missing photo is a 404 before any 304
+    try:
+        photo = open_photo(fs, photo_aliases, ObjectId(photo_id))
+    except NoFile:
+        return JSONResponse(status_code=404, content={"error": f"Photo '{photo_id}' not found"})
+
+    # A photo id always points to the same bytes, so the id is its ETag
+    etag = make_etag(photo_id)
+    headers = cache_headers(etag, photo.upload_date, IMMUTABLE)
+    if is_not_modified(request, etag, photo.upload_date):
+        return not_modified_response(headers)
+    return gridfs_response(request, photo, "image/jpeg", headers)
 
 # -----------------------------
 # Fetch metadata for a given report
 # -----------------------------
 @app.get("/metadata/{report_name}")
 async def get_metadata(
+    request: Request,
     report_name: str, 
     username: str = Depends(get_current_user_no_redirect)
 ):
@@ -796,7 +1432,13 @@ async def get_metadata(
         if key in doc and isinstance(doc[key], datetime):
             doc[key] = doc[key].isoformat()
 
-    return JSONResponse(content=doc)
+    # last_generated changes without last_modified, so only the body can validate it (no Last-Modified)
+    response = JSONResponse(content=doc)
+    headers = cache_headers(content_etag(response.body))
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+    return response
 
 # -----------------------------
 # Check status of database
@@ -817,6 +1459,83 @@ async def db_status(
     except Exception as e:
         return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
 
+# -----------------------------
+# Render worker and font cache statistics
+# -----------------------------
+@app.get("/render_stats")
+async def render_stats(
+    current_user: dict = Depends(get_current_user_no_redirect)
+):
+    # Require admin access
+    error = require_role("admin")(current_user)
+    if error:
+        return error
+
+    return JSONResponse(content={
+        **render_pool.stats(),
+        "single_flight": render_flights.stats(),
+        "render_leases": render_lease_manager.stats(),
+        "prerender": prerenders.stats(),
+        "render_queue": {
+            "enabled": RENDER_QUEUE_ENABLED,
+            **render_queue.stats(),
+            "in_process_workers": render_queue_worker.stats(),
+        },
+    })
+
+# -----------------------------
+# Give a dead-lettered render job another set of attempts (admin only)
+# -----------------------------
+@app.post("/render_jobs/{job_id}/requeue")
+async def requeue_render_job(
+    request: Request,
+    job_id: str,
+    current_user: dict = Depends(get_current_user_no_redirect),
+    background_tasks: BackgroundTasks = None
+):
+    # Require admin access
+    error = require_role("admin")(current_user)
+    if error:
+        return error
+
+    if not ObjectId.is_valid(job_id) or not render_queue.requeue(ObjectId(job_id)):
+        return JSONResponse(status_code=404, content={"error": f"No dead-lettered render job '{job_id}'"})
+
+    log_action(
+        request=request,
+        audit_logs_collection=audit_logs,
+        known_locations_collection=known_locations,
+        username=current_user["username"],
+        action="requeue_render_job",
+        details={"job_id": job_id},
+        background_tasks=background_tasks
+    )
+    return JSONResponse(content={"message": f"Render job {job_id} requeued"})
+
+# -----------------------------
+# PDF cache eviction policy and current usage (admin only)
+# -----------------------------
+@app.get("/pdf_cache_policy")
+async def pdf_cache_policy(
+    current_user: dict = Depends(get_current_user_no_redirect)
+):
+    # Require admin access
+    error = require_role("admin")(current_user)
+    if error:
+        return error
+
+    return JSONResponse(content={
+        "max_bytes": int(PDF_CACHE_MAX_MB * 1024 * 1024),
+        "max_age_days": PDF_CACHE_MAX_AGE_DAYS or None,
+        "evict_interval_seconds": pdf_cache_janitor.interval_seconds,
+        "evict_grace_seconds": PDF_CACHE_EVICT_GRACE_SECONDS,
+        **pdf_cache_usage(cached_pdfs),
+        "eviction_runs": pdf_cache_janitor.runs,
+        "last_eviction": pdf_cache_janitor.last_run.isoformat() if pdf_cache_janitor.last_run else None,
+        "last_eviction_result": pdf_cache_janitor.last_result,
+        "memory": PDF_MEMORY_CACHE.stats(),
+    })
+
 # -----------------------------
 # Opens the page to create a report
 # -----------------------------
@@ -933,6 +1652,10 @@ async def cleanup_orphan_photos(
         if fid is not None:
             referenced_pdf_ids.add(fid)
 
+    # ZIPs of export jobs (removed when their job expires) and jobs still building one
+    referenced_export_ids = set(export_jobs.distinct("zip_gridfs_id"))
+    active_export_jobs = set(export_jobs.distinct("_id", {"status": {"$in": ["queued", "running"]}}))
+
     # Existing report names (to know if a cached PDF's report still exists)
     existing_reports = set(uploads.distinct("report_name"))
 
@@ -1001,6 +1724,10 @@ async def cleanup_orphan_photos(
         if file_id in referenced_pdf_ids:
             continue
 
+        # Skip finished export ZIPs and the ZIP of an export that is still being built
+        if file_id in referenced_export_ids or getattr(grid_out, "export_job", None) in active_export_jobs:
+            continue
+
         filename = grid_out.filename
         length = getattr(grid_out, "length", 0) or 0
 
@@ -1033,6 +1760,13 @@ async def cleanup_orphan_photos(
                 "error": str(e),
             })
 
+    # Aliases of merged photos go with the photo they resolve to
+    if deleted_photos:
+        try:
+            photo_aliases.delete_many({"photo_id": {"$in": [ObjectId(photo_id) for photo_id in deleted_photos]}})
+        except Exception as e:
+            errors.append({"photo_id": None, "filename": None, "error": f"Failed to delete photo aliases: {e}"})
+
     # --- Build details for audit log ---
     details = {}
     num_photos = len(deleted_photos)
@@ -1290,6 +2024,7 @@ def download_report_files(
 # -----------------------------
 @app.get("/download_json/{report_name}", name="download_json")
 def download_json(
+    request: Request,
     report_name: str, 
     username: str = Depends(get_current_user_no_redirect)
 ):
@@ -1297,25 +2032,39 @@ def download_json(
     if not doc:
         return JSONResponse(status_code=404, content={"error": f"Report '{report_name}' not found"})
 
-    json_bytes = BytesIO(json.dumps(doc["json_data"], indent=2).encode("utf-8"))
-    headers = {"Content-Disposition": f"attachment; filename={report_name}.json"}
-    return StreamingResponse(json_bytes, media_type="application/json", headers=headers)
+    json_bytes = json.dumps(doc["json_data"], indent=2).encode("utf-8")
+    headers = {
+        "Content-Disposition": f"attachment; filename={report_name}.json",
+        **cache_headers(content_etag(json_bytes), doc.get("last_modified")),
+    }
+    if is_not_modified(request, headers["ETag"], doc.get("last_modified")):
+        return not_modified_response(headers)
+    return StreamingResponse(BytesIO(json_bytes), media_type="application/json", headers=headers)
 
 # -----------------------------
 # Download photo by its GridFS ID
 # -----------------------------
 @app.get("/download_photo/{photo_id}", name="download_photo")
 def download_photo(
+    request: Request,
     photo_id: str, 
     username: str = Depends(get_current_user_no_redirect)
 ):
+    # fs.get only reads the file document (chunks are streamed below), so a missing photo is a 404 before any 304
     try:
-        grid_out = fs.get(ObjectId(photo_id))
+        grid_out = open_photo(fs, photo_aliases, ObjectId(photo_id))
     except Exception:
         return JSONResponse(status_code=404, content={"error": f"Photo '{photo_id}' not found"})
 
-    headers = {"Content-Disposition": f"attachment; filename={grid_out.filename}"}
-    return StreamingResponse(grid_out, media_type="image/jpeg", headers=headers)
+    # A photo id always points to the same bytes, so the id is its ETag
+    etag = make_etag(photo_id)
+    headers = {
+        "Content-Disposition": f"attachment; filename={grid_out.filename}",
+        **cache_headers(etag, grid_out.upload_date, IMMUTABLE),
+    }
+    if is_not_modified(request, etag, grid_out.upload_date):
+        return not_modified_response(headers)
+    return gridfs_response(request, grid_out, "image/jpeg", headers)
 
 
 
@@ -0,0 +1,40 @@
+import os
+
+import gridfs
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+load_dotenv()
+
+# -----------------------------
+# MongoDB Connection (shared by the API and standalone render workers)
+# -----------------------------
+# Environment variables from .env
+MONGO_USER = os.getenv("MONGO_USER", "")
+MONGO_PASSWORD = os.getenv("MONGO_PASSWORD", "")
+MONGO_HOST = os.getenv("MONGO_HOST", "mongo")
+MONGO_PORT = os.getenv("MONGO_PORT", "27017")
+MONGO_DB = os.getenv("MONGO_DB", "loto_pdf")
+
+# Build URI
+if MONGO_USER and MONGO_PASSWORD:
+    MONGO_URI = f"mongodb://{MONGO_USER}:{MONGO_PASSWORD}@{MONGO_HOST}:{MONGO_PORT}"
+else:
+    MONGO_URI = f"mongodb://{MONGO_HOST}:{MONGO_PORT}"
+
+client = MongoClient(MONGO_URI)
+db = client[MONGO_DB]
+
+# Collections
+uploads = db['reports']    # collection for metadata + JSON
+users = db['users']        # collection for users + metadata
+audit_logs = db["audit_logs"]
+known_locations = db['known_locations']
+cached_pdfs = db['cached_pdfs']
+render_leases = db['render_leases']    # one lease per PDF being rendered, shared by all replicas
+export_jobs = db['export_jobs']        # bulk ZIP exports built in the background
+render_jobs = db['render_jobs']        # queue of PDF renders, served by in-process and separate render workers
+upload_sessions = db['upload_sessions']                  # resumable uploads in progress
+upload_session_chunks = db['upload_session_chunks']      # chunks received for them
+photo_aliases = db['photo_aliases']    # ids of merged duplicate photos -> the photo they now resolve to
+fs = gridfs.GridFS(db)     # GridFS for storing photos
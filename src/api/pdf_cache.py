@@ -0,0 +1,622 @@
+import os
+import json
+import time
+import uuid
+import random
+import socket
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from gridfs import GridFS
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import DuplicateKeyError
+
+from src.pdf.generate_pdf import RENDERER_VERSION
+from src.pdf.render_pool import RENDER_TIMEOUT_SECONDS
+
+
+# Render leases (overridable from the environment / .env)
+RENDER_LEASE_SECONDS = float(os.getenv("RENDER_LEASE_SECONDS", "30"))
+RENDER_LEASE_WAIT_SECONDS = float(os.getenv("RENDER_LEASE_WAIT_SECONDS", str(RENDER_TIMEOUT_SECONDS + 30)))
+
+# PDF cache eviction policy (overridable from the environment / .env)
+PDF_CACHE_MAX_MB = float(os.getenv("PDF_CACHE_MAX_MB", "1024"))
+PDF_CACHE_MAX_AGE_DAYS = float(os.getenv("PDF_CACHE_MAX_AGE_DAYS", "0"))    # 0 keeps PDFs regardless of age
+PDF_CACHE_EVICT_INTERVAL_SECONDS = float(os.getenv("PDF_CACHE_EVICT_INTERVAL_SECONDS", "300"))
+PDF_CACHE_EVICT_GRACE_SECONDS = float(os.getenv("PDF_CACHE_EVICT_GRACE_SECONDS", "600"))    # evicted PDFs may still be streaming
+EVICT_BATCH_SIZE = 500
+
+# In-process tier in front of GridFS (overridable from the environment / .env)
+PDF_MEMORY_CACHE_MB = float(os.getenv("PDF_MEMORY_CACHE_MB", "128"))
+PDF_CACHE_ACCESS_FLUSH_SECONDS = float(os.getenv("PDF_CACHE_ACCESS_FLUSH_SECONDS", "30"))
+
+# Renders queued ahead of requests, e.g. right after an upload (overridable from the environment / .env)
+PRERENDER_ON_UPLOAD = os.getenv("PRERENDER_ON_UPLOAD", "true").lower() in ("1", "true", "yes")
+PRERENDER_WORKERS = int(os.getenv("PRERENDER_WORKERS", "1"))
+PRERENDER_MAX_QUEUED = int(os.getenv("PRERENDER_MAX_QUEUED", "20"))
+
+# Stale-while-revalidate for changed reports (overridable from the environment / .env)
+PDF_STALE_WHILE_REVALIDATE = os.getenv("PDF_STALE_WHILE_REVALIDATE", "false").lower() in ("1", "true", "yes")
+PDF_STALE_MAX_AGE_HOURS = float(os.getenv("PDF_STALE_MAX_AGE_HOURS", "24"))    # 0 serves stale PDFs of any age
+
+
+# Report JSON serialized the same way regardless of key order or whitespace
+def canonical_json(json_data: dict) -> str:
+    return json.dumps(json_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+# SHA-256 of a photo's bytes
+def photo_hash(photo_bytes: bytes) -> str:
+    return hashlib.sha256(photo_bytes).hexdigest()
+
+
+def report_cache_key(report_name: str, json_data: dict, photo_hashes: dict, renderer_version: str = RENDERER_VERSION) -> str:
+    """
+    Content address of a rendered report.
+
+    Hashes the report name (the renderer embeds it as the PDF title), the canonical report JSON,
+    the content hash of every photo it references (by name) and the renderer version, so any
+    change to the report, its name or the renderer misses.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"renderer:{renderer_version}\n".encode("utf-8"))
+    digest.update(f"name:{report_name}\n".encode("utf-8"))
+    digest.update(canonical_json(json_data).encode("utf-8"))
+    for name, sha256 in sorted(photo_hashes.items()):
+        digest.update(f"\nphoto:{name}:{sha256}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Unique lookup index on the cache key (entries cached before content keys existed have none)
+# the last_accessed order eviction walks, and the latest PDF of a report (stale-while-revalidate)
+def ensure_cache_indexes(cached_pdfs_collection: Collection):
+    cached_pdfs_collection.create_index(
+        "cache_key", unique=True, partialFilterExpression={"cache_key": {"$exists": True}}
+    )
+    cached_pdfs_collection.create_index("last_accessed")
+    cached_pdfs_collection.create_index([("report_name", 1), ("created_at", -1)])
+
+
+class PdfMemoryCache:
+    """
+    Bounded LRU of cached PDF bytes held in this process, in front of GridFS.
+
+    Keys are content addresses, so an entry can never go stale: it is served as long as it fits
+    in `max_bytes`. Hits are recorded in memory and written to `last_accessed` in bulk by
+    flush_access_times() instead of one update per download.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # cache key -> PDF bytes
+        self._accessed = {}  # cache key -> latest access not yet written to cached_pdfs
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, cache_key: str):
+        with self._lock:
+            pdf_bytes = self._entries.get(cache_key)
+            if pdf_bytes is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+        self.touch(cache_key)
+        return pdf_bytes
+
+    def put(self, cache_key: str, pdf_bytes: bytes):
+        # A PDF larger than the whole budget would only push everything else out
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        with self._lock:
+            if cache_key in self._entries:
+                self._entries.move_to_end(cache_key)
+                return
+            self._entries[cache_key] = pdf_bytes
+            self._bytes += len(pdf_bytes)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    # Remember that a cached PDF was used (written to Mongo on the next flush)
+    def touch(self, cache_key: str):
+        with self._lock:
+            self._accessed[cache_key] = datetime.now(timezone.utc)
+
+    # Write the recorded access times to cached_pdfs in one bulk update
+    def flush_access_times(self, cached_pdfs_collection: Collection) -> int:
+        with self._lock:
+            accessed, self._accessed = self._accessed, {}
+        if not accessed:
+            return 0
+
+        try:
+            cached_pdfs_collection.bulk_write([
+                UpdateOne({"cache_key": cache_key}, {"$max": {"last_accessed": when}})
+                for cache_key, when in accessed.items()
+            ], ordered=False)
+        except Exception:
+            # Keep them for the next flush (newer accesses win)
+            with self._lock:
+                for cache_key, when in accessed.items():
+                    self._accessed.setdefault(cache_key, when)
+            raise
+        return len(accessed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pdfs_cached": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "pending_access_updates": len(self._accessed),
+            }
+
+
+PDF_MEMORY_CACHE = PdfMemoryCache(int(PDF_MEMORY_CACHE_MB * 1024 * 1024))
+
+
+# Cached PDF for a cache key without reading it: its bytes when held in memory, otherwise the
+# GridFS file to stream from (None on a miss; a missing GridFS file also counts as a miss).
+# Hot PDFs are served from memory without touching Mongo.
+def open_cached_pdf(cached_pdfs_collection: Collection, fs_gridfs: GridFS, cache_key: str):
+    pdf_bytes = PDF_MEMORY_CACHE.get(cache_key)
+    if pdf_bytes is not None:
+        return pdf_bytes
+
+    cached_doc = cached_pdfs_collection.find_one({"cache_key": cache_key})
+    if not cached_doc:
+        return None
+
+    try:
+        grid_out = fs_gridfs.get(cached_doc["gridfs_id"])
+    except Exception as e:
+        print(f"DEBUG: Cache retrieval failed for {cache_key}: {e}. Regenerating.")
+        cached_pdfs_collection.delete_one({"_id": cached_doc["_id"]})
+        return None
+
+    # The access time keeps the PDF "fresh" and prevents eviction; it is written on the next flush
+    PDF_MEMORY_CACHE.touch(cache_key)
+    return grid_out
+
+
+# Cached PDF bytes for a cache key, or None on a miss (the PDF is kept in memory for the next hit)
+def get_cached_pdf(cached_pdfs_collection: Collection, fs_gridfs: GridFS, cache_key: str):
+    cached = open_cached_pdf(cached_pdfs_collection, fs_gridfs, cache_key)
+    if cached is None or isinstance(cached, bytes):
+        return cached
+
+    try:
+        pdf_bytes = cached.read()
+    except Exception as e:
+        print(f"DEBUG: Cache retrieval failed for {cache_key}: {e}. Regenerating.")
+        cached_pdfs_collection.delete_one({"cache_key": cache_key})
+        return None
+
+    PDF_MEMORY_CACHE.put(cache_key, pdf_bytes)
+    return pdf_bytes
+
+
+# Store a rendered PDF under its cache key (if another request cached it first, keep theirs)
+def store_cached_pdf(cached_pdfs_collection: Collection, fs_gridfs: GridFS,
+                     cache_key: str, report_name: str, pdf_bytes: bytes):
+    gridfs_id = fs_gridfs.put(pdf_bytes, filename=f"{report_name}.pdf", content_type="application/pdf")
+    now = datetime.now(timezone.utc)
+    try:
+        cached_pdfs_collection.insert_one({
+            "cache_key": cache_key,
+            "report_name": report_name,
+            "renderer_version": RENDERER_VERSION,
+            "gridfs_id": gridfs_id,
+            "size": len(pdf_bytes),
+            "created_at": now,
+            "last_accessed": now,
+        })
+    except DuplicateKeyError:
+        fs_gridfs.delete(gridfs_id)
+
+    PDF_MEMORY_CACHE.put(cache_key, pdf_bytes)
+
+
+# Most recently rendered cached PDF of a report, whatever content it was rendered from
+# (None if there is none or it is older than max_age_hours)
+def find_stale_pdf(cached_pdfs_collection: Collection, report_name: str, max_age_hours: float = PDF_STALE_MAX_AGE_HOURS):
+    query = {"report_name": report_name, "cache_key": {"$exists": True}}
+    if max_age_hours:
+        query["created_at"] = {"$gte": datetime.now(timezone.utc) - timedelta(hours=max_age_hours)}
+    return cached_pdfs_collection.find_one(query, sort=[("created_at", -1)])
+
+
+# Cache entries that are still served (evicted entries wait for their files to be deleted)
+LIVE_ENTRIES = {"evicted_at": {"$exists": False}}
+
+
+# Total size and number of cached PDFs
+def pdf_cache_usage(cached_pdfs_collection: Collection) -> dict:
+    totals = list(cached_pdfs_collection.aggregate([
+        {"$match": LIVE_ENTRIES},
+        {"$group": {"_id": None, "bytes": {"$sum": "$size"}, "count": {"$sum": 1}}}
+    ]))
+    if not totals:
+        return {"cached_pdfs": 0, "cached_bytes": 0}
+    return {"cached_pdfs": totals[0]["count"], "cached_bytes": totals[0]["bytes"]}
+
+
+# Record the GridFS length on cache entries stored before sizes were tracked
+def _fill_missing_sizes(cached_pdfs_collection: Collection, files_collection: Collection):
+    missing = list(cached_pdfs_collection.find({"size": {"$exists": False}}, {"gridfs_id": 1}))
+    if not missing:
+        return
+
+    lengths = {
+        file_doc["_id"]: file_doc.get("length", 0)
+        for file_doc in files_collection.find({"_id": {"$in": [doc["gridfs_id"] for doc in missing]}}, {"length": 1})
+    }
+    cached_pdfs_collection.bulk_write([
+        UpdateOne({"_id": doc["_id"]}, {"$set": {"size": lengths.get(doc["gridfs_id"], 0)}})
+        for doc in missing
+    ])
+
+
+def evict_pdf_cache(cached_pdfs_collection: Collection, files_collection: Collection, chunks_collection: Collection,
+                    max_bytes: int, max_age_days: float = 0, grace_seconds: float = PDF_CACHE_EVICT_GRACE_SECONDS) -> dict:
+    """
+    Trim the PDF cache to max_bytes, least recently used first, after dropping every entry not
+    accessed for max_age_days (0 disables the age limit).
+
+    Eviction happens in two steps so downloads that already opened a PDF can finish streaming it:
+    evicted entries lose their cache key right away (no new request is handed their file), and
+    their GridFS files and chunks are deleted by the first pass at least grace_seconds later, in
+    batched delete_many calls.
+    """
+    now = datetime.now(timezone.utc)
+    expired = list(cached_pdfs_collection.find(
+        {"evicted_at": {"$lte": now - timedelta(seconds=grace_seconds)}}, {"gridfs_id": 1}
+    ))
+    for start in range(0, len(expired), EVICT_BATCH_SIZE):
+        batch = expired[start:start + EVICT_BATCH_SIZE]
+        file_ids = [doc["gridfs_id"] for doc in batch if doc.get("gridfs_id") is not None]
+        files_collection.delete_many({"_id": {"$in": file_ids}})
+        chunks_collection.delete_many({"files_id": {"$in": file_ids}})
+        cached_pdfs_collection.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+
+    _fill_missing_sizes(cached_pdfs_collection, files_collection)
+
+    victims = []
+    if max_age_days:
+        cutoff = now - timedelta(days=max_age_days)
+        victims = list(cached_pdfs_collection.find(
+            {**LIVE_ENTRIES, "last_accessed": {"$lt": cutoff}}, {"gridfs_id": 1, "size": 1}
+        ))
+
+    usage = pdf_cache_usage(cached_pdfs_collection)
+    excess = usage["cached_bytes"] - sum(doc.get("size", 0) for doc in victims) - max_bytes
+    if excess > 0:
+        too_old = {doc["_id"] for doc in victims}
+        for doc in cached_pdfs_collection.find(LIVE_ENTRIES, {"gridfs_id": 1, "size": 1}).sort("last_accessed", 1):
+            if excess <= 0:
+                break
+            if doc["_id"] in too_old:
+                continue
+            victims.append(doc)
+            excess -= doc.get("size", 0)
+
+    for start in range(0, len(victims), EVICT_BATCH_SIZE):
+        batch = victims[start:start + EVICT_BATCH_SIZE]
+        cached_pdfs_collection.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in batch]}},
+            {"$set": {"evicted_at": now}, "$unset": {"cache_key": ""}}
+        )
+
+    return {
+        "evicted": len(victims),
+        "evicted_bytes": sum(doc.get("size", 0) for doc in victims),
+        "deleted": len(expired),
+        **pdf_cache_usage(cached_pdfs_collection),
+    }
+
+
+class CacheJanitor:
+    """
+    Runs PDF cache eviction on a background thread, every interval_seconds and soon after
+    trigger() is called. Triggers that arrive while a pass is running fold into the next one.
+
+    flush (if given) runs every flush_interval_seconds, before each eviction pass and on stop;
+    it writes the coalesced cache access times so eviction sees recent downloads.
+    """
+
+    def __init__(self, evict, interval_seconds: float = PDF_CACHE_EVICT_INTERVAL_SECONDS,
+                 flush=None, flush_interval_seconds: float = PDF_CACHE_ACCESS_FLUSH_SECONDS):
+        self.evict = evict
+        self.interval_seconds = interval_seconds
+        self.flush = flush
+        self.flush_interval_seconds = flush_interval_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.runs = 0
+        self.last_run = None
+        self.last_result = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="pdf-cache-janitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self._flush()
+
+    # Ask for an eviction pass (e.g. after a new PDF was cached)
+    def trigger(self):
+        self._wake.set()
+
+    def _flush(self):
+        if self.flush is None:
+            return
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Error writing PDF cache access times: {e}")
+
+    def run_once(self) -> dict:
+        self._flush()
+        result = self.evict()
+        self.runs += 1
+        self.last_run = datetime.now(timezone.utc)
+        self.last_result = result
+        if result["evicted"]:
+            print(f"DEBUG: Evicted {result['evicted']} cached PDFs ({result['evicted_bytes']} bytes)")
+        return result
+
+    def _loop(self):
+        next_eviction = time.monotonic() + self.interval_seconds
+        while not self._stop.is_set():
+            timeout = max(0.0, next_eviction - time.monotonic())
+            if self.flush is not None:
+                timeout = min(timeout, self.flush_interval_seconds)
+            triggered = self._wake.wait(timeout)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+
+            if not triggered and time.monotonic() < next_eviction:
+                self._flush()
+                continue
+
+            next_eviction = time.monotonic() + self.interval_seconds
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error cleaning PDF cache: {e}")
+
+
+class BackgroundRenders:
+    """
+    Small bounded queue of renders run ahead of any request, so the PDF cache is warm when
+    someone opens the report.
+
+    At most `workers` renders run at once and at most `max_queued` keys wait or run; further
+    submissions are rejected. A key already queued is not queued twice.
+    """
+
+    def __init__(self, workers: int = PRERENDER_WORKERS, max_queued: int = PRERENDER_MAX_QUEUED):
+        self.workers = workers
+        self.max_queued = max_queued
+        self._executor = None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._stats = {"queued": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+    # Queue fn() under a cache key; returns False when the queue is full
+    def submit(self, cache_key: str, fn) -> bool:
+        with self._lock:
+            if cache_key in self._pending:
+                return True
+            if self.workers <= 0 or len(self._pending) >= self.max_queued:
+                self._stats["rejected"] += 1
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prerender")
+            self._pending.add(cache_key)
+            self._stats["queued"] += 1
+            executor = self._executor
+
+        executor.submit(self._run, cache_key, fn)
+        return True
+
+    def _run(self, cache_key: str, fn):
+        try:
+            fn()
+            outcome = "completed"
+        except Exception as e:
+            print(f"DEBUG: Background render failed for {cache_key}: {e}")
+            outcome = "failed"
+        with self._lock:
+            self._pending.discard(cache_key)
+            self._stats[outcome] += 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._pending.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "max_queued": self.max_queued, "pending": len(self._pending), **self._stats}
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time within this process.
+
+    Callers arriving while a call for the same key is in flight wait for it and share its result
+    (or its exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.leaders = 0
+        self.deduplicated = 0
+
+    def run(self, key: str, fn):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = Future()
+                self.leaders += 1
+                leader = True
+            else:
+                self.deduplicated += 1
+                leader = False
+
+        if not leader:
+            return flight.result()
+
+        try:
+            flight.set_result(fn())
+        except BaseException as e:
+            flight.set_exception(e)
+        finally:
+            with self._lock:
+                del self._flights[key]
+        return flight.result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._flights), "flights": self.leaders, "renders_avoided": self.deduplicated}
+
+
+class RenderLeases:
+    """
+    Cross-replica single-flight for renders, built on lease documents in a Mongo collection.
+
+    The replica holding the lease for a cache key renders it and heartbeats the lease while it
+    works. Other replicas poll the PDF cache with backoff until the PDF appears, or take the
+    lease over once the holder stops heartbeating and it expires (e.g. the holder crashed).
+    """
+
+    def __init__(self, collection: Collection, lease_seconds: float = RENDER_LEASE_SECONDS,
+                 wait_seconds: float = RENDER_LEASE_WAIT_SECONDS):
+        self.collection = collection
+        self.lease_seconds = lease_seconds
+        self.wait_seconds = wait_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._stats = {"acquired": 0, "taken_over": 0, "waited": 0, "served_while_waiting": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    # Expired leases are removed by Mongo as well (the TTL monitor runs about once a minute)
+    def ensure_indexes(self):
+        self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    # Take the lease if it is free, expired or already ours; False while another holder's lease is live
+    def acquire(self, key: str) -> bool:
+        now = datetime.now(timezone.utc)
+        try:
+            previous = self.collection.find_one_and_update(
+                {"_id": key, "$or": [{"expires_at": {"$lt": now}}, {"holder": self.holder}]},
+                {
+                    "$set": {"holder": self.holder, "acquired_at": now, "heartbeat_at": now,
+                             "expires_at": now + timedelta(seconds=self.lease_seconds)},
+                },
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            # The lease exists and is held (unexpired) by someone else
+            return False
+
+        self._count("acquired")
+        if previous is not None and previous.get("holder") != self.holder:
+            print(f"DEBUG: Took over expired render lease {key} from {previous.get('holder')}")
+            self._count("taken_over")
+        return True
+
+    # Extend our lease; False if it expired and somebody else took it over
+    def heartbeat(self, key: str) -> bool:
+        now = datetime.now(timezone.utc)
+        result = self.collection.update_one(
+            {"_id": key, "holder": self.holder},
+            {"$set": {"heartbeat_at": now, "expires_at": now + timedelta(seconds=self.lease_seconds)}}
+        )
+        return result.matched_count == 1
+
+    def release(self, key: str):
+        self.collection.delete_one({"_id": key, "holder": self.holder})
+
+    # Heartbeat the lease from a background thread for as long as the block runs
+    @contextmanager
+    def _held(self, key: str):
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.lease_seconds / 3):
+                try:
+                    if not self.heartbeat(key):
+                        print(f"DEBUG: Lost render lease {key}")
+                        return
+                except Exception as e:
+                    print(f"DEBUG: Render lease heartbeat failed for {key}: {e}")
+
+        thread = threading.Thread(target=beat, name=f"lease-{key[:8]}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+            self.release(key)
+
+    def run(self, key: str, lookup, render):
+        """
+        Return lookup() once it finds the cached PDF, rendering it with render() if this replica
+        gets the lease. Raises TimeoutError when no PDF appears within wait_seconds.
+        """
+        deadline = time.monotonic() + self.wait_seconds
+        delay = 0.1
+        waited = False
+        while True:
+            pdf_bytes = lookup()
+            if pdf_bytes is not None:
+                if waited:
+                    self._count("served_while_waiting")
+                return pdf_bytes
+
+            if self.acquire(key):
+                with self._held(key):
+                    # The previous holder may have finished between our lookup and taking the lease
+                    pdf_bytes = lookup()
+                    return pdf_bytes if pdf_bytes is not None else render()
+
+            if not waited:
+                waited = True
+                self._count("waited")
+            if time.monotonic() + delay > deadline:
+                raise TimeoutError(f"Timed out waiting for another replica to render {key}")
+            time.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, 2.0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"holder": self.holder, "lease_seconds": self.lease_seconds, **self._stats}
@@ -0,0 +1,168 @@
+import hashlib
+
+from bson.objectid import ObjectId
+from gridfs import GridFS, DEFAULT_CHUNK_SIZE, NoFile
+from pymongo.collection import Collection
+from pymongo.errors import DuplicateKeyError
+
+
+# Photos are deduplicated on the SHA-256 of their bytes, kept in the metadata of their fs.files entry
+PHOTO_HASH_FIELD = "metadata.sha256"
+# Hash of a photo stored by an upload that is not saved yet: kept out of the index, so no other upload
+# can reuse the photo and a failed upload can delete it safely
+PHOTO_PENDING_HASH_FIELD = "metadata.pending_sha256"
+
+
+# One GridFS file per photo content (files without a hash, e.g. cached PDFs, are not indexed)
+def ensure_photo_indexes(files: Collection):
+    files.create_index(PHOTO_HASH_FIELD, unique=True, partialFilterExpression={PHOTO_HASH_FIELD: {"$exists": True}})
+
+
+# Photo a merged (deleted) duplicate's id now resolves to, so its /photo/{id} URLs keep working
+def resolve_photo_alias(aliases: Collection, photo_id):
+    alias = aliases.find_one({"_id": photo_id})
+    return alias["photo_id"] if alias else None
+
+
+# GridFS file of a photo id, following the alias of a merged duplicate (raises NoFile when neither exists)
+def open_photo(fs: GridFS, aliases: Collection, photo_id):
+    try:
+        return fs.get(photo_id)
+    except NoFile:
+        alias = resolve_photo_alias(aliases, photo_id)
+        if alias is None:
+            raise
+        return fs.get(alias)
+
+
+# Id of the stored photo with this content hash (one indexed lookup, no bytes are read)
+def find_photo(fs: GridFS, sha256: str):
+    existing = fs.find_one({PHOTO_HASH_FIELD: sha256})
+    return existing._id if existing else None
+
+
+# Ids of the stored photos among these content hashes (sha256 -> id), in one query
+def find_photos(files: Collection, hashes: list) -> dict:
+    return {
+        file["metadata"]["sha256"]: file["_id"]
+        for file in files.find({PHOTO_HASH_FIELD: {"$in": list(set(hashes))}}, {PHOTO_HASH_FIELD: 1})
+    }
+
+
+# True for a hex SHA-256 digest as sent by clients
+def is_sha256(value) -> bool:
+    return isinstance(value, str) and len(value) == 64 and all(c in "0123456789abcdefABCDEF" for c in value)
+
+
+def store_photo_stream(fs: GridFS, files: Collection, stream, filename: str, pending: bool = False) -> tuple:
+    """
+    Copy a photo from a file object into GridFS one chunk at a time, hashing it on the way, so
+    memory use does not depend on the photo's size. Once the hash is known the photo is
+    deduplicated: if the same content is already stored, the new copy is deleted and the stored
+    one reused. Returns (photo id, sha256, True if an existing photo was reused).
+
+    With pending=True a new photo is kept out of the hash index until publish_photos is called,
+    so that, until then, discard_pending_photos can delete it without another upload depending on it.
+    """
+    digest = hashlib.sha256()
+    new_id = ObjectId()
+    with fs.new_file(_id=new_id, filename=filename) as grid_in:
+        while chunk := stream.read(DEFAULT_CHUNK_SIZE):
+            digest.update(chunk)
+            grid_in.write(chunk)
+    sha256 = digest.hexdigest()
+
+    photo_id = find_photo(fs, sha256)
+    if photo_id is None:
+        if pending:
+            files.update_one({"_id": new_id}, {"$set": {PHOTO_PENDING_HASH_FIELD: sha256}})
+            return new_id, sha256, False
+        try:
+            files.update_one({"_id": new_id}, {"$set": {PHOTO_HASH_FIELD: sha256}})
+            return new_id, sha256, False
+        except DuplicateKeyError:
+            # Stored by a concurrent upload since the lookup
+            photo_id = find_photo(fs, sha256)
+
+    fs.delete(new_id)
+    return photo_id, sha256, True
+
+
+def publish_photos(fs: GridFS, files: Collection, photos: list) -> list:
+    """
+    Move the pending photos among these photo entries ({"photo_id", "sha256", ...}) into the hash
+    index, making them reusable by other uploads. A photo whose content was published by another
+    upload in the meantime is replaced by that one and deleted. Returns the entries with their final ids.
+    """
+    published = []
+    for photo in photos:
+        photo_id = photo["photo_id"]
+        try:
+            files.update_one(
+                {"_id": photo_id, PHOTO_PENDING_HASH_FIELD: photo["sha256"]},
+                {"$set": {PHOTO_HASH_FIELD: photo["sha256"]}, "$unset": {PHOTO_PENDING_HASH_FIELD: ""}}
+            )
+        except DuplicateKeyError:
+            # Still pending, so nothing but this upload knows the photo
+            existing = find_photo(fs, photo["sha256"])
+            fs.delete(photo_id)
+            photo = {**photo, "photo_id": existing}
+        published.append(photo)
+    return published
+
+
+# Delete the photos of a failed upload that are still pending (published photos may be in use elsewhere)
+def discard_pending_photos(fs: GridFS, files: Collection, photo_ids: list) -> int:
+    discarded = 0
+    for file in files.find({"_id": {"$in": list(photo_ids)}, PHOTO_PENDING_HASH_FIELD: {"$exists": True}}, {"_id": 1}):
+        try:
+            fs.delete(file["_id"])
+            discarded += 1
+        except Exception as e:
+            print(f"DEBUG: Could not delete photo {file['_id']} of a failed upload: {e}")
+    return discarded
+
+
+# SHA-256 of a GridFS file, read chunk by chunk
+def gridfs_sha256(grid_out) -> str:
+    digest = hashlib.sha256()
+    for chunk in grid_out:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def backfill_photo_hashes(fs: GridFS, files: Collection, uploads: Collection, aliases: Collection) -> dict:
+    """
+    Give report photos stored before content hashing their hash.
+
+    Photos whose content is already stored under another file are merged: the reports using the
+    duplicate are pointed at the stored file and the duplicate is deleted, leaving an alias from
+    its id to the stored file (photo URLs are cached as immutable). Safe to run repeatedly.
+    """
+    result = {"hashed": 0, "merged": 0, "errors": 0}
+    photo_ids = set(uploads.distinct("photos.photo_id"))
+    for file in files.find({"_id": {"$in": list(photo_ids)}, PHOTO_HASH_FIELD: {"$exists": False}}, {"_id": 1}):
+        photo_id = file["_id"]
+        try:
+            sha256 = gridfs_sha256(fs.get(photo_id))
+            existing = find_photo(fs, sha256)
+            if existing is None:
+                try:
+                    files.update_one({"_id": photo_id}, {"$set": {PHOTO_HASH_FIELD: sha256}})
+                    result["hashed"] += 1
+                    continue
+                except DuplicateKeyError:
+                    # Stored by an upload since the lookup; merge into that one
+                    existing = find_photo(fs, sha256)
+
+            aliases.update_one({"_id": photo_id}, {"$set": {"photo_id": existing}}, upsert=True)
+            for doc in uploads.find({"photos.photo_id": photo_id}, {"photos": 1}):
+                photos = [{**photo, "photo_id": existing} if photo.get("photo_id") == photo_id else photo
+                          for photo in doc["photos"]]
+                uploads.update_one({"_id": doc["_id"]}, {"$set": {"photos": photos}})
+            fs.delete(photo_id)
+            result["merged"] += 1
+        except Exception as e:
+            print(f"DEBUG: Could not hash photo {photo_id}: {e}")
+            result["errors"] += 1
+    return result
@@ -0,0 +1,338 @@
+import os
+import uuid
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from pymongo.collection import Collection
+from pymongo.errors import DuplicateKeyError
+
+from src.pdf.render_pool import RENDER_TIMEOUT_SECONDS
+
+
+# Render job queue (overridable from the environment / .env)
+RENDER_QUEUE_ENABLED = os.getenv("RENDER_QUEUE_ENABLED", "false").lower() in ("1", "true", "yes")
+RENDER_QUEUE_WORKERS = int(os.getenv("RENDER_QUEUE_WORKERS", "2"))    # 0: only separate render_worker processes render
+RENDER_JOB_LEASE_SECONDS = float(os.getenv("RENDER_JOB_LEASE_SECONDS", "60"))
+RENDER_JOB_MAX_ATTEMPTS = int(os.getenv("RENDER_JOB_MAX_ATTEMPTS", "3"))
+RENDER_JOB_RETRY_SECONDS = float(os.getenv("RENDER_JOB_RETRY_SECONDS", "5"))    # doubled after every failed attempt
+RENDER_JOB_RETRY_MAX_SECONDS = float(os.getenv("RENDER_JOB_RETRY_MAX_SECONDS", "300"))
+RENDER_JOB_WAIT_SECONDS = float(os.getenv("RENDER_JOB_WAIT_SECONDS", str(RENDER_TIMEOUT_SECONDS + 60)))
+RENDER_JOB_KEEP_HOURS = float(os.getenv("RENDER_JOB_KEEP_HOURS", "24"))    # finished jobs are removed after this
+RENDER_JOB_DEAD_SECONDS = float(os.getenv("RENDER_JOB_DEAD_SECONDS", "300"))    # a dead-lettered PDF fails fast this long
+
+# Priority lanes, claimed lowest first
+PRIORITY_INTERACTIVE = 0    # somebody is waiting for the PDF (view / download)
+PRIORITY_BULK = 10          # bulk ZIPs and export jobs
+PRIORITY_PRERENDER = 20     # cache warming after an upload or a stale hit
+PRIORITY_LANES = {"interactive": PRIORITY_INTERACTIVE, "bulk": PRIORITY_BULK, "prerender": PRIORITY_PRERENDER}
+
+
+class RenderJobFailed(Exception):
+    """The render job for a PDF was dead-lettered after failing RENDER_JOB_MAX_ATTEMPTS times."""
+
+
+class RenderQueue:
+    """
+    Durable queue of render jobs in a Mongo collection, shared by every API replica and render worker.
+
+    There is at most one open job per cache key: queueing the same PDF again joins the existing job
+    (raising its priority if needed). A job carries a snapshot of what it renders, given when it is
+    queued. Workers claim the most urgent job atomically and hold a lease on it while they render; a
+    job whose worker stopped heartbeating (e.g. crashed) is claimed again. Failed attempts are retried
+    with exponential backoff, and a job that fails max_attempts times is dead-lettered: it keeps its
+    cache key for dead_seconds, so requests for that PDF fail fast instead of starting the same failing
+    render again; after that the next request queues a new job. Dead letters are kept for keep_hours.
+    """
+
+    def __init__(self, collection: Collection, lease_seconds: float = RENDER_JOB_LEASE_SECONDS,
+                 max_attempts: int = RENDER_JOB_MAX_ATTEMPTS, retry_seconds: float = RENDER_JOB_RETRY_SECONDS,
+                 retry_max_seconds: float = RENDER_JOB_RETRY_MAX_SECONDS, keep_hours: float = RENDER_JOB_KEEP_HOURS,
+                 dead_seconds: float = RENDER_JOB_DEAD_SECONDS):
+        self.collection = collection
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.keep_hours = keep_hours
+        self.dead_seconds = dead_seconds
+        # Wakes up waiters and idle workers in this process (other processes poll)
+        self._changed = threading.Condition()
+
+    # "slot" holds the cache key while a job is open (queued, running or dead)
+    def ensure_indexes(self):
+        self.collection.create_index("slot", unique=True, partialFilterExpression={"slot": {"$exists": True}})
+        self.collection.create_index([("status", 1), ("priority", 1), ("created_at", 1)])
+        self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def _notify(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    # Block for up to `seconds` or until a job is queued or finished in this process
+    def wait_for_change(self, seconds: float):
+        with self._changed:
+            self._changed.wait(seconds)
+
+    # Queue a render (or join the open job for the same PDF) and return the job;
+    # snapshot is what the worker renders (see rendering.process_render_job)
+    def enqueue(self, cache_key: str, report_name: str, priority: int = PRIORITY_INTERACTIVE,
+                snapshot: dict = None) -> dict:
+        now = datetime.now(timezone.utc)
+        # A dead letter past its fail-fast period gives the PDF's slot up to a new job
+        self.collection.update_one({"slot": cache_key, "status": "dead", "dead_until": {"$lte": now}},
+                                   {"$unset": {"slot": ""}})
+        for attempt in range(2):
+            try:
+                job = self.collection.find_one_and_update(
+                    {"slot": cache_key},
+                    {
+                        "$min": {"priority": priority},
+                        "$setOnInsert": {
+                            "cache_key": cache_key, "report_name": report_name, "status": "queued",
+                            "attempts": 0, "errors": [], "created_at": now, "not_before": now,
+                            "snapshot": snapshot,
+                        },
+                    },
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+                break
+            except DuplicateKeyError:
+                # Another replica inserted the job first; the second try joins it
+                if attempt:
+                    raise
+        self._notify()
+        return job
+
+    def claim(self, worker_id: str, max_priority: int = None) -> dict:
+        """
+        Take the most urgent job that is due (or whose lease expired) and lease it to worker_id.
+        Jobs that already used up their attempts (their workers kept dying) are dead-lettered instead.
+        """
+        while True:
+            now = datetime.now(timezone.utc)
+            query = {"$or": [
+                {"status": "queued", "not_before": {"$lte": now}},
+                {"status": "running", "lease_until": {"$lt": now}},
+            ]}
+            if max_priority is not None:
+                query["priority"] = {"$lte": max_priority}
+
+            job = self.collection.find_one_and_update(
+                query,
+                {
+                    "$set": {"status": "running", "worker": worker_id, "started_at": now,
+                             "lease_until": now + timedelta(seconds=self.lease_seconds)},
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("priority", 1), ("created_at", 1)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if job is None or job["attempts"] <= self.max_attempts:
+                return job
+            self._dead_letter(job, "Render worker stopped responding")
+
+    # Extend the lease on a job; False if it expired and another worker claimed it
+    def heartbeat(self, job: dict) -> bool:
+        result = self.collection.update_one(
+            {"_id": job["_id"], "status": "running", "worker": job["worker"]},
+            {"$set": {"lease_until": datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)}}
+        )
+        return result.matched_count == 1
+
+    def complete(self, job: dict):
+        now = datetime.now(timezone.utc)
+        self.collection.update_one(
+            {"_id": job["_id"], "worker": job["worker"]},
+            {
+                "$set": {"status": "done", "finished_at": now, "expires_at": now + timedelta(hours=self.keep_hours)},
+                "$unset": {"slot": "", "lease_until": ""},
+            }
+        )
+        self._notify()
+
+    # Retry the job after an exponential backoff, or dead-letter it once it is out of attempts
+    def fail(self, job: dict, error: str):
+        if job["attempts"] >= self.max_attempts:
+            self._dead_letter(job, error)
+            return
+
+        delay = min(self.retry_seconds * 2 ** (job["attempts"] - 1), self.retry_max_seconds)
+        self.collection.update_one(
+            {"_id": job["_id"], "worker": job["worker"]},
+            {
+                "$set": {"status": "queued", "not_before": datetime.now(timezone.utc) + timedelta(seconds=delay)},
+                "$unset": {"lease_until": ""},
+                "$push": {"errors": error},
+            }
+        )
+        print(f"DEBUG: Render of {job['report_name']} failed (attempt {job['attempts']}), retrying in {delay:.0f}s")
+        self._notify()
+
+    def _dead_letter(self, job: dict, error: str):
+        now = datetime.now(timezone.utc)
+        self.collection.update_one(
+            {"_id": job["_id"], "worker": job["worker"]},
+            {
+                "$set": {"status": "dead", "finished_at": now,
+                         "dead_until": now + timedelta(seconds=self.dead_seconds),
+                         "expires_at": now + timedelta(hours=self.keep_hours)},
+                "$unset": {"lease_until": ""},
+                "$push": {"errors": error},
+            }
+        )
+        print(f"DEBUG: Render of {job['report_name']} dead-lettered after {job['attempts']} attempts: {error}")
+        self._notify()
+
+    # Give a dead-lettered job a fresh set of attempts (unless a newer job took over its PDF)
+    def requeue(self, job_id: ObjectId) -> bool:
+        now = datetime.now(timezone.utc)
+        result = self.collection.update_one(
+            {"_id": job_id, "status": "dead", "slot": {"$exists": True}},
+            {"$set": {"status": "queued", "attempts": 0, "not_before": now},
+             "$unset": {"finished_at": "", "dead_until": "", "expires_at": ""}}
+        )
+        self._notify()
+        return result.modified_count == 1
+
+    def wait(self, job_id: ObjectId, timeout: float = RENDER_JOB_WAIT_SECONDS) -> dict:
+        """
+        Wait until the job is done and return it. Raises RenderJobFailed if it is dead-lettered
+        and TimeoutError if it does not finish within `timeout` seconds.
+        """
+        deadline = datetime.now(timezone.utc) + timedelta(seconds=timeout)
+        delay = 0.05
+        while True:
+            job = self.collection.find_one({"_id": job_id})
+            if job is None or job["status"] == "done":
+                return job
+            if job["status"] == "dead":
+                raise RenderJobFailed(f"Rendering {job['report_name']} failed {job['attempts']} times: {job['errors'][-1]}")
+
+            remaining = (deadline - datetime.now(timezone.utc)).total_seconds()
+            if remaining <= 0:
+                raise TimeoutError(f"Timed out waiting for the render of {job['report_name']}")
+            self.wait_for_change(min(delay, remaining))
+            delay = min(delay * 2, 1.0)
+
+    # Queue the render of a PDF, wait for it and return lookup() (the PDF from the cache)
+    def run(self, cache_key: str, report_name: str, lookup, priority: int = PRIORITY_INTERACTIVE,
+            snapshot: dict = None, timeout: float = RENDER_JOB_WAIT_SECONDS) -> bytes:
+        job = self.enqueue(cache_key, report_name, priority, snapshot)
+        self.wait(job["_id"], timeout)
+        pdf_bytes = lookup()
+        if pdf_bytes is None:
+            raise RuntimeError(f"Render job for {report_name} finished but its PDF is not in the cache")
+        return pdf_bytes
+
+    # Open jobs per status and priority lane, plus the dead letters
+    def stats(self) -> dict:
+        lanes = {priority: name for name, priority in PRIORITY_LANES.items()}
+        counts = {}
+        for row in self.collection.aggregate([
+            {"$match": {"status": {"$in": ["queued", "running", "dead"]}}},
+            {"$group": {"_id": {"status": "$status", "priority": "$priority"}, "count": {"$sum": 1}}},
+        ]):
+            lane = lanes.get(row["_id"]["priority"], str(row["_id"]["priority"]))
+            counts.setdefault(row["_id"]["status"], {})[lane] = row["count"]
+
+        dead = [
+            {
+                "job_id": str(job["_id"]), "report_name": job["report_name"], "cache_key": job["cache_key"],
+                "attempts": job["attempts"], "errors": job["errors"],
+                "finished_at": job["finished_at"].isoformat() if job.get("finished_at") else None,
+            }
+            for job in self.collection.find({"status": "dead"}).sort("finished_at", -1).limit(50)
+        ]
+        return {
+            "lease_seconds": self.lease_seconds,
+            "max_attempts": self.max_attempts,
+            "jobs": counts,
+            "dead_letters": dead,
+        }
+
+
+class RenderQueueWorker:
+    """
+    Threads that claim jobs from a RenderQueue and pass them to handler(job), which renders the PDF
+    and stores it in the cache. The job's lease is heartbeated while the handler runs; an exception
+    from the handler counts as a failed attempt. With max_priority set only those lanes are served.
+    """
+
+    def __init__(self, queue: RenderQueue, handler, threads: int = RENDER_QUEUE_WORKERS,
+                 max_priority: int = None, idle_seconds: float = 1.0):
+        self.queue = queue
+        self.handler = handler
+        self.threads = threads
+        self.max_priority = max_priority
+        self.idle_seconds = idle_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats = {"completed": 0, "failed": 0, "running": 0}
+
+    def _count(self, key: str, delta: int = 1):
+        with self._lock:
+            self._stats[key] += delta
+
+    def start(self):
+        for number in range(self.threads):
+            thread = threading.Thread(target=self._loop, name=f"render-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        self.queue._notify()
+        for thread in self._threads:
+            thread.join(timeout=RENDER_TIMEOUT_SECONDS)
+        self._threads = []
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(self.worker_id, self.max_priority)
+            except Exception as e:
+                print(f"DEBUG: Could not claim a render job: {e}")
+                job = None
+            if job is None:
+                self.queue.wait_for_change(self.idle_seconds)
+                continue
+            self.process(job)
+
+    # Run one claimed job, heartbeating its lease from a side thread
+    def process(self, job: dict):
+        done = threading.Event()
+
+        def beat():
+            while not done.wait(self.queue.lease_seconds / 3):
+                try:
+                    if not self.queue.heartbeat(job):
+                        print(f"DEBUG: Lost the lease on render job {job['_id']}")
+                        return
+                except Exception as e:
+                    print(f"DEBUG: Render job heartbeat failed for {job['_id']}: {e}")
+
+        heartbeat = threading.Thread(target=beat, name=f"render-job-{job['_id']}", daemon=True)
+        heartbeat.start()
+        self._count("running")
+        try:
+            self.handler(job)
+        except Exception as e:
+            self._count("failed")
+            self.queue.fail(job, f"{type(e).__name__}: {e}")
+        else:
+            self._count("completed")
+            self.queue.complete(job)
+        finally:
+            self._count("running", -1)
+            done.set()
+            heartbeat.join()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"worker_id": self.worker_id, "threads": self.threads, **self._stats}
@@ -0,0 +1,41 @@
+# Standalone render worker: serves the render_jobs queue without running the API.
+# Scale render capacity separately from the API containers, e.g.
+#   uv run python -m src.api.render_worker --threads 4
+#   uv run python -m src.api.render_worker --lane interactive    (only view / download renders)
+import argparse
+import signal
+import threading
+from datetime import datetime
+
+from .rendering import render_pool, render_queue, process_render_job, ensure_render_indexes
+from .render_queue import RenderQueueWorker, RENDER_QUEUE_WORKERS, PRIORITY_LANES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render PDFs queued in the render_jobs collection.")
+    parser.add_argument("--threads", type=int, default=max(1, RENDER_QUEUE_WORKERS),
+                        help="jobs handled at the same time (renders run on the RENDER_WORKERS process pool)")
+    parser.add_argument("--lane", choices=list(PRIORITY_LANES), default=None,
+                        help="only claim jobs of this lane and the more urgent ones")
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    ensure_render_indexes()
+    render_pool.start()
+    worker = RenderQueueWorker(render_queue, process_render_job, threads=args.threads,
+                               max_priority=PRIORITY_LANES[args.lane] if args.lane else None)
+    worker.start()
+    print(f"[{datetime.now()}] Render worker {worker.worker_id} started ({args.threads} threads, lane: {args.lane or 'all'})")
+
+    stop.wait()
+    print(f"[{datetime.now()}] Stopping render worker {worker.worker_id}...")
+    worker.stop()
+    render_pool.shutdown()
+    print(f"[{datetime.now()}] Stopped: {worker.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+from datetime import datetime, timezone
+
+from src.pdf.render_pool import RenderPool
+
+from .mongo import uploads, cached_pdfs, render_jobs, fs
+from .pdf_cache import report_cache_key, ensure_cache_indexes, open_cached_pdf, store_cached_pdf
+from .photo_store import gridfs_sha256
+from .render_queue import RenderQueue
+
+
+# ---------------------------------------------------------
+# PDF rendering shared by the API (main.py) and standalone render workers (render_worker.py)
+# ---------------------------------------------------------
+
+# PDF render workers (size and recycling configured with RENDER_WORKERS / RENDER_MAX_JOBS_PER_WORKER)
+render_pool = RenderPool()
+
+# Durable render queue (RENDER_QUEUE_ENABLED), served by RenderQueueWorker threads of the API
+# and of `python -m src.api.render_worker` processes
+render_queue = RenderQueue(render_jobs)
+
+
+# Indexes of the PDF cache and the render queue
+def ensure_render_indexes():
+    ensure_cache_indexes(cached_pdfs)
+    render_queue.ensure_indexes()
+
+
+# ---------------------------------------------------------
+# Photos of a report, read from GridFS into memory for the renderer (photo name -> bytes)
+# ---------------------------------------------------------
+def load_report_photos(doc: dict) -> dict:
+    return {photo["photo_name"]: fs.get(photo["photo_id"]).read() for photo in doc.get("photos", [])}
+
+
+# ---------------------------------------------------------
+# Content hashes of a report's photos (photo name -> sha256).
+# Reports uploaded before photo hashes were recorded take the hash kept in the photo's fs.files
+# metadata; photos without one are hashed chunk by chunk, unless hash_missing is False (then None
+# is returned, so cheap paths like conditional requests never read photo bytes). The hashes found
+# are written back to the report, only into the entries still missing them.
+# ---------------------------------------------------------
+def report_photo_hashes(doc: dict, hash_missing: bool = True) -> dict:
+    photos = doc.get("photos", [])
+    missing = {photo["photo_id"] for photo in photos if not photo.get("sha256")}
+    if missing:
+        found = {
+            grid_out._id: grid_out.metadata["sha256"]
+            for grid_out in fs.find({"_id": {"$in": list(missing)}, "metadata.sha256": {"$exists": True}})
+        }
+        for photo_id in missing - found.keys():
+            if not hash_missing:
+                return None
+            found[photo_id] = gridfs_sha256(fs.get(photo_id))
+
+        filters = list(enumerate(found.items()))
+        uploads.update_one(
+            {"_id": doc["_id"]},
+            {"$set": {f"photos.$[p{i}].sha256": sha256 for i, (_, sha256) in filters}},
+            array_filters=[{f"p{i}.photo_id": photo_id, f"p{i}.sha256": None} for i, (photo_id, _) in filters],
+        )
+        for photo in photos:
+            if not photo.get("sha256"):
+                photo["sha256"] = found[photo["photo_id"]]
+
+    return {photo["photo_name"]: photo["sha256"] for photo in photos}
+
+
+# ---------------------------------------------------------
+# Cache key of a report (name + JSON content + photo content hashes + renderer version);
+# None when hash_missing is False and a photo would have to be read to hash it
+# ---------------------------------------------------------
+def report_doc_cache_key(doc: dict, hash_missing: bool = True) -> str:
+    photo_hashes = report_photo_hashes(doc, hash_missing)
+    if photo_hashes is None:
+        return None
+    return report_cache_key(doc["report_name"], doc["json_data"], photo_hashes)
+
+
+# ---------------------------------------------------------
+# What a render job renders: the report as it was when the job was queued
+# ---------------------------------------------------------
+def report_snapshot(doc: dict) -> dict:
+    return {"_id": doc["_id"], "json_data": doc["json_data"], "photos": doc.get("photos", [])}
+
+
+# ---------------------------------------------------------
+# Render a report on the render worker pool and store it in the PDF cache
+# ---------------------------------------------------------
+def render_and_cache_pdf(doc: dict, report_name: str, cache_key: str) -> bytes:
+    # Run PDF generator on the render worker pool (photos are passed in memory)
+    pdf_bytes = render_pool.render(doc["json_data"], report_name, load_report_photos(doc))
+
+    # Update last_generated timestamp
+    uploads.update_one(
+        {"_id": doc["_id"]},
+        {"$set": {"last_generated": datetime.now(timezone.utc)}}
+    )
+
+    store_cached_pdf(cached_pdfs, fs, cache_key, report_name, pdf_bytes)
+    return pdf_bytes
+
+
+# ---------------------------------------------------------
+# Handler for claimed render jobs (in-process workers and src/api/render_worker.py).
+# Returns only once the PDF is in the cache; anything else raises and counts as a failed attempt.
+# ---------------------------------------------------------
+def process_render_job(job: dict):
+    cache_key, report_name = job["cache_key"], job["report_name"]
+    if open_cached_pdf(cached_pdfs, fs, cache_key) is not None:
+        return
+
+    # The job renders the report it was queued for, even if the report changed since
+    doc = job.get("snapshot")
+    if doc is None:
+        # Queued before jobs carried their report: only the current report can be rendered
+        doc = uploads.find_one({"report_name": report_name})
+        if not doc or report_doc_cache_key(doc) != cache_key:
+            raise ValueError(f"Report {report_name} changed or was removed after the render was queued")
+
+    render_and_cache_pdf(doc, report_name, cache_key)
@@ -0,0 +1,193 @@
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from bson.binary import Binary
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.collection import Collection
+
+from .photo_store import is_sha256
+
+
+# Each chunk is stored as one Mongo document, which BSON caps at 16 MB; chunks stay well below that
+MAX_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Resumable upload sessions (overridable from the environment / .env)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+UPLOAD_SESSION_TTL_HOURS = float(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+UPLOAD_SESSION_MAX_MB = float(os.getenv("UPLOAD_SESSION_MAX_MB", "500"))
+
+
+# Byte ranges [start, end) covered by the received chunk numbers of a file
+def chunk_ranges(received: list, chunk_size: int, size: int) -> list:
+    ranges = []
+    for n in sorted(received):
+        start, end = n * chunk_size, min((n + 1) * chunk_size, size)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    return ranges
+
+
+class SessionFileReader:
+    """Read-only file object over the chunks of one file of an upload session, fetched one at a time."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._cursor, None)
+            if chunk is None:
+                break
+            self._buffer.extend(chunk["data"])
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+class UploadSessions:
+    """
+    Resumable uploads: a session lists the files of a report upload (its JSON and photos) and
+    receives them as numbered chunks of chunk_size bytes, in any order and as often as needed.
+    Each chunk is one document of a Mongo collection (so chunk_size is capped at
+    MAX_UPLOAD_CHUNK_SIZE) until the session is committed or expires; both the session and its
+    chunks carry the session's expiry, so Mongo's TTL monitor removes abandoned uploads.
+    Sessions expire ttl_hours after they are created.
+    """
+
+    def __init__(self, sessions: Collection, chunks: Collection, chunk_size: int = UPLOAD_CHUNK_SIZE,
+                 ttl_hours: float = UPLOAD_SESSION_TTL_HOURS, max_bytes: int = int(UPLOAD_SESSION_MAX_MB * 1024 * 1024)):
+        if not 0 < chunk_size <= MAX_UPLOAD_CHUNK_SIZE:
+            raise ValueError(f"Upload chunk size must be between 1 and {MAX_UPLOAD_CHUNK_SIZE} bytes, got {chunk_size}")
+        self.sessions = sessions
+        self.chunks = chunks
+        self.chunk_size = chunk_size
+        self.ttl_hours = ttl_hours
+        self.max_bytes = max_bytes
+
+    def ensure_indexes(self):
+        self.sessions.create_index("expires_at", expireAfterSeconds=0)
+        self.chunks.create_index([("session_id", ASCENDING), ("file_index", ASCENDING), ("n", ASCENDING)], unique=True)
+        self.chunks.create_index("expires_at", expireAfterSeconds=0)
+
+    def create(self, owner: str, files: list, options: dict) -> dict:
+        """
+        Start a session for files given as [{"name", "size", "sha256" (optional)}], exactly one of
+        them the report's .json. Raises ValueError when the list is invalid or too large.
+        """
+        if not isinstance(files, list) or not files:
+            raise ValueError("'files' must list the report JSON and its photos")
+        entries = []
+        for index, file in enumerate(files):
+            name = Path(str(file.get("name", "")) if isinstance(file, dict) else "").name
+            size = file.get("size") if isinstance(file, dict) else None
+            sha256 = file.get("sha256") if isinstance(file, dict) else None
+            if not name or not isinstance(size, int) or size < 0 or (sha256 is not None and not is_sha256(sha256)):
+                raise ValueError(f"File {index} needs a name, a size in bytes and optionally a sha256")
+            entries.append({
+                "index": index, "name": name, "size": size,
+                "sha256": sha256.lower() if sha256 else None,
+                "chunks": max(1, -(-size // self.chunk_size)),
+            })
+
+        if sum(1 for entry in entries if entry["name"].lower().endswith(".json")) != 1:
+            raise ValueError("Exactly one .json file is required")
+        if sum(entry["size"] for entry in entries) > self.max_bytes:
+            raise ValueError(f"Upload exceeds {self.max_bytes // (1024 * 1024)} MB")
+
+        now = datetime.now(timezone.utc)
+        session = {
+            "owner": owner,
+            "status": "open",
+            "files": entries,
+            "options": options,
+            "chunk_size": self.chunk_size,
+            "created_at": now,
+            "expires_at": now + timedelta(hours=self.ttl_hours),
+        }
+        session["_id"] = self.sessions.insert_one(session).inserted_id
+        return session
+
+    # The owner's unexpired session (the TTL monitor only runs about once a minute)
+    def get(self, session_id: str, owner: str) -> dict:
+        if not ObjectId.is_valid(session_id):
+            return None
+        session = self.sessions.find_one({"_id": ObjectId(session_id), "owner": owner})
+        if session is None:
+            return None
+        expires_at = session["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return session if expires_at > datetime.now(timezone.utc) else None
+
+    def put_chunk(self, session: dict, file_index: int, n: int, data: bytes):
+        """Store chunk n of a file (sending it again replaces it). Raises ValueError if it does not fit the file."""
+        if not 0 <= file_index < len(session["files"]):
+            raise ValueError(f"No file {file_index} in this session")
+        file = session["files"][file_index]
+        if not 0 <= n < file["chunks"]:
+            raise ValueError(f"File {file_index} has chunks 0 to {file['chunks'] - 1}")
+        expected = min(session["chunk_size"], file["size"] - n * session["chunk_size"])
+        if len(data) != expected:
+            raise ValueError(f"Chunk {n} of file {file_index} must be {expected} bytes, got {len(data)}")
+
+        self.chunks.update_one(
+            {"session_id": session["_id"], "file_index": file_index, "n": n},
+            {"$set": {"data": Binary(data), "expires_at": session["expires_at"]}},
+            upsert=True
+        )
+
+    # Received byte ranges and missing chunk numbers per file
+    def progress(self, session: dict) -> list:
+        received = {}
+        for chunk in self.chunks.find({"session_id": session["_id"]}, {"file_index": 1, "n": 1}):
+            received.setdefault(chunk["file_index"], []).append(chunk["n"])
+
+        progress = []
+        for file in session["files"]:
+            chunks = set(received.get(file["index"], []))
+            progress.append({
+                "index": file["index"],
+                "name": file["name"],
+                "size": file["size"],
+                "chunks": file["chunks"],
+                "received_ranges": chunk_ranges(chunks, session["chunk_size"], file["size"]),
+                "missing_chunks": [n for n in range(file["chunks"]) if n not in chunks],
+            })
+        return progress
+
+    # Take the session for its commit; None if it is already being committed
+    def begin_commit(self, session: dict) -> dict:
+        return self.sessions.find_one_and_update(
+            {"_id": session["_id"], "status": "open"},
+            {"$set": {"status": "committing"}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    # Reopen a session whose commit failed, so it can be fixed and committed again
+    def abort_commit(self, session: dict):
+        self.sessions.update_one({"_id": session["_id"]}, {"$set": {"status": "open"}})
+
+    def open_file(self, session: dict, file_index: int) -> SessionFileReader:
+        return SessionFileReader(
+            self.chunks.find({"session_id": session["_id"], "file_index": file_index}).sort("n", ASCENDING)
+        )
+
+    def delete(self, session: dict):
+        self.chunks.delete_many({"session_id": session["_id"]})
+        self.sessions.delete_one({"_id": session["_id"]})
+
+    def session_json(self, session: dict) -> dict:
+        return {
+            "session_id": str(session["_id"]),
+            "status": session["status"],
+            "chunk_size": session["chunk_size"],
+            "expires_at": session["expires_at"].isoformat(),
+            "files": self.progress(session),
+        }
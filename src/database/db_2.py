@@ -1,11 +1,13 @@
 from pymongo import MongoClient
 from bson.objectid import ObjectId
 from bson.binary import Binary
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 import json
 import gridfs
 
+from src.api.photo_store import store_photo_stream
+
 BASE_DIR = Path(__file__).parent.parent.parent
 TEMP_DIR = BASE_DIR / "temp"
 
@@ -44,9 +46,10 @@ def extract_included_files(json_file_path: Path):
 # -------------------------------
 # Checks for dublicates in the database
 # -------------------------------
-def store_photo_dedup(fs: gridfs.GridFS, file_path: Path):
+def store_photo_dedup(fs: gridfs.GridFS, files, file_path: Path):
     """
-    Store a photo in GridFS with deduplication.
+    Store a photo in GridFS with deduplication (same as API uploads, see src/api/photo_store.py).
+    Photos are matched on the SHA-256 of their content (kept in fs.files metadata), whatever their name.
     Returns the ObjectId of the stored (or reused) file.
     """
     path = Path(file_path)
@@ -54,22 +57,13 @@ def store_photo_dedup(fs: gridfs.GridFS, file_path: Path):
         raise FileNotFoundError(f"File not found: {file_path}")
 
     with open(path, "rb") as f:
-        new_data = f.read()
-
-    # Check for files with the same name
-    existing_files = fs.find({"filename": path.name})
-
-    for ef in existing_files:
-        existing_data = fs.get(ef._id).read()
-        if existing_data == new_data:
-            # File content matches, reuse ObjectId
-            print(f"[Dedup] Reusing existing file for {path.name}")
-            return ef._id
+        photo_id, _, reused = store_photo_stream(fs, files, f, path.name)
 
-    # No match found, store as new
-    new_id = fs.put(new_data, filename=path.name)
-    print(f"[Dedup] Stored new file for {path.name} with ObjectId {new_id}")
-    return new_id
+    if reused:
+        print(f"[Dedup] Reusing existing file for {path.name}")
+    else:
+        print(f"[Dedup] Stored new file for {path.name} with ObjectId {photo_id}")
+    return photo_id
 
 # -------------------------------
 # Add or update a report entry with photos stored in GridFS
@@ -96,7 +90,7 @@ def add_or_update_report_entry(
     photos_data = []
     for file_path in include_files:
         try:
-            photo_id = store_photo_dedup(fs, Path(file_path))
+            photo_id = store_photo_dedup(fs, uploads_collection.database["fs.files"], Path(file_path))
             photos_data.append({
                 "photo_name": Path(file_path).name,
                 "photo_id": photo_id
@@ -113,12 +107,12 @@ def add_or_update_report_entry(
             "uploaded_by": uploaded_by,
             "tags": tags,
             "notes": notes,
-            "last_modified": datetime.now(),
+            "last_modified": datetime.now(timezone.utc),
             "version": version
         },
          "$setOnInsert": {
-             "date_added": datetime.now(),
-             "last_generated": datetime.now()
+             "date_added": datetime.now(timezone.utc),
+             "last_generated": datetime.now(timezone.utc)
          }
         },
         upsert=True
@@ -6,19 +6,149 @@ from PIL import Image
 import json
 from PyPDF2 import PdfReader
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase.pdfdoc import PDFImageXObject
+from reportlab.lib.utils import ImageReader
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.pdfmetrics import stringWidth
 import math
 import sys
 import os
+import copy
+import time
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
 from icecream import ic
 
 
-# Resize image based on max height and/or width
-def resize_image(filename: str, max_height: float = None, max_width: float = None):
-    original_width, original_height = Image.open(filename).size
+class ImageCache:
+    """
+    Bounded LRU cache of image dimensions and encoded PDF image objects, keyed by content hash.
+
+    The same photo (or the header logo) used on several pages, sources or reports is only
+    read, decoded and encoded once per process. Entries are evicted once `max_bytes` is exceeded.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # content hash -> {"size", "xobject", "bytes"}
+        self._hashes = OrderedDict()  # (path, mtime, size) -> content hash
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # Content hash of a file (files that did not change on disk are not read again)
+    def _content_hash(self, filename: str) -> str:
+        stat = os.stat(filename)
+        file_key = (filename, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            digest = self._hashes.get(file_key)
+            if digest is not None:
+                self._hashes.move_to_end(file_key)
+                return digest
+
+        with open(filename, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+
+        with self._lock:
+            self._hashes[file_key] = digest
+            while len(self._hashes) > 1024:
+                self._hashes.popitem(last=False)
+        return digest
+
+    def _entry(self, filename: str, data: bytes = None) -> dict:
+        digest = hashlib.sha256(data).hexdigest() if data is not None else self._content_hash(filename)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Only the header is read here, pixels are decoded when the PDF object is built
+        with Image.open(BytesIO(data) if data is not None else filename) as image:
+            entry = {"size": image.size, "xobject": None, "bytes": 0}
+
+        with self._lock:
+            return self._entries.setdefault(digest, entry)
+
+    # (width, height) of the image in pixels; data is given for in-memory photos
+    def size(self, filename: str, data: bytes = None) -> tuple:
+        return self._entry(filename, data)["size"]
+
+    # Encoded image object, built the same way canvas.drawImage builds it from a file
+    @staticmethod
+    def _build_xobject(filename: str, data: bytes = None) -> PDFImageXObject:
+        if data is None:
+            return PDFImageXObject(None, filename)
+
+        xobject = PDFImageXObject(None)
+        extension = os.path.splitext(filename)[1].lower()
+        if not (extension in ('.jpg', '.jpeg') and xobject.loadImageFromJPEG(BytesIO(data))):
+            xobject.loadImageFromA85(BytesIO(data))
+        return xobject
+
+    def xobject(self, filename: str, data: bytes = None) -> PDFImageXObject:
+        entry = self._entry(filename, data)
+        if entry["xobject"] is None:
+            xobject = self._build_xobject(filename, data)
+            with self._lock:
+                if entry["xobject"] is None:
+                    entry["xobject"] = xobject
+                    entry["bytes"] = len(xobject.streamContent)
+                    self._bytes += entry["bytes"]
+                    self._evict()
+        return entry["xobject"]
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry["bytes"]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "images_cached": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# drawImage (even with an ImageReader) re-encodes images for every document. Registering a cached
+# encoded image under the name drawImage(filename) looks images up by makes it reuse that one instead.
+# This relies on reportlab internals (canvas._doc, _digester, _setXObjects): reportlab is pinned to
+# <4.5 and test_register_cached_image_matches_draw_image checks the registration against the installed
+# version. Returns False, registering nothing, when the internals are not there; callers then draw
+# the image with plain drawImage. get_xobject is only called when the image is not registered yet.
+def register_cached_image(pdf: canvas.Canvas, filename: str, get_xobject) -> bool:
+    try:
+        from reportlab.pdfgen.canvas import _digester
+
+        doc = pdf._doc
+        name = _digester(f"{filename}{None}")
+        reg_name = doc.getXObjectName(name)
+        if reg_name not in doc.idToObject:
+            xobject = copy.copy(get_xobject())
+            xobject.name = name
+            pdf._setXObjects(xobject)
+            doc.Reference(xobject, reg_name)
+            doc.addForm(name, xobject)
+        return True
+    except (ImportError, AttributeError, TypeError):
+        return False
+
+
+# Resize image based on max height and/or width (data is given for in-memory photos)
+def resize_image(filename: str, max_height: float = None, max_width: float = None, data: bytes = None):
+    original_width, original_height = IMAGE_CACHE.size(filename, data)
 
     if max_height and max_width:
         width_ratio = original_width / max_width
@@ -83,23 +213,45 @@ def page_count(pdf_path):
 
 # Processes text for placement on PDF
 def process_text(input_text: str, line_length: int, max_lines: int, return_lines: bool = False):
-    words = input_text.split()
+    lines = wrap_text(input_text, line_length, max_lines)
+    return list(lines) if return_lines else len(lines)
+
+
+# Wraps text into at most max_lines lines in a single pass over the words. line_length is a number
+# of characters, or a width in points measured with stringWidth when font and font_size are given.
+# Results are memoized per (text, length, lines, font, size), so the height pass and the drawing pass
+# share one layout. The report fields wrap by character count: their limits were tuned to the boxes
+# they are drawn in, and the reference PDFs in src/tests/comparison depend on that line breaking.
+@lru_cache(maxsize=4096)
+def wrap_text(input_text: str, line_length: float, max_lines: int, font: str = None, font_size: float = None) -> tuple:
+    if font is None:
+        measure = len
+    else:
+        def measure(text):
+            return stringWidth(text, font, font_size)
+    space_length = measure(' ')
+
     lines = []
     current_line = []
+    current_length = 0
 
-    for word in words:
-        if len(' '.join(current_line + [word])) <= line_length:
+    for word in input_text.split():
+        word_length = measure(word)
+        candidate_length = current_length + space_length + word_length if current_line else word_length
+        if candidate_length <= line_length:
             current_line.append(word)
+            current_length = candidate_length
         else:
-            lines.append(' '.join(current_line).strip())
+            lines.append(' '.join(current_line))
             current_line = [word]
+            current_length = word_length
             if len(lines) == max_lines:
                 break  # Stop if max_lines is reached
 
     if current_line and len(lines) < max_lines:
-        lines.append(' '.join(current_line).strip())
+        lines.append(' '.join(current_line))
 
-    return lines if return_lines else len(lines)
+    return tuple(lines)
 
 
 # Splits text into lines
@@ -119,28 +271,22 @@ def check_length(text: str, max_length: int, add_ellipsis: bool = False):
     return text
 
 
-# Checks for images and returns default if not found
-def resolve_image_file(filename: str) -> str:
-    if filename == DEFAULT_IMAGE:
-        return DEFAULT_IMAGE
+class DirectoryPhotoProvider:
+    """
+    Photo provider that reads report photos from a directory (TEMP_DIR for the command line tools).
 
-    temp_file = TEMP_DIR / filename
-    include_file = INCLUDES_DIR / filename
-
-    if temp_file.is_file():
-        return str(temp_file)
-    #elif include_file.is_file():
-        #return str(include_file)
-    else:
-        ic(f"[Warning] Image '{filename}' not found in TEMP_DIR or INCLUDES_DIR ({temp_file}). Using default image.")
-        return DEFAULT_IMAGE
+    A photo provider is anything with `get(name) -> bytes | None`; the API passes a dict of photos
+    loaded from GridFS instead.
+    """
 
+    def __init__(self, directory):
+        self.directory = Path(directory)
 
-# Set Default
-def set_default():
-    pdf.setFont(DEFAULT_FONT, DEFAULT_FONT_SIZE)
-    pdf.setLineWidth(DEFAULT_LINE_WIDTH)
-    pdf.setFillColorRGB(DEFAULT_COLOR[0], DEFAULT_COLOR[1], DEFAULT_COLOR[2])
+    def get(self, name: str):
+        if not name or Path(name).name != name:
+            return None
+        path = self.directory / name
+        return path.read_bytes() if path.is_file() else None
 
 
 # Check asset files exists
@@ -169,6 +315,10 @@ INCLUDES_DIR = BASE_DIR / "includes"
 JSON_DIR = BASE_DIR / "src" / "tests"
 TEMP_DIR = BASE_DIR / "temp"
 
+# Version of the report layout and drawing code. Bump it whenever a change alters the rendered PDF;
+# cached PDFs are keyed on it, so every PDF rendered by an older version stops being served.
+RENDERER_VERSION = "2025.1"
+
 # Page dimensions (in points, 1 pt = 1/72 inch)
 PAGE_HEIGHT = 792  # 11 inches
 PAGE_WIDTH = 612  # 8.5 inches
@@ -182,6 +332,9 @@ PAGE_HEIGHT_MIDDLE = PAGE_HEIGHT / 2
 
 SOURCE_TITLE_BLOCK_HEIGHT = 25
 
+# Blocks repeated at least this often in a document are drawn once as a form XObject
+FORM_MIN_USES = 3
+
 # Default
 DEFAULT_LINE_WIDTH = 0.25  # This was arbitrary but looks like what it was
 DEFAULT_COLOR = [0, 0, 0]  # Black
@@ -191,6 +344,16 @@ DEFAULT_ROW_SPACING = 14
 DEFAULT_IMAGE = str(INCLUDES_DIR / "ImageNotFound.jpg")
 MIN_LINES = 1  # minimum lines to prevent collapse
 
+# Sequence Text
+SHUTDOWN_SEQUENCE = ("1. Notify affected personnel. 2. Properly shut down machine. 3. Isolate all energy sources. "
+                     "4. Apply LOTO devices. 5. Verify total de-energization of all sources.")
+RESTART_SEQUENCE = ("1. Ensure all tools and items have been removed. 2. Confirm that all employees are safely "
+                    "located. 3. Verify that controls are in neutral. 4. Remove LOTO devices and reenergize "
+                    "machine. 5. Notify affected employees that servicing is complete.")
+
+# Decoded images kept per process (IMAGE_CACHE_MB in the environment)
+IMAGE_CACHE = ImageCache(int(float(os.getenv("IMAGE_CACHE_MB", "64")) * 1024 * 1024))
+
 
 def get_json_filename():
     """Get JSON filename from command line arguments or user input"""
@@ -220,758 +383,896 @@ def get_json_filename():
     return str(json_path)
 
 
-def initialize_pdf_generator(data_file):
-    """Initialize the PDF generator with the given data file"""
-    global data, pdf, file_name
+# Fonts used by the report (reportlab name -> file in includes/)
+REPORT_FONTS = {
+    'DM Serif Display': 'DMSerifDisplay_Regular.ttf',
+    'Inter': 'Inter_Regular.ttf',
+    'Times': 'times.ttf',
+    'Signature': 'Pacifico.ttf',
+}
+
+# Parsed fonts, shared by every render in this process (render threads share them through _FONT_LOCK)
+_FONT_CACHE = {}
+_FONT_PARSE_SECONDS = {}
+_FONT_LOCK = threading.Lock()
+FONT_STATS = {"parsed": 0, "reused": 0, "parse_seconds": 0.0, "parse_seconds_saved": 0.0}
+
+
+# Parse a font file once per process and return the cached TTFont afterwards
+def get_font(name: str) -> TTFont:
+    with _FONT_LOCK:
+        font = _FONT_CACHE.get(name)
+        if font is not None:
+            FONT_STATS["reused"] += 1
+            FONT_STATS["parse_seconds_saved"] += _FONT_PARSE_SECONDS[name]
+            return font
+
+        start = time.perf_counter()
+        font = TTFont(name, str(INCLUDES_DIR / REPORT_FONTS[name]))
+        elapsed = time.perf_counter() - start
+
+        _FONT_CACHE[name] = font
+        _FONT_PARSE_SECONDS[name] = elapsed
+        FONT_STATS["parsed"] += 1
+        FONT_STATS["parse_seconds"] += elapsed
+        return font
+
+
+# Register the report fonts with reportlab (each font file is only parsed on first use)
+def register_fonts():
+    registered = pdfmetrics.getRegisteredFontNames()
+    for name in REPORT_FONTS:
+        font = get_font(name)
+        if name not in registered or pdfmetrics.getFont(name) is not font:
+            pdfmetrics.registerFont(font)
+
+
+# Copy of the font cache counters for this process
+def font_cache_stats() -> dict:
+    with _FONT_LOCK:
+        return {
+            "fonts_cached": len(_FONT_CACHE),
+            "parsed": FONT_STATS["parsed"],
+            "reused": FONT_STATS["reused"],
+            "parse_seconds": round(FONT_STATS["parse_seconds"], 4),
+            "parse_seconds_saved": round(FONT_STATS["parse_seconds_saved"], 4),
+        }
+
 
+def initialize_pdf_generator(data_file):
+    """Load the given data file and make sure the fonts are available. Returns the data or None"""
     # Load data
     data = load_data(data_file)
     if data is None:
-        return False
-
-    # Creating PDF and setting document title
-    file_name = os.path.splitext(os.path.basename(data_file))[0]
-    pdf = canvas.Canvas(file_name + ".pdf", PAGE_SIZE)
-    pdf.setTitle(file_name)
+        return None
 
     # Registering Fonts
     try:
-        pdfmetrics.registerFont(TTFont('DM Serif Display', str(INCLUDES_DIR / 'DMSerifDisplay_Regular.ttf')))
-        pdfmetrics.registerFont(TTFont('Inter', str(INCLUDES_DIR / 'Inter_Regular.ttf')))
-        pdfmetrics.registerFont(TTFont('Times', str(INCLUDES_DIR / 'times.ttf')))
-        pdfmetrics.registerFont(TTFont('Signature', str(INCLUDES_DIR / 'Pacifico.ttf')))
+        register_fonts()
     except Exception as e:
         print_error(f"Error loading fonts: {e}")
-        return False
-
-    return True
-
-
-# Adds First Page
-def first_page() -> float:
-    bottom = add_header()
-    bottom = add_machine_info(bottom)
-    bottom = add_shutdown_sequence(bottom)
-
-    return bottom
-
-
-# Adds new Page (Including Source Titles)
-def new_page_title() -> float:
-    pdf.showPage()
-    bottom = add_header()
-    bottom = add_source_titles(bottom)
-
-    return bottom
-
-
-# Adds new Page (Excluding Source Titles)
-def new_page() -> float:
-    pdf.showPage()
-    bottom = add_header()
-
-    return bottom
-
-
-# Adds Header to current page
-def add_header() -> float:
-    # Sets default parameters for a clean slate
-    set_default()
-
-    # Page Title
-    page_title_font_size = 18
-    page_title_font = 'DM Serif Display'
-    page_title_line_spacing = 20
-    page_title_y = PAGE_HEIGHT - 54  # 0.75in
-
-    # Header Image
-    image_name = str(INCLUDES_DIR / 'CardinalLogo.png')
-    image_width = 144  # 2in
-    image_height = 72
-    image_height, image_width = resize_image(image_name, image_height, image_width)
-    image_x = PAGE_LEFT_MARGIN
-    image_y = page_title_y - image_height + page_title_line_spacing
-
-    # Header Field Options
-    row_spacing = 14
-    title_font = 'Times'
-    title_font_size = 10
-    body_font = 'Inter'
-    body_font_size = 9
-    body_line_spacing = 12
-
-    # Header Address Block
-    address = ['Cardinal Compliance Consultants', '5353 Secor Rd.', 'Toledo, OH 43623', 'P: 419-882-9224']
-    address_font = 'Times'
-    address_font_size = 9
-    address_line_spacing = 12
-    address_width = image_width
-
-    # Header Description
-    description_line_length = 78
-    description_line_limit = 5
-    description_height = num_lines(data.get('description', ''), description_line_length,
-                                   description_line_limit)
-
-    # Header Procedure Number
-    procedure_number_line_length = 16
-
-    # Header Facility
-    facility_line_length = 26
-    facility_line_limit = 5
-    facility_height = num_lines(data.get('facility', ''), facility_line_length,
-                                facility_line_limit)
-
-    # Header Location
-    location_line_length = 26
-    location_line_limit = 5
-    location_height = num_lines(data.get('location', ''), location_line_length,
-                                location_line_limit)
-
-    # Header Revision
-    revision_line_length = 6
-    revision_width = 60
-
-    # Row Offset for Dynamic Data Entry
-    row1_height = (len(address) * address_line_spacing + 2)  # Address Block
-    row2_height = (max(MIN_LINES, description_height) * body_line_spacing) + 2  # Description Row
-    row3_height = (max(MIN_LINES, facility_height, location_height) * body_line_spacing) + 2  # Facility Row
-
-    # Horizontal Lines (1 = top, 5 = bottom)
-    h_line1 = page_title_y + page_title_line_spacing
-    h_line2 = h_line1 - row_spacing
-    h_line3 = h_line2 - row1_height
-    h_line4 = h_line3 - row2_height
-    h_line5 = h_line4 - row3_height
-
-    # Vertical Lines (1 = left, 6 = Right)
-    v_line1 = PAGE_LEFT_MARGIN
-    v_line2 = PAGE_LEFT_MARGIN + ((USABLE_WIDTH - address_width) / 2) - (
-            revision_width / 2)
-    v_line3 = PAGE_RIGHT_MARGIN - address_width - revision_width
-    v_line4 = PAGE_RIGHT_MARGIN - address_width
-    v_line5 = PAGE_RIGHT_MARGIN - (address_width * (2 / 5))
-    v_line6 = PAGE_RIGHT_MARGIN
-
-    # Text Locations - Rows
-    row1_text = h_line1 - title_font_size
-    row2_text = h_line3 - title_font_size
-    row3_text = h_line4 - title_font_size
-
-    # Text Locations - Columns
-    horizonal_spacing = 3
-    column1_text = v_line1 + horizonal_spacing
-    column2_text = v_line2 + horizonal_spacing
-    column3_text = v_line3 + horizonal_spacing
-    column4_text = v_line4 + horizonal_spacing
-    column5_text = v_line4 + (address_width / 2)
-    column6_text = v_line5 + horizonal_spacing
-
-    # Header - Address Block Locations
-    address_block_x = column4_text
-    address_block_y = h_line2 - body_font_size
-
-    # Header - Description Location
-    description_x = column1_text + 53
-
-    # Header - Procedure Number Location
-    procedure_number_x = column4_text + 53
-
-    # Header - Facility Location
-    facility_x = column1_text + 37
-
-    # Header - Location
-    location_x = column2_text + 42
-
-    # Header - Revision Location
-    revision_x = column3_text + 20
-
-    # Header - Date Location
-    date_x = column4_text + 23
-
-    # Header - Origin Location
-    origin_x = column6_text + 30
-
-    # Creating Header Title
-    pdf.setFont(page_title_font, page_title_font_size)
-    pdf.drawCentredString(PAGE_WIDTH_MIDDLE, page_title_y, "LOCKOUT-TAGOUT")
-    pdf.drawCentredString(PAGE_WIDTH_MIDDLE, page_title_y - page_title_line_spacing, "PROCEDURE")
-    pdf.drawImage(image_name, image_x, image_y, image_width, image_height)
-
-    # Creating Header Field Outlines
-    pdf.setLineWidth(DEFAULT_LINE_WIDTH)
-
-    # Horizontal Outline Lines
-    pdf.line(v_line4, h_line1, v_line6, h_line1)
-    pdf.line(v_line4, h_line2, v_line6, h_line2)
-    pdf.line(v_line1, h_line3, v_line6, h_line3)
-    pdf.line(v_line1, h_line4, v_line6, h_line4)
-    pdf.line(v_line1, h_line5, v_line6, h_line5)
-    # Vertical Outline lines
-    pdf.line(v_line1, h_line3, v_line1, h_line5)
-    pdf.line(v_line4, h_line1, v_line4, h_line5)
-    pdf.line(v_line6, h_line1, v_line6, h_line5)
-    # Vertical Divider Lines
-    pdf.line(v_line2, h_line4, v_line2, h_line5)
-    pdf.line(v_line3, h_line4, v_line3, h_line5)
-    pdf.line(v_line5, h_line4, v_line5, h_line5)
-
-    # Creating Header Fields Titles
-    pdf.setFont(title_font, title_font_size)
-    pdf.drawCentredString(column5_text, row1_text, 'Developed By:')
-    pdf.drawString(column1_text, row2_text, 'Description:')
-    pdf.drawString(column1_text, row3_text, 'Facility:')
-    pdf.drawString(column2_text, row3_text, 'Location:')
-    pdf.drawString(column3_text, row3_text, 'Rev:')
-    pdf.drawString(column4_text, row2_text, 'Procedure #:')
-    pdf.drawString(column4_text, row3_text, 'Date:')
-    pdf.drawString(column6_text, row3_text, 'Origin:')
-
-    # Creating Header Field Text
-    pdf.setFont(body_font, body_font_size)
-    for line in range(description_height):
-        pdf.drawString(description_x, row2_text - (line * body_line_spacing),
-                       split_text(data.get('description', ''), description_line_length,
-                                  description_line_limit)[line])
-    pdf.drawString(procedure_number_x, row2_text,
-                   check_length(data.get('procedure_number', ''), procedure_number_line_length, False))
-    for line in range(facility_height):
-        pdf.drawString(facility_x, row3_text - (line * body_line_spacing),
-                       split_text(data.get('facility', ''), facility_line_length, facility_line_limit)[
-                           line])
-    for line in range(location_height):
-        pdf.drawString(location_x, row3_text - (line * body_line_spacing),
-                       split_text(data.get('location', ''), location_line_length, location_line_limit)[
-                           line])
-    pdf.drawString(revision_x, row3_text, data.get('revision', '')[0:revision_line_length])
-    pdf.setFont("Inter", 9)
-    pdf.drawString(date_x, row3_text, data.get('date', ''))
-    pdf.drawString(origin_x, row3_text, data.get('origin', ''))
-
-    # Creating the Address Block
-    pdf.setFont(address_font, address_font_size)
-    for line in range(len(address)):
-        pdf.drawString(address_block_x,
-                       address_block_y - (line * address_line_spacing),
-                       address[line])
-        if line > 3:
-            row1_height += address_font_size
-
-    # Return the bottom of this section for use as start of next
-    ic('Adding Header')
-    return h_line5
-
-
-# Adds Machine Info
-def add_machine_info(import_bottom: float = PAGE_MARGIN) -> float:
-    # Sets default parameters for a clean slate
-    set_default()
-
-    # Machine Info Formatting Options
-    row_spacing = 14
-    title_font = 'DM Serif Display'
-    title_font_size = 10
-    sub_title_font = 'Times'
-    sub_title_font_size = 10
-    body_font = 'Inter'
-    body_font_size = 9
-    body_line_spacing = 12
-
-    # Square Formatting Options
-    square_height = 40
-    square_width = square_height
-
-    # Isolation Points Formatting Options
-    isolation_point_title_font = 'DM Serif Display'
-    isolation_point_title_font_size = 16
-    isolation_points_font = 'Inter'
-
-    isolation_points = data.get('isolation_points', '0')
-    if len(isolation_points) <= 1:
-        isolation_points_font_size = 36
-    elif len(isolation_points) == 2:
-        isolation_points_font_size = 28
-    elif len(isolation_points) >= 3:
-        isolation_points_font_size = 20
-        isolation_points = isolation_points[:3]
-    else:
-        print_error("error with isolation_point font size")
-
-    # Lock Tag Formatting Options
-    lock_image_file = str(INCLUDES_DIR / 'LockTag.png')
-    lock_image_height = 40
-    lock_image_width = lock_image_height
-    lock_image_height, lock_image_width = resize_image(lock_image_file, lock_image_height, lock_image_width)
-
-    # Notes Formatting Options
-    notes_line_length = 60
-    notes_line_limit = 5
-    notes_height = num_lines(data.get('notes', ''), notes_line_length, notes_line_limit)
-
-    # Notes Block Height
-    if (notes_height * body_line_spacing + 2) > (row_spacing * 3):
-        row1_height = (notes_height * body_line_spacing + 2)
-    else:
-        row1_height = (row_spacing * 3)
-
-    # Machine Image Formatting Options
-    machine_image_file = resolve_image_file(data.get('machine_image', DEFAULT_IMAGE))
-    ic(f"Machine_image_file: {machine_image_file}")
-
-    h_line1 = import_bottom - DEFAULT_ROW_SPACING
-    h_line2 = h_line1 - row_spacing
-    h_line3 = h_line2 - (3.5 * row_spacing)
-    h_line4 = h_line3 - row_spacing
-    h_line5 = h_line4 - row1_height
-
-    v_line1 = PAGE_LEFT_MARGIN
-    v_line2 = PAGE_WIDTH_MIDDLE
-    v_line3 = PAGE_RIGHT_MARGIN
-
-    vertical_text_spacing = 3
-    row1_text = h_line1 - title_font_size
-    row2_text = (h_line1 - ((h_line1 - h_line3) / 2)) + (isolation_point_title_font_size / 2) - vertical_text_spacing
-    row3_text = (h_line1 - ((h_line1 - h_line3) / 2)) - (isolation_points_font_size / 3)
-    row4_text = (h_line1 - ((h_line1 - h_line3) / 2)) - isolation_point_title_font_size + vertical_text_spacing
-    row5_text = h_line3 - title_font_size
-    row6_text = h_line4 - title_font_size
-
-    horizontal_text_spacing = 3
-    horizontal_image_spacing = 10
-    column1_text = (v_line1 + ((v_line2 - v_line1) / 2))
-    column2_text = v_line2 + horizontal_text_spacing
-    column3_text = v_line2 + horizontal_image_spacing + (lock_image_width / 2)
-    column4_text = v_line2 + lock_image_width + square_width + (3 * horizontal_image_spacing)
-    column5_text = (v_line2 + ((v_line3 - v_line2) / 2))
-
-    # Horizontal Lines
-    pdf.line(v_line1, h_line1, v_line3, h_line1)
-    pdf.line(v_line1, h_line2, v_line2, h_line2)
-    pdf.line(v_line2, h_line3, v_line3, h_line3)
-    pdf.line(v_line2, h_line4, v_line3, h_line4)
-    pdf.line(v_line1, h_line5, v_line3, h_line5)
-
-    # Vertical Lines
-    pdf.line(v_line1, h_line1, v_line1, h_line5)
-    pdf.line(v_line2, h_line1, v_line2, h_line5)
-    pdf.line(v_line3, h_line1, v_line3, h_line5)
-
-    # Titles
-    pdf.setFont(title_font, title_font_size)
-    pdf.drawCentredString(column1_text, row1_text, 'Machine to be Locked Out')
-    pdf.setFont(sub_title_font, sub_title_font_size)
-    pdf.drawCentredString(column5_text, row5_text, 'Notes:')
-    pdf.setFont(isolation_point_title_font, isolation_point_title_font_size)
-    pdf.drawString(column4_text, row2_text, 'Isolation Points to be')
-    pdf.drawString(column4_text, row4_text, 'Locked and Tagged')
-
-    # Square
-    square_left = v_line2 + horizontal_image_spacing
-    square_right = square_left + square_width
-    square_top = (h_line1 - ((h_line1 - h_line3) / 2)) + (square_height / 2)
-    square_bottom = square_top - square_height
-    pdf.line(square_left, square_top, square_right, square_top)
-    pdf.line(square_right, square_top, square_right, square_bottom)
-    pdf.line(square_right, square_bottom, square_left, square_bottom)
-    pdf.line(square_left, square_bottom, square_left, square_top)
-
-    # Lock Tag Image
-    pdf.drawImage(lock_image_file, square_right + horizontal_image_spacing,
-                  (h_line1 - ((h_line1 - h_line3) / 2)) - (lock_image_height / 2), lock_image_width, lock_image_height)
-
-    # Isolation Points
-    pdf.setFont(isolation_points_font, isolation_points_font_size)
-    pdf.drawCentredString(column3_text, row3_text, isolation_points)
-
-    # Notes Text
-    pdf.setFont(body_font, body_font_size)
-    notes = split_text(data.get('notes', ''), notes_line_length, notes_line_limit)
-    for line in range(len(notes)):
-        pdf.drawString(column2_text, row6_text - (line * body_line_spacing), notes[line])
-
-    # Machine Image
-    machine_image_max_height = h_line2 - h_line5 - row_spacing
-    machine_image_max_width = v_line2 - v_line1 - row_spacing
-    machine_image_height, machine_image_width = resize_image(machine_image_file, machine_image_max_height,
-                                                             machine_image_max_width)
-    pdf.drawImage(machine_image_file, (v_line1 + ((v_line2 - v_line1) / 2)) - (machine_image_width / 2),
-                  (h_line2 - ((h_line2 - h_line5) / 2)) - (machine_image_height / 2), machine_image_width,
-                  machine_image_height)
-
-    ic('Adding Machine Info')
-    return h_line5
-
-
-# Add Shutdown Sequence
-def add_shutdown_sequence(import_bottom: float = PAGE_MARGIN) -> float:
-    # Sets default parameters for a clean slate
-    set_default()
-
-    title_font = 'DM Serif Display'
-    title_font_size = 10
-    title_line_spacing = 14
-    title_font_color = [255, 255, 255]
-
-    row_spacing = 14
-
-    body_font = 'Inter'
-    body_font_size = 8
-    body_line_spacing = 10
-    body_line_length = 135
-    body_line_limit = 5
-    body_background = str(INCLUDES_DIR / 'Red.png')
-
-    shutdown_sequence = ("1. Notify affected personnel. 2. Properly shut down machine. 3. Isolate all energy sources. "
-                         "4. Apply LOTO devices. 5. Verify total de-energization of all sources.")
-
-    body_num_lines = num_lines(shutdown_sequence, body_line_length, body_line_limit)
-    body_lines = split_text(shutdown_sequence, body_line_length, body_line_limit)
-
-    total_height = title_line_spacing + body_num_lines * (body_line_spacing + 2)
-
-    # Checking if new page is needed
-    if import_bottom - total_height - DEFAULT_ROW_SPACING <= PAGE_MARGIN:
-        import_bottom = new_page()
-
-    h_line1 = import_bottom - DEFAULT_ROW_SPACING
-    h_line2 = h_line1 - title_line_spacing
-    h_line3 = h_line2 - body_num_lines * (body_line_spacing + 2)
-
-    v_line1 = PAGE_LEFT_MARGIN
-    v_line2 = PAGE_RIGHT_MARGIN
-
-    # Horizontal Lines
-    pdf.line(v_line1, h_line1, v_line2, h_line1)
-    pdf.line(v_line1, h_line2, v_line2, h_line2)
-    pdf.line(v_line1, h_line3, v_line2, h_line3)
-
-    # Vertical Lines
-    pdf.line(v_line1, h_line1, v_line1, h_line3)
-    pdf.line(v_line2, h_line1, v_line2, h_line3)
-
-    # Background color
-    pdf.drawImage(body_background, v_line1, h_line2, USABLE_WIDTH, title_line_spacing)
-
-    # Text
-    column1_text = PAGE_WIDTH_MIDDLE
-
-    row1_text = h_line1 - title_font_size
-    row2_text = h_line2 - body_font_size
-
-    # Title Text
-    pdf.setFillColorRGB(title_font_color[0], title_font_color[1], title_font_color[2])
-    pdf.setFont(title_font, title_font_size)
-    pdf.drawCentredString(column1_text, row1_text, 'SHUTDOWN SEQUENCE')
-
-    # Body Text
-    pdf.setFillColorRGB(DEFAULT_COLOR[0], DEFAULT_COLOR[1], DEFAULT_COLOR[2])
-    pdf.setFont(body_font, body_font_size)
-    for line in range(body_num_lines):
-        pdf.drawCentredString(column1_text, row2_text - (line * body_line_spacing), body_lines[line])
-
-    ic('Adding Shutdown Sequence')
-    return h_line3
-
-
-# Add Source Title Block
-def add_source_titles(import_bottom: float) -> float:
-    # Sets default parameters for a clean slate
-    set_default()
-
-    title_font = 'Times'
-    title_font_size = 10
-    title_line_spacing = 12
-    title_row_spacing = SOURCE_TITLE_BLOCK_HEIGHT
-
-    text_block_width = (PAGE_RIGHT_MARGIN - PAGE_LEFT_MARGIN) * (2 / 14)
-    image_block_width = (PAGE_RIGHT_MARGIN - PAGE_LEFT_MARGIN) * (3 / 14)
-
-    h_line1 = import_bottom - DEFAULT_ROW_SPACING
-    h_line2 = h_line1 - title_row_spacing
-
-    v_line1 = PAGE_LEFT_MARGIN
-    v_line2 = PAGE_LEFT_MARGIN + text_block_width
-    v_line3 = v_line2 + text_block_width
-    v_line4 = PAGE_WIDTH_MIDDLE
-    v_line5 = PAGE_WIDTH_MIDDLE + text_block_width
-    v_line6 = v_line5 + text_block_width
-    v_line7 = PAGE_RIGHT_MARGIN
-
-    row1_text = h_line1 - ((h_line1 - h_line2) / 2) + 2
-    row2_text = h_line1 - ((h_line1 - h_line2) / 2) - 3
-    row3_text = h_line1 - ((h_line1 - h_line2) / 2) - 7
-
-    column1_text = v_line1 + (text_block_width / 2)
-    column2_text = v_line2 + (text_block_width / 2)
-    column3_text = v_line3 + (image_block_width / 2)
-    column4_text = v_line4 + (text_block_width / 2)
-    column5_text = v_line5 + (text_block_width / 2)
-    column6_text = v_line6 + (image_block_width / 2)
-
-    # Horizontal Lines
-    pdf.line(v_line1, h_line1, v_line7, h_line1)
-    pdf.line(v_line1, h_line2, v_line7, h_line2)
-
-    # Vertical lines
-    pdf.line(v_line1, h_line1, v_line1, h_line2)
-    pdf.line(v_line2, h_line1, v_line2, h_line2)
-    pdf.line(v_line3, h_line1, v_line3, h_line2)
-    pdf.line(v_line4, h_line1, v_line4, h_line2)
-    pdf.line(v_line5, h_line1, v_line5, h_line2)
-    pdf.line(v_line6, h_line1, v_line6, h_line2)
-    pdf.line(v_line7, h_line1, v_line7, h_line2)
-
-    pdf.setFont(title_font, title_font_size)
-    pdf.drawCentredString(column1_text, row2_text, 'Energy Source')
-    pdf.drawCentredString(column2_text, row2_text, 'Device')
-    pdf.drawCentredString(column3_text, row2_text, 'Isolation Point')
-    pdf.drawCentredString(column4_text, row2_text, 'Isolation Method')
-    pdf.drawCentredString(column5_text, row1_text, 'Verification')
-    pdf.drawCentredString(column5_text, row3_text, 'Method')
-    pdf.drawCentredString(column6_text, row2_text, 'Verification Device')
-
-    ic('Adding Source Titles')
-    return h_line2
-
-
-# Add Source
-def add_source(source: dict, import_bottom: float, import_height: float) -> float:
-    # Sets default parameters for a clean slate
-    set_default()
-
-    # Sources Blocks
-    row_spacing = 16
-    body_font = "Inter"
-    body_font_size = 10
-    energy_source_line_spacing = 16
-    device_line_spacing = 11
-    isolation_method_line_spacing = 11
-    verification_method_line_spacing = 11
-
-    text_block_width = (PAGE_RIGHT_MARGIN - PAGE_LEFT_MARGIN) * (2 / 14)
-    image_block_width = (PAGE_RIGHT_MARGIN - PAGE_LEFT_MARGIN) * (3 / 14)
-
-    h_line1 = import_bottom
-    h_line2 = h_line1 - import_height
-
-    v_line1 = PAGE_LEFT_MARGIN
-    v_line2 = PAGE_LEFT_MARGIN + text_block_width
-    v_line3 = v_line2 + text_block_width
-    v_line4 = PAGE_WIDTH_MIDDLE
-    v_line5 = PAGE_WIDTH_MIDDLE + text_block_width
-    v_line6 = v_line5 + text_block_width
-    v_line7 = PAGE_RIGHT_MARGIN
-
-    column1_text = v_line1 + (text_block_width / 2)
-    column2_text = v_line2 + (text_block_width / 2)
-    column3_image = v_line3 + (
-            image_block_width / 2)  # Still need to subtract half the image width after resizing
-    column4_text = v_line4 + (text_block_width / 2)
-    column5_text = v_line5 + (text_block_width / 2)
-    column6_image = v_line6 + (
-            image_block_width / 2)  # Still need to subtract half the image width after resizing
-
-    text_block_middle_width = h_line1 - (import_height / 2)
-    image_block_middle_width = h_line1 - (import_height / 2)
-
-    isolation_point_max_height = import_height - row_spacing
-    isolation_point_max_width = (v_line4 - v_line3) - row_spacing
-
-    verification_device_max_height = import_height - row_spacing
-    verification_device_max_width = (v_line7 - v_line6) - row_spacing
-
-    blank_text = "_____________"
-    blank_text_v = "___________"
-    blank_text_psi = "_________"
-    blank_text_lbs = "_________"
-    blank_text_temp = "________"
-    blank_text_tag = "______"
-
-    line_length = 14
-    device_line_limit = 10
-    description_line_limit = 10
-    isolation_method_line_limit = 10
-    verification_method_line_limit = 10
-
-    # Horizontal Lines
-    pdf.line(v_line1, h_line1, v_line7, h_line1)
-    pdf.line(v_line1, h_line2, v_line7, h_line2)
-    # Vertical Lines
-    pdf.line(v_line1, h_line1, v_line1, h_line2)
-    pdf.line(v_line2, h_line1, v_line2, h_line2)
-    pdf.line(v_line3, h_line1, v_line3, h_line2)
-    pdf.line(v_line4, h_line1, v_line4, h_line2)
-    pdf.line(v_line5, h_line1, v_line5, h_line2)
-    pdf.line(v_line6, h_line1, v_line6, h_line2)
-    pdf.line(v_line7, h_line1, v_line7, h_line2)
-
-    # Add Energy Source
-    pdf.setFont(body_font, body_font_size)
-    match source.get('energy_source', 'Other'):
-        case 'Electric':
-            pdf.drawCentredString(column1_text, text_block_middle_width + (energy_source_line_spacing / 2),
-                                  source.get('energy_source', blank_text))
-            pdf.drawCentredString(column1_text, text_block_middle_width - (energy_source_line_spacing / 2),
-                                  source.get('volt', blank_text_v))
-        case 'Natural Gas' | 'Steam' | 'Hydraulic' | 'Refrigerant' | 'Water' | 'Pneumatic':
-            pdf.drawCentredString(column1_text, text_block_middle_width + (energy_source_line_spacing / 2),
-                                  source.get('energy_source', blank_text))
-            pdf.drawCentredString(column1_text, text_block_middle_width - (energy_source_line_spacing / 2),
-                                  source.get('psi', blank_text_psi))
-        case 'Chemical':
-            pdf.drawCentredString(column1_text, text_block_middle_width + energy_source_line_spacing,
-                                  source.get('energy_source', blank_text))
-            pdf.drawCentredString(column1_text, text_block_middle_width, source.get('chemical_name', blank_text))
-            pdf.drawCentredString(column1_text, text_block_middle_width - energy_source_line_spacing,
-                                  source.get('psi', blank_text_psi))
-        case 'Gravity':
-            pdf.drawCentredString(column1_text, text_block_middle_width + (energy_source_line_spacing / 2),
-                                  source.get('energy_source', blank_text))
-            pdf.drawCentredString(column1_text, text_block_middle_width - (energy_source_line_spacing / 2),
-                                  source.get('lbs', blank_text_lbs))
-        case 'Thermal':
-            pdf.drawCentredString(column1_text, text_block_middle_width + (energy_source_line_spacing / 2),
-                                  source.get('energy_source', blank_text))
-            pdf.drawCentredString(column1_text, text_block_middle_width - (energy_source_line_spacing / 2),
-                                  source.get('temp', blank_text_temp))
-        case 'Other':
-            pdf.drawCentredString(column1_text, text_block_middle_width + (energy_source_line_spacing / 2), blank_text)
-            pdf.drawCentredString(column1_text, text_block_middle_width - (energy_source_line_spacing / 2), blank_text)
-
-    # Add Device
-    pdf.setFont(body_font, body_font_size)
-
-    device = []
-
-    if 'device' in source:
-        device_lines = split_text(source.get('device', blank_text), line_length, device_line_limit)
-        for line in range(len(device_lines)):
-            device.append(device_lines[line])
-    else:
-        device.append(blank_text)
-
-    if "tag" in source:
-        device.append('')
-        device.append('Tag: #' + source.get('tag', blank_text_tag))
-        device.append('')
-    else:
-        device.append('')
-        device.append('Tag: #______')
-        device.append('')
-
-    if "source_description" in source:
-        description_lines = split_text(
-            source.get('source_description', blank_text),
-            line_length,
-            description_line_limit,
-        )
-        for line in range(len(description_lines)):
-            device.append(description_lines[line])
-    else:
-        device.append(blank_text)
+        return None
 
-    if len(device) % 2 == 1:
-        for line in range(len(device)):
-            pdf.drawCentredString(column2_text,
-                                  text_block_middle_width + (math.floor(len(device) / 2) * device_line_spacing) - (
-                                          device_line_spacing * line), device[line])
-    else:
-        for line in range(len(device)):
-            pdf.drawCentredString(column2_text, text_block_middle_width + (
-                    ((math.floor(len(device) / 2) - 1) * device_line_spacing) + 5) - (device_line_spacing * line),
-                                  device[line])
-
-    # Isolation Method
-    pdf.setFont(body_font, body_font_size)
-
-    if "isolation_method" in source:
-        isolation_method_num_lines = num_lines(source.get("isolation_method", ""), line_length,
-                                               isolation_method_line_limit)
-        isolation_method_lines = split_text(source.get("isolation_method", ""), line_length,
-                                            isolation_method_line_limit)
-        if isolation_method_num_lines % 2 == 1:
-            for line in range(isolation_method_num_lines):
-                pdf.drawCentredString(column4_text, text_block_middle_width + (
-                        math.floor(isolation_method_num_lines / 2) * isolation_method_line_spacing) - (
-                                              isolation_method_line_spacing * line), isolation_method_lines[line])
+    return data
+
+
+class ReportRenderer:
+    """
+    Renders a single LOTO report.
+
+    All per-render state (report data, canvas, document name) lives on the instance,
+    so several renders can run in the same process without sharing anything.
+    """
+
+    def __init__(self, data: dict, file_name: str = "report", photos=None):
+        self.data = data
+        self.file_name = file_name
+        self.photos = photos if photos is not None else DirectoryPhotoProvider(TEMP_DIR)
+        self.images = {}  # photo name -> bytes, for the photos used by this report
+        self.pdf = None
+        self.forms = set()  # Form XObjects already defined in the current document
+        self.block_uses = {}  # block name -> times it is drawn in the current document
+
+    # Render to a file path or a writable binary file object
+    def render(self, output):
+        self.pdf = canvas.Canvas(output, PAGE_SIZE)
+        self.pdf.setTitle(self.file_name)
+        self.forms = set()
+        register_fonts()
+        self.generate_pdf()
+
+    # Render and return the PDF bytes
+    def render_bytes(self) -> bytes:
+        buffer = BytesIO()
+        self.render(buffer)
+        return buffer.getvalue()
+
+    # Set Default
+    def set_default(self):
+        self.pdf.setFont(DEFAULT_FONT, DEFAULT_FONT_SIZE)
+
+    # Checks the photo provider for an image and returns the default image if it is not found
+    def resolve_image_file(self, filename: str) -> str:
+        if filename == DEFAULT_IMAGE:
+            return DEFAULT_IMAGE
+
+        if filename not in self.images:
+            data = self.photos.get(filename)
+            if data is None:
+                ic(f"[Warning] Image '{filename}' not found in the report photos. Using default image.")
+                return DEFAULT_IMAGE
+            self.images[filename] = data
+
+        return filename
+
+    # Draw an image file or report photo, reusing the encoded image cached for its content
+    def draw_image(self, filename: str, x: float, y: float, width: float, height: float):
+        data = self.images.get(filename)
+        if register_cached_image(self.pdf, filename, lambda: IMAGE_CACHE.xobject(filename, data)):
+            self.pdf.drawImage(filename, x, y, width, height)
         else:
-            for line in range(isolation_method_num_lines):
-                pdf.drawCentredString(column4_text, text_block_middle_width + (
-                        ((math.floor(isolation_method_num_lines / 2) - 1) * isolation_method_line_spacing) + 5) - (
-                                              isolation_method_line_spacing * line), isolation_method_lines[line])
-    else:
-        pdf.drawCentredString(column4_text, text_block_middle_width, blank_text)
-
-    # Verification Method
-    pdf.setFont(body_font, body_font_size)
-
-    if "verification_method" in source:
-        verification_method_num_lines = num_lines(source.get("verification_method", ""), line_length,
-                                                  verification_method_line_limit)
-        verification_method_lines = split_text(source.get("verification_method", ""), line_length,
-                                               verification_method_line_limit)
-        if verification_method_num_lines % 2 == 1:
-            for line in range(verification_method_num_lines):
-                pdf.drawCentredString(column5_text, text_block_middle_width + (
-                        math.floor(verification_method_num_lines / 2) * verification_method_line_spacing) - (
-                                              verification_method_line_spacing * line),
-                                      verification_method_lines[line])
+            # reportlab internals changed: let drawImage encode the image itself
+            self.pdf.drawImage(ImageReader(BytesIO(data)) if data is not None else filename, x, y, width, height)
+        self.pdf.setLineWidth(DEFAULT_LINE_WIDTH)
+        self.pdf.setFillColorRGB(DEFAULT_COLOR[0], DEFAULT_COLOR[1], DEFAULT_COLOR[2])
+
+    # Draw a block that appears FORM_MIN_USES times or more once per document as a form and place it;
+    # a form costs a stream and resource dictionary of its own, more than a few repeats of the block
+    def draw_repeated_block(self, name: str, draw, *bbox):
+        if self.block_uses.get(name, 0) < FORM_MIN_USES:
+            draw()
+            return
+
+        if name not in self.forms:
+            self.pdf.beginForm(name, *bbox)
+            draw()
+            self.pdf.endForm()
+            self.forms.add(name)
+        self.pdf.doForm(name)
+
+    # Header text and row positions (shared by the layout and draw phases)
+    def header_layout(self) -> dict:
+        page_title_line_spacing = 20
+        page_title_y = PAGE_HEIGHT - 54  # 0.75in
+        row_spacing = 14
+        body_line_spacing = 12
+        address = ['Cardinal Compliance Consultants', '5353 Secor Rd.', 'Toledo, OH 43623', 'P: 419-882-9224']
+        address_line_spacing = 12
+
+        # Header Description
+        description_line_length = 78
+        description_line_limit = 5
+        description_lines = split_text(self.data.get('description', ''), description_line_length,
+                                       description_line_limit)
+
+        # Header Facility
+        facility_line_length = 26
+        facility_line_limit = 5
+        facility_lines = split_text(self.data.get('facility', ''), facility_line_length, facility_line_limit)
+
+        # Header Location
+        location_line_length = 26
+        location_line_limit = 5
+        location_lines = split_text(self.data.get('location', ''), location_line_length, location_line_limit)
+
+        # Row Offset for Dynamic Data Entry
+        row1_height = (len(address) * address_line_spacing + 2)  # Address Block
+        row2_height = (max(MIN_LINES, len(description_lines)) * body_line_spacing) + 2  # Description Row
+        row3_height = (max(MIN_LINES, len(facility_lines), len(location_lines)) * body_line_spacing) + 2  # Facility Row
+
+        # Horizontal Lines (1 = top, 5 = bottom)
+        h_line1 = page_title_y + page_title_line_spacing
+        h_line2 = h_line1 - row_spacing
+        h_line3 = h_line2 - row1_height
+        h_line4 = h_line3 - row2_height
+        h_line5 = h_line4 - row3_height
+
+        return {
+            'page_title_y': page_title_y,
+            'page_title_line_spacing': page_title_line_spacing,
+            'body_line_spacing': body_line_spacing,
+            'address': address,
+            'address_line_spacing': address_line_spacing,
+            'description_lines': description_lines,
+            'facility_lines': facility_lines,
+            'location_lines': location_lines,
+            'h_lines': (h_line1, h_line2, h_line3, h_line4, h_line5),
+        }
+
+    # Adds Header to current page
+    def add_header(self) -> float:
+        # Sets default parameters for a clean slate
+        self.set_default()
+
+        layout = self.header_layout()
+
+        # Page Title
+        page_title_font_size = 18
+        page_title_font = 'DM Serif Display'
+        page_title_line_spacing = layout['page_title_line_spacing']
+        page_title_y = layout['page_title_y']
+
+        # Header Image
+        image_name = str(INCLUDES_DIR / 'CardinalLogo.png')
+        image_width = 144  # 2in
+        image_height = 72
+        image_height, image_width = resize_image(image_name, image_height, image_width)
+        image_x = PAGE_LEFT_MARGIN
+        image_y = page_title_y - image_height + page_title_line_spacing
+
+        # Header Field Options
+        title_font = 'Times'
+        title_font_size = 10
+        body_font = 'Inter'
+        body_font_size = 9
+        body_line_spacing = layout['body_line_spacing']
+
+        # Header Address Block
+        address = layout['address']
+        address_font = 'Times'
+        address_font_size = 9
+        address_line_spacing = layout['address_line_spacing']
+        address_width = image_width
+
+        # Header Description / Facility / Location
+        description_lines = layout['description_lines']
+        description_height = len(description_lines)
+        facility_lines = layout['facility_lines']
+        facility_height = len(facility_lines)
+        location_lines = layout['location_lines']
+        location_height = len(location_lines)
+
+        # Header Procedure Number
+        procedure_number_line_length = 16
+
+        # Header Revision
+        revision_line_length = 6
+        revision_width = 60
+
+        # Horizontal Lines (1 = top, 5 = bottom)
+        h_line1, h_line2, h_line3, h_line4, h_line5 = layout['h_lines']
+
+        # Vertical Lines (1 = left, 6 = Right)
+        v_line1 = PAGE_LEFT_MARGIN
+        v_line2 = PAGE_LEFT_MARGIN + ((USABLE_WIDTH - address_width) / 2) - (
+                revision_width / 2)
+        v_line3 = PAGE_RIGHT_MARGIN - address_width - revision_width
+        v_line4 = PAGE_RIGHT_MARGIN - address_width
+        v_line5 = PAGE_RIGHT_MARGIN - (address_width * (2 / 5))
+        v_line6 = PAGE_RIGHT_MARGIN
+
+        # Text Locations - Rows
+        row1_text = h_line1 - title_font_size
+        row2_text = h_line3 - title_font_size
+        row3_text = h_line4 - title_font_size
+
+        # Text Locations - Columns
+        horizonal_spacing = 3
+        column1_text = v_line1 + horizonal_spacing
+        column2_text = v_line2 + horizonal_spacing
+        column3_text = v_line3 + horizonal_spacing
+        column4_text = v_line4 + horizonal_spacing
+        column5_text = v_line4 + (address_width / 2)
+        column6_text = v_line5 + horizonal_spacing
+
+        # Header - Address Block Locations
+        address_block_x = column4_text
+        address_block_y = h_line2 - body_font_size
+
+        # Header - Description Location
+        description_x = column1_text + 53
+
+        # Header - Procedure Number Location
+        procedure_number_x = column4_text + 53
+
+        # Header - Facility Location
+        facility_x = column1_text + 37
+
+        # Header - Location
+        location_x = column2_text + 42
+
+        # Header - Revision Location
+        revision_x = column3_text + 20
+
+        # Header - Date Location
+        date_x = column4_text + 23
+
+        # Header - Origin Location
+        origin_x = column6_text + 30
+
+        # The static part of the header is the same on every page, so it is shared as a form when it repeats
+        def draw_static_header():
+            # Creating Header Title
+            self.pdf.setFont(page_title_font, page_title_font_size)
+            self.pdf.drawCentredString(PAGE_WIDTH_MIDDLE, page_title_y, "LOCKOUT-TAGOUT")
+            self.pdf.drawCentredString(PAGE_WIDTH_MIDDLE, page_title_y - page_title_line_spacing, "PROCEDURE")
+            self.draw_image(image_name, image_x, image_y, image_width, image_height)
+
+            # Creating Header Field Outlines
+            self.pdf.setLineWidth(DEFAULT_LINE_WIDTH)
+
+            # Horizontal Outline Lines
+            self.pdf.line(v_line4, h_line1, v_line6, h_line1)
+            self.pdf.line(v_line4, h_line2, v_line6, h_line2)
+            self.pdf.line(v_line1, h_line3, v_line6, h_line3)
+            self.pdf.line(v_line1, h_line4, v_line6, h_line4)
+            self.pdf.line(v_line1, h_line5, v_line6, h_line5)
+            # Vertical Outline lines
+            self.pdf.line(v_line1, h_line3, v_line1, h_line5)
+            self.pdf.line(v_line4, h_line1, v_line4, h_line5)
+            self.pdf.line(v_line6, h_line1, v_line6, h_line5)
+            # Vertical Divider Lines
+            self.pdf.line(v_line2, h_line4, v_line2, h_line5)
+            self.pdf.line(v_line3, h_line4, v_line3, h_line5)
+            self.pdf.line(v_line5, h_line4, v_line5, h_line5)
+
+            # Creating Header Fields Titles
+            self.pdf.setFont(title_font, title_font_size)
+            self.pdf.drawCentredString(column5_text, row1_text, 'Developed By:')
+            self.pdf.drawString(column1_text, row2_text, 'Description:')
+            self.pdf.drawString(column1_text, row3_text, 'Facility:')
+            self.pdf.drawString(column2_text, row3_text, 'Location:')
+            self.pdf.drawString(column3_text, row3_text, 'Rev:')
+            self.pdf.drawString(column4_text, row2_text, 'Procedure #:')
+            self.pdf.drawString(column4_text, row3_text, 'Date:')
+            self.pdf.drawString(column6_text, row3_text, 'Origin:')
+
+            # Creating the Address Block
+            self.pdf.setFont(address_font, address_font_size)
+            for line in range(len(address)):
+                self.pdf.drawString(address_block_x,
+                                    address_block_y - (line * address_line_spacing),
+                                    address[line])
+
+        self.draw_repeated_block('header', draw_static_header)
+        self.pdf.setLineWidth(DEFAULT_LINE_WIDTH)
+
+        # Creating Header Field Text
+        self.pdf.setFont(body_font, body_font_size)
+        for line in range(description_height):
+            self.pdf.drawString(description_x, row2_text - (line * body_line_spacing), description_lines[line])
+        self.pdf.drawString(procedure_number_x, row2_text,
+                            check_length(self.data.get('procedure_number', ''), procedure_number_line_length, False))
+        for line in range(facility_height):
+            self.pdf.drawString(facility_x, row3_text - (line * body_line_spacing), facility_lines[line])
+        for line in range(location_height):
+            self.pdf.drawString(location_x, row3_text - (line * body_line_spacing), location_lines[line])
+        self.pdf.drawString(revision_x, row3_text, self.data.get('revision', '')[0:revision_line_length])
+        self.pdf.setFont("Inter", 9)
+        self.pdf.drawString(date_x, row3_text, self.data.get('date', ''))
+        self.pdf.drawString(origin_x, row3_text, self.data.get('origin', ''))
+        self.pdf.setFont(address_font, address_font_size)
+
+        # Return the bottom of this section for use as start of next
+        ic('Adding Header')
+        return h_line5
+
+    # Machine info notes and block height (shared by the layout and draw phases)
+    def machine_info_layout(self) -> dict:
+        row_spacing = 14
+        body_line_spacing = 12
+
+        # Notes Formatting Options
+        notes_line_length = 60
+        notes_line_limit = 5
+        notes_lines = split_text(self.data.get('notes', ''), notes_line_length, notes_line_limit)
+
+        # Notes Block Height
+        if (len(notes_lines) * body_line_spacing + 2) > (row_spacing * 3):
+            row1_height = (len(notes_lines) * body_line_spacing + 2)
         else:
-            for line in range(verification_method_num_lines):
-                pdf.drawCentredString(column5_text, text_block_middle_width + (((math.floor(
-                    verification_method_num_lines / 2) - 1) * verification_method_line_spacing) + 5) - (
-                                              verification_method_line_spacing * line),
-                                      verification_method_lines[line], )
-    else:
-        pdf.drawCentredString(column5_text, text_block_middle_width, blank_text)
-
-    # Isolation Point File
-    isolation_point_file = resolve_image_file(source.get('isolation_point', DEFAULT_IMAGE))
-    ic(f"Isolation_point_file: {isolation_point_file}")
-
-    # Isolation Point
-    isolation_point_height, isolation_point_width = resize_image(isolation_point_file,
-                                                                 isolation_point_max_height, isolation_point_max_width)
-    pdf.drawImage(isolation_point_file, column3_image - (isolation_point_width / 2),
-                  image_block_middle_width - (isolation_point_height / 2), isolation_point_width,
-                  isolation_point_height)
-
-    # Verification Device File
-    verification_device_file = resolve_image_file(source.get('verification_device', DEFAULT_IMAGE))
-    ic(f"Verification_device_file: {verification_device_file}")
-
-    # Verification Device
-    verification_device_height, verification_device_width = resize_image(
-        verification_device_file, verification_device_max_height, verification_device_max_width)
-    pdf.drawImage(verification_device_file, column6_image - (verification_device_width / 2),
-                  image_block_middle_width - (verification_device_height / 2), verification_device_width,
-                  verification_device_height)
-
-    ic('Adding Source: ' + source.get('energy_source', '') + ' : ' + source.get('tag', ''))
-    return h_line2
-
-
-# Adds all sources
-def add_sources(import_bottom: float = PAGE_MARGIN) -> float:
-    # Sets default parameters for a clean slate
-    set_default()
-
-    line_length = 14
-    device_line_limit = 10
-    description_line_limit = 10
-    isolation_method_line_limit = 10
-    verification_method_line_limit = 10
-
-    sources = data.get('sources', [])
-
-    # Early return if there are no sources
-    if not sources:
-        sources = [{}]
-        # return import_bottom # return the original bottom
+            row1_height = (row_spacing * 3)
+
+        return {
+            'row_spacing': row_spacing,
+            'body_line_spacing': body_line_spacing,
+            'notes_lines': notes_lines,
+            'row1_height': row1_height,
+            'height': DEFAULT_ROW_SPACING + row_spacing + (3.5 * row_spacing) + row_spacing + row1_height,
+        }
+
+    # Adds Machine Info
+    def add_machine_info(self, import_bottom: float = PAGE_MARGIN) -> float:
+        # Sets default parameters for a clean slate
+        self.set_default()
+
+        layout = self.machine_info_layout()
+
+        # Machine Info Formatting Options
+        row_spacing = layout['row_spacing']
+        title_font = 'DM Serif Display'
+        title_font_size = 10
+        sub_title_font = 'Times'
+        sub_title_font_size = 10
+        body_font = 'Inter'
+        body_font_size = 9
+        body_line_spacing = layout['body_line_spacing']
+
+        # Square Formatting Options
+        square_height = 40
+        square_width = square_height
+
+        # Isolation Points Formatting Options
+        isolation_point_title_font = 'DM Serif Display'
+        isolation_point_title_font_size = 16
+        isolation_points_font = 'Inter'
+
+        isolation_points = self.data.get('isolation_points', '0')
+        if len(isolation_points) <= 1:
+            isolation_points_font_size = 36
+        elif len(isolation_points) == 2:
+            isolation_points_font_size = 28
+        elif len(isolation_points) >= 3:
+            isolation_points_font_size = 20
+            isolation_points = isolation_points[:3]
+        else:
+            print_error("error with isolation_point font size")
+
+        # Lock Tag Formatting Options
+        lock_image_file = str(INCLUDES_DIR / 'LockTag.png')
+        lock_image_height = 40
+        lock_image_width = lock_image_height
+        lock_image_height, lock_image_width = resize_image(lock_image_file, lock_image_height, lock_image_width)
+
+        # Notes Block Height
+        row1_height = layout['row1_height']
+
+        # Machine Image Formatting Options
+        machine_image_file = self.resolve_image_file(self.data.get('machine_image', DEFAULT_IMAGE))
+        ic(f"Machine_image_file: {machine_image_file}")
+
+        h_line1 = import_bottom - DEFAULT_ROW_SPACING
+        h_line2 = h_line1 - row_spacing
+        h_line3 = h_line2 - (3.5 * row_spacing)
+        h_line4 = h_line3 - row_spacing
+        h_line5 = h_line4 - row1_height
+
+        v_line1 = PAGE_LEFT_MARGIN
+        v_line2 = PAGE_WIDTH_MIDDLE
+        v_line3 = PAGE_RIGHT_MARGIN
+
+        vertical_text_spacing = 3
+        row1_text = h_line1 - title_font_size
+        row2_text = (h_line1 - ((h_line1 - h_line3) / 2)) + (isolation_point_title_font_size / 2) - vertical_text_spacing
+        row3_text = (h_line1 - ((h_line1 - h_line3) / 2)) - (isolation_points_font_size / 3)
+        row4_text = (h_line1 - ((h_line1 - h_line3) / 2)) - isolation_point_title_font_size + vertical_text_spacing
+        row5_text = h_line3 - title_font_size
+        row6_text = h_line4 - title_font_size
+
+        horizontal_text_spacing = 3
+        horizontal_image_spacing = 10
+        column1_text = (v_line1 + ((v_line2 - v_line1) / 2))
+        column2_text = v_line2 + horizontal_text_spacing
+        column3_text = v_line2 + horizontal_image_spacing + (lock_image_width / 2)
+        column4_text = v_line2 + lock_image_width + square_width + (3 * horizontal_image_spacing)
+        column5_text = (v_line2 + ((v_line3 - v_line2) / 2))
+
+        # Horizontal Lines
+        self.pdf.line(v_line1, h_line1, v_line3, h_line1)
+        self.pdf.line(v_line1, h_line2, v_line2, h_line2)
+        self.pdf.line(v_line2, h_line3, v_line3, h_line3)
+        self.pdf.line(v_line2, h_line4, v_line3, h_line4)
+        self.pdf.line(v_line1, h_line5, v_line3, h_line5)
+
+        # Vertical Lines
+        self.pdf.line(v_line1, h_line1, v_line1, h_line5)
+        self.pdf.line(v_line2, h_line1, v_line2, h_line5)
+        self.pdf.line(v_line3, h_line1, v_line3, h_line5)
+
+        # Titles
+        self.pdf.setFont(title_font, title_font_size)
+        self.pdf.drawCentredString(column1_text, row1_text, 'Machine to be Locked Out')
+        self.pdf.setFont(sub_title_font, sub_title_font_size)
+        self.pdf.drawCentredString(column5_text, row5_text, 'Notes:')
+        self.pdf.setFont(isolation_point_title_font, isolation_point_title_font_size)
+        self.pdf.drawString(column4_text, row2_text, 'Isolation Points to be')
+        self.pdf.drawString(column4_text, row4_text, 'Locked and Tagged')
+
+        # Square
+        square_left = v_line2 + horizontal_image_spacing
+        square_right = square_left + square_width
+        square_top = (h_line1 - ((h_line1 - h_line3) / 2)) + (square_height / 2)
+        square_bottom = square_top - square_height
+        self.pdf.line(square_left, square_top, square_right, square_top)
+        self.pdf.line(square_right, square_top, square_right, square_bottom)
+        self.pdf.line(square_right, square_bottom, square_left, square_bottom)
+        self.pdf.line(square_left, square_bottom, square_left, square_top)
+
+        # Lock Tag Image
+        self.draw_image(lock_image_file, square_right + horizontal_image_spacing,
+                        (h_line1 - ((h_line1 - h_line3) / 2)) - (lock_image_height / 2), lock_image_width, lock_image_height)
+
+        # Isolation Points
+        self.pdf.setFont(isolation_points_font, isolation_points_font_size)
+        self.pdf.drawCentredString(column3_text, row3_text, isolation_points)
+
+        # Notes Text
+        self.pdf.setFont(body_font, body_font_size)
+        notes = layout['notes_lines']
+        for line in range(len(notes)):
+            self.pdf.drawString(column2_text, row6_text - (line * body_line_spacing), notes[line])
+
+        # Machine Image
+        machine_image_max_height = h_line2 - h_line5 - row_spacing
+        machine_image_max_width = v_line2 - v_line1 - row_spacing
+        machine_image_height, machine_image_width = resize_image(machine_image_file, machine_image_max_height,
+                                                                 machine_image_max_width,
+                                                                 self.images.get(machine_image_file))
+        self.draw_image(machine_image_file, (v_line1 + ((v_line2 - v_line1) / 2)) - (machine_image_width / 2),
+                        (h_line2 - ((h_line2 - h_line5) / 2)) - (machine_image_height / 2), machine_image_width,
+                        machine_image_height)
+
+        ic('Adding Machine Info')
+        return h_line5
+
+    # Wrapped sequence text and block height (shared by the layout and draw phases)
+    def sequence_layout(self, sequence: str) -> dict:
+        title_line_spacing = 14
+        body_line_spacing = 10
+        body_line_length = 135
+        body_line_limit = 5
+
+        body_lines = split_text(sequence, body_line_length, body_line_limit)
+
+        return {
+            'body_lines': body_lines,
+            'height': DEFAULT_ROW_SPACING + title_line_spacing + len(body_lines) * (body_line_spacing + 2),
+        }
+
+    # Add Shutdown Sequence
+    def add_shutdown_sequence(self, import_bottom: float = PAGE_MARGIN) -> float:
+        # Sets default parameters for a clean slate
+        self.set_default()
+
+        title_font = 'DM Serif Display'
+        title_font_size = 10
+        title_line_spacing = 14
+        title_font_color = [255, 255, 255]
+
+        row_spacing = 14
+
+        body_font = 'Inter'
+        body_font_size = 8
+        body_line_spacing = 10
+        body_background = str(INCLUDES_DIR / 'Red.png')
+
+        body_lines = self.sequence_layout(SHUTDOWN_SEQUENCE)['body_lines']
+        body_num_lines = len(body_lines)
+
+        h_line1 = import_bottom - DEFAULT_ROW_SPACING
+        h_line2 = h_line1 - title_line_spacing
+        h_line3 = h_line2 - body_num_lines * (body_line_spacing + 2)
+
+        v_line1 = PAGE_LEFT_MARGIN
+        v_line2 = PAGE_RIGHT_MARGIN
+
+        # Horizontal Lines
+        self.pdf.line(v_line1, h_line1, v_line2, h_line1)
+        self.pdf.line(v_line1, h_line2, v_line2, h_line2)
+        self.pdf.line(v_line1, h_line3, v_line2, h_line3)
+
+        # Vertical Lines
+        self.pdf.line(v_line1, h_line1, v_line1, h_line3)
+        self.pdf.line(v_line2, h_line1, v_line2, h_line3)
+
+        # Background color
+        self.draw_image(body_background, v_line1, h_line2, USABLE_WIDTH, title_line_spacing)
+
+        # Text
+        column1_text = PAGE_WIDTH_MIDDLE
+
+        row1_text = h_line1 - title_font_size
+        row2_text = h_line2 - body_font_size
+
+        # Title Text
+        self.pdf.setFillColorRGB(title_font_color[0], title_font_color[1], title_font_color[2])
+        self.pdf.setFont(title_font, title_font_size)
+        self.pdf.drawCentredString(column1_text, row1_text, 'SHUTDOWN SEQUENCE')
+
+        # Body Text
+        self.pdf.setFillColorRGB(DEFAULT_COLOR[0], DEFAULT_COLOR[1], DEFAULT_COLOR[2])
+        self.pdf.setFont(body_font, body_font_size)
+        for line in range(body_num_lines):
+            self.pdf.drawCentredString(column1_text, row2_text - (line * body_line_spacing), body_lines[line])
+
+        ic('Adding Shutdown Sequence')
+        return h_line3
+
+    # Add Source Title Block
+    def add_source_titles(self, import_bottom: float) -> float:
+        # Sets default parameters for a clean slate
+        self.set_default()
+
+        title_font = 'Times'
+        title_font_size = 10
+        title_line_spacing = 12
+        title_row_spacing = SOURCE_TITLE_BLOCK_HEIGHT
+
+        text_block_width = (PAGE_RIGHT_MARGIN - PAGE_LEFT_MARGIN) * (2 / 14)
+        image_block_width = (PAGE_RIGHT_MARGIN - PAGE_LEFT_MARGIN) * (3 / 14)
+
+        h_line1 = import_bottom - DEFAULT_ROW_SPACING
+        h_line2 = h_line1 - title_row_spacing
+
+        # The block is the same wherever it appears, so it is drawn relative to its top line and
+        # shared as a form when it repeats
+        def draw_source_titles():
+            form_h_line1 = 0
+            form_h_line2 = form_h_line1 - title_row_spacing
+
+            v_line1 = PAGE_LEFT_MARGIN
+            v_line2 = PAGE_LEFT_MARGIN + text_block_width
+            v_line3 = v_line2 + text_block_width
+            v_line4 = PAGE_WIDTH_MIDDLE
+            v_line5 = PAGE_WIDTH_MIDDLE + text_block_width
+            v_line6 = v_line5 + text_block_width
+            v_line7 = PAGE_RIGHT_MARGIN
+
+            row1_text = form_h_line1 - ((form_h_line1 - form_h_line2) / 2) + 2
+            row2_text = form_h_line1 - ((form_h_line1 - form_h_line2) / 2) - 3
+            row3_text = form_h_line1 - ((form_h_line1 - form_h_line2) / 2) - 7
+
+            column1_text = v_line1 + (text_block_width / 2)
+            column2_text = v_line2 + (text_block_width / 2)
+            column3_text = v_line3 + (image_block_width / 2)
+            column4_text = v_line4 + (text_block_width / 2)
+            column5_text = v_line5 + (text_block_width / 2)
+            column6_text = v_line6 + (image_block_width / 2)
+
+            # Horizontal Lines
+            self.pdf.line(v_line1, form_h_line1, v_line7, form_h_line1)
+            self.pdf.line(v_line1, form_h_line2, v_line7, form_h_line2)
+
+            # Vertical lines
+            self.pdf.line(v_line1, form_h_line1, v_line1, form_h_line2)
+            self.pdf.line(v_line2, form_h_line1, v_line2, form_h_line2)
+            self.pdf.line(v_line3, form_h_line1, v_line3, form_h_line2)
+            self.pdf.line(v_line4, form_h_line1, v_line4, form_h_line2)
+            self.pdf.line(v_line5, form_h_line1, v_line5, form_h_line2)
+            self.pdf.line(v_line6, form_h_line1, v_line6, form_h_line2)
+            self.pdf.line(v_line7, form_h_line1, v_line7, form_h_line2)
+
+            self.pdf.setFont(title_font, title_font_size)
+            self.pdf.drawCentredString(column1_text, row2_text, 'Energy Source')
+            self.pdf.drawCentredString(column2_text, row2_text, 'Device')
+            self.pdf.drawCentredString(column3_text, row2_text, 'Isolation Point')
+            self.pdf.drawCentredString(column4_text, row2_text, 'Isolation Method')
+            self.pdf.drawCentredString(column5_text, row1_text, 'Verification')
+            self.pdf.drawCentredString(column5_text, row3_text, 'Method')
+            self.pdf.drawCentredString(column6_text, row2_text, 'Verification Device')
+
+        self.pdf.saveState()
+        self.pdf.translate(0, h_line1)
+        self.draw_repeated_block('source_titles', draw_source_titles, 0, -title_row_spacing - 1, PAGE_WIDTH, 1)
+        self.pdf.restoreState()
+        self.pdf.setFont(title_font, title_font_size)
+
+        ic('Adding Source Titles')
+        return h_line2
+
+    # Add Source
+    def add_source(self, source: dict, import_bottom: float, import_height: float) -> float:
+        # Sets default parameters for a clean slate
+        self.set_default()
+
+        # Sources Blocks
+        row_spacing = 16
+        body_font = "Inter"
+        body_font_size = 10
+        energy_source_line_spacing = 16
+        device_line_spacing = 11
+        isolation_method_line_spacing = 11
+        verification_method_line_spacing = 11
+
+        text_block_width = (PAGE_RIGHT_MARGIN - PAGE_LEFT_MARGIN) * (2 / 14)
+        image_block_width = (PAGE_RIGHT_MARGIN - PAGE_LEFT_MARGIN) * (3 / 14)
+
+        h_line1 = import_bottom
+        h_line2 = h_line1 - import_height
+
+        v_line1 = PAGE_LEFT_MARGIN
+        v_line2 = PAGE_LEFT_MARGIN + text_block_width
+        v_line3 = v_line2 + text_block_width
+        v_line4 = PAGE_WIDTH_MIDDLE
+        v_line5 = PAGE_WIDTH_MIDDLE + text_block_width
+        v_line6 = v_line5 + text_block_width
+        v_line7 = PAGE_RIGHT_MARGIN
+
+        column1_text = v_line1 + (text_block_width / 2)
+        column2_text = v_line2 + (text_block_width / 2)
+        column3_image = v_line3 + (
+                image_block_width / 2)  # Still need to subtract half the image width after resizing
+        column4_text = v_line4 + (text_block_width / 2)
+        column5_text = v_line5 + (text_block_width / 2)
+        column6_image = v_line6 + (
+                image_block_width / 2)  # Still need to subtract half the image width after resizing
+
+        text_block_middle_width = h_line1 - (import_height / 2)
+        image_block_middle_width = h_line1 - (import_height / 2)
+
+        isolation_point_max_height = import_height - row_spacing
+        isolation_point_max_width = (v_line4 - v_line3) - row_spacing
+
+        verification_device_max_height = import_height - row_spacing
+        verification_device_max_width = (v_line7 - v_line6) - row_spacing
+
+        blank_text = "_____________"
+        blank_text_v = "___________"
+        blank_text_psi = "_________"
+        blank_text_lbs = "_________"
+        blank_text_temp = "________"
+        blank_text_tag = "______"
+
+        line_length = 14
+        device_line_limit = 10
+        description_line_limit = 10
+        isolation_method_line_limit = 10
+        verification_method_line_limit = 10
+
+        # Horizontal Lines
+        self.pdf.line(v_line1, h_line1, v_line7, h_line1)
+        self.pdf.line(v_line1, h_line2, v_line7, h_line2)
+        # Vertical Lines
+        self.pdf.line(v_line1, h_line1, v_line1, h_line2)
+        self.pdf.line(v_line2, h_line1, v_line2, h_line2)
+        self.pdf.line(v_line3, h_line1, v_line3, h_line2)
+        self.pdf.line(v_line4, h_line1, v_line4, h_line2)
+        self.pdf.line(v_line5, h_line1, v_line5, h_line2)
+        self.pdf.line(v_line6, h_line1, v_line6, h_line2)
+        self.pdf.line(v_line7, h_line1, v_line7, h_line2)
+
+        # Add Energy Source
+        self.pdf.setFont(body_font, body_font_size)
+        match source.get('energy_source', 'Other'):
+            case 'Electric':
+                self.pdf.drawCentredString(column1_text, text_block_middle_width + (energy_source_line_spacing / 2),
+                                           source.get('energy_source', blank_text))
+                self.pdf.drawCentredString(column1_text, text_block_middle_width - (energy_source_line_spacing / 2),
+                                           source.get('volt', blank_text_v))
+            case 'Natural Gas' | 'Steam' | 'Hydraulic' | 'Refrigerant' | 'Water' | 'Pneumatic':
+                self.pdf.drawCentredString(column1_text, text_block_middle_width + (energy_source_line_spacing / 2),
+                                           source.get('energy_source', blank_text))
+                self.pdf.drawCentredString(column1_text, text_block_middle_width - (energy_source_line_spacing / 2),
+                                           source.get('psi', blank_text_psi))
+            case 'Chemical':
+                self.pdf.drawCentredString(column1_text, text_block_middle_width + energy_source_line_spacing,
+                                           source.get('energy_source', blank_text))
+                self.pdf.drawCentredString(column1_text, text_block_middle_width, source.get('chemical_name', blank_text))
+                self.pdf.drawCentredString(column1_text, text_block_middle_width - energy_source_line_spacing,
+                                           source.get('psi', blank_text_psi))
+            case 'Gravity':
+                self.pdf.drawCentredString(column1_text, text_block_middle_width + (energy_source_line_spacing / 2),
+                                           source.get('energy_source', blank_text))
+                self.pdf.drawCentredString(column1_text, text_block_middle_width - (energy_source_line_spacing / 2),
+                                           source.get('lbs', blank_text_lbs))
+            case 'Thermal':
+                self.pdf.drawCentredString(column1_text, text_block_middle_width + (energy_source_line_spacing / 2),
+                                           source.get('energy_source', blank_text))
+                self.pdf.drawCentredString(column1_text, text_block_middle_width - (energy_source_line_spacing / 2),
+                                           source.get('temp', blank_text_temp))
+            case 'Other':
+                self.pdf.drawCentredString(column1_text, text_block_middle_width + (energy_source_line_spacing / 2), blank_text)
+                self.pdf.drawCentredString(column1_text, text_block_middle_width - (energy_source_line_spacing / 2), blank_text)
+
+        # Add Device
+        self.pdf.setFont(body_font, body_font_size)
+
+        device = []
+
+        if 'device' in source:
+            device_lines = split_text(source.get('device', blank_text), line_length, device_line_limit)
+            for line in range(len(device_lines)):
+                device.append(device_lines[line])
+        else:
+            device.append(blank_text)
 
-    for source_num in range(len(sources)):
+        if "tag" in source:
+            device.append('')
+            device.append('Tag: #' + source.get('tag', blank_text_tag))
+            device.append('')
+        else:
+            device.append('')
+            device.append('Tag: #______')
+            device.append('')
+
+        if "source_description" in source:
+            description_lines = split_text(
+                source.get('source_description', blank_text),
+                line_length,
+                description_line_limit,
+            )
+            for line in range(len(description_lines)):
+                device.append(description_lines[line])
+        else:
+            device.append(blank_text)
 
-        source = sources[source_num]
+        if len(device) % 2 == 1:
+            for line in range(len(device)):
+                self.pdf.drawCentredString(column2_text,
+                                           text_block_middle_width + (math.floor(len(device) / 2) * device_line_spacing) - (
+                                                   device_line_spacing * line), device[line])
+        else:
+            for line in range(len(device)):
+                self.pdf.drawCentredString(column2_text, text_block_middle_width + (
+                             ((math.floor(len(device) / 2) - 1) * device_line_spacing) + 5) - (device_line_spacing * line),
+                                           device[line])
+
+        # Isolation Method
+        self.pdf.setFont(body_font, body_font_size)
+
+        if "isolation_method" in source:
+            isolation_method_lines = split_text(source.get("isolation_method", ""), line_length,
+                                                isolation_method_line_limit)
+            isolation_method_num_lines = len(isolation_method_lines)
+            if isolation_method_num_lines % 2 == 1:
+                for line in range(isolation_method_num_lines):
+                    self.pdf.drawCentredString(column4_text, text_block_middle_width + (
+                                 math.floor(isolation_method_num_lines / 2) * isolation_method_line_spacing) - (
+                                                       isolation_method_line_spacing * line), isolation_method_lines[line])
+            else:
+                for line in range(isolation_method_num_lines):
+                    self.pdf.drawCentredString(column4_text, text_block_middle_width + (
+                                 ((math.floor(isolation_method_num_lines / 2) - 1) * isolation_method_line_spacing) + 5) - (
+                                                       isolation_method_line_spacing * line), isolation_method_lines[line])
+        else:
+            self.pdf.drawCentredString(column4_text, text_block_middle_width, blank_text)
+
+        # Verification Method
+        self.pdf.setFont(body_font, body_font_size)
+
+        if "verification_method" in source:
+            verification_method_lines = split_text(source.get("verification_method", ""), line_length,
+                                                   verification_method_line_limit)
+            verification_method_num_lines = len(verification_method_lines)
+            if verification_method_num_lines % 2 == 1:
+                for line in range(verification_method_num_lines):
+                    self.pdf.drawCentredString(column5_text, text_block_middle_width + (
+                                 math.floor(verification_method_num_lines / 2) * verification_method_line_spacing) - (
+                                                       verification_method_line_spacing * line),
+                                               verification_method_lines[line])
+            else:
+                for line in range(verification_method_num_lines):
+                    self.pdf.drawCentredString(column5_text, text_block_middle_width + (((math.floor(
+                             verification_method_num_lines / 2) - 1) * verification_method_line_spacing) + 5) - (
+                                                       verification_method_line_spacing * line),
+                                               verification_method_lines[line], )
+        else:
+            self.pdf.drawCentredString(column5_text, text_block_middle_width, blank_text)
+
+        # Isolation Point File
+        isolation_point_file = self.resolve_image_file(source.get('isolation_point', DEFAULT_IMAGE))
+        ic(f"Isolation_point_file: {isolation_point_file}")
+
+        # Isolation Point
+        isolation_point_height, isolation_point_width = resize_image(isolation_point_file,
+                                                                     isolation_point_max_height, isolation_point_max_width,
+                                                                     self.images.get(isolation_point_file))
+        self.draw_image(isolation_point_file, column3_image - (isolation_point_width / 2),
+                        image_block_middle_width - (isolation_point_height / 2), isolation_point_width,
+                        isolation_point_height)
+
+        # Verification Device File
+        verification_device_file = self.resolve_image_file(source.get('verification_device', DEFAULT_IMAGE))
+        ic(f"Verification_device_file: {verification_device_file}")
+
+        # Verification Device
+        verification_device_height, verification_device_width = resize_image(
+            verification_device_file, verification_device_max_height, verification_device_max_width,
+            self.images.get(verification_device_file))
+        self.draw_image(verification_device_file, column6_image - (verification_device_width / 2),
+                        image_block_middle_width - (verification_device_height / 2), verification_device_width,
+                        verification_device_height)
+
+        ic('Adding Source: ' + source.get('energy_source', '') + ' : ' + source.get('tag', ''))
+        return h_line2
+
+    # Height of a source row, sized to its longest wrapped column
+    def source_height(self, source: dict) -> float:
+        line_length = 14
+        device_line_limit = 10
+        description_line_limit = 10
+        isolation_method_line_limit = 10
+        verification_method_line_limit = 10
 
         device_height = num_lines(source.get('device', ''), line_length, device_line_limit) + 3 + num_lines(
             source.get('source_description', ''), line_length, description_line_limit)
@@ -986,270 +1287,348 @@ def add_sources(import_bottom: float = PAGE_MARGIN) -> float:
         if height < minHeight:
             height = minHeight
 
-        if source_num == 0:
-            if import_bottom - DEFAULT_ROW_SPACING - SOURCE_TITLE_BLOCK_HEIGHT - height <= PAGE_MARGIN:
-                bottom = new_page_title()
-            else:
-                bottom = add_source_titles(import_bottom)
+        return height
+
+    # Add Restart Sequence
+    def add_restart_sequence(self, import_bottom: float = PAGE_MARGIN) -> float:
+        # Sets default parameters for a clean slate
+        self.set_default()
+
+        title_font = 'DM Serif Display'
+        title_font_size = 10
+        title_line_spacing = 14
+        title_font_color = [255, 255, 255]
+
+        row_spacing = 14
+
+        body_font = 'Inter'
+        body_font_size = 8
+        body_line_spacing = 10
+        body_background = str(INCLUDES_DIR / 'Green.png')
+
+        body_lines = self.sequence_layout(RESTART_SEQUENCE)['body_lines']
+        body_num_lines = len(body_lines)
+
+        h_line1 = import_bottom - DEFAULT_ROW_SPACING
+        h_line2 = h_line1 - title_line_spacing
+        h_line3 = h_line2 - body_num_lines * (body_line_spacing + 2)
+
+        v_line1 = PAGE_LEFT_MARGIN
+        v_line2 = PAGE_RIGHT_MARGIN
+
+        # Horizontal Lines
+        self.pdf.line(v_line1, h_line1, v_line2, h_line1)
+        self.pdf.line(v_line1, h_line2, v_line2, h_line2)
+        self.pdf.line(v_line1, h_line3, v_line2, h_line3)
+
+        # Vertical Lines
+        self.pdf.line(v_line1, h_line1, v_line1, h_line3)
+        self.pdf.line(v_line2, h_line1, v_line2, h_line3)
+
+        # Background color
+        self.draw_image(body_background, v_line1, h_line2, USABLE_WIDTH, title_line_spacing)
+
+        # Text
+        column1_text = PAGE_WIDTH_MIDDLE
+
+        row1_text = h_line1 - title_font_size
+        row2_text = h_line2 - body_font_size
+
+        # Title Text
+        self.pdf.setFillColorRGB(title_font_color[0], title_font_color[1], title_font_color[2])
+        self.pdf.setFont(title_font, title_font_size)
+        self.pdf.drawCentredString(column1_text, row1_text, 'RESTART SEQUENCE')
+
+        # Body Text
+        self.pdf.setFillColorRGB(DEFAULT_COLOR[0], DEFAULT_COLOR[1], DEFAULT_COLOR[2])
+        self.pdf.setFont(body_font, body_font_size)
+        for line in range(body_num_lines):
+            self.pdf.drawCentredString(column1_text, row2_text - (line * body_line_spacing), body_lines[line])
+
+        ic('Adding Restart Sequence')
+        return h_line3
+
+    # Signature block text and height (shared by the layout and draw phases)
+    def signatures_layout(self) -> dict:
+        title_font_size = 10
+        body_line_spacing = 12
+        body_line_length = 108
+        body_line_limit = 5
+        company_line_length = 23
+        company_line_limit = 4
+
+        description = ('The signatures below indicate that the lockout procedure covered on this sheet has been prepared '
+                       'by Cardinal Compliance and approved by ') + self.data.get(
+            'approved_by', '') + '.'
+        description_lines = split_text(description, body_line_length, body_line_limit)
+        description_height = (len(description_lines) * body_line_spacing) + 2
+
+        prepared_by_company = 'Cardinal Compliance Consultants, LLC'
+        prepared_by_lines = split_text(prepared_by_company, company_line_length, company_line_limit)
+        approved_by_lines = split_text(self.data.get('approved_by_company', ''), company_line_length, company_line_limit)
+        company_height = (max(len(approved_by_lines), len(prepared_by_lines)) * body_line_spacing) + 2
+
+        return {
+            'title_font_size': title_font_size,
+            'body_line_spacing': body_line_spacing,
+            'description_lines': description_lines,
+            'description_height': description_height,
+            'prepared_by_lines': prepared_by_lines,
+            'approved_by_lines': approved_by_lines,
+            'company_height': company_height,
+            'height': description_height + company_height + (5.5 * DEFAULT_ROW_SPACING) + (title_font_size / 2),
+        }
+
+    # Add Signatures on Bottom
+    def add_signatures(self, import_bottom: float = PAGE_MARGIN) -> float:
+        # Sets default parameters for a clean slate
+        self.set_default()
+
+        layout = self.signatures_layout()
+
+        title_font = 'DM Serif Display'
+        title_font_size = layout['title_font_size']
+        title_font_spacing = 12
+
+        sub_title_font = 'Times'
+        sub_title_font_size = 10
+        sub_title_spacing = 12
+
+        body_font = 'Inter'
+        body_font_size = 10
+        body_line_spacing = layout['body_line_spacing']
+
+        signature_font = 'Signature'
+        signature_font_size_max = 20
+        signature_font_size_min = 10
+        signature_color = [0, 0, 0]
+        signature_opacity = 1.0
+        signature_line_length = 15
+
+        bold_line_weight = 0.75
+
+        description_lines = layout['description_lines']
+        description_num_lines = len(description_lines)
+        description_height = layout['description_height']
+
+        prepared_by_lines = layout['prepared_by_lines']
+        prepared_by_num_lines = len(prepared_by_lines)
+        approved_by_lines = layout['approved_by_lines']
+        approved_by_num_lines = len(approved_by_lines)
+        company_height = layout['company_height']
+
+        column1_text = PAGE_LEFT_MARGIN
+        column3_text = PAGE_LEFT_MARGIN + (USABLE_WIDTH * (2 / 5))
+        column5_text = PAGE_LEFT_MARGIN + (USABLE_WIDTH * (4 / 5))
+
+        row1_text = import_bottom - DEFAULT_ROW_SPACING - (title_font_size / 2)
+        row2_text = row1_text - DEFAULT_ROW_SPACING
+        row3_text = row2_text - description_height - DEFAULT_ROW_SPACING
+        row4_text = row3_text - DEFAULT_ROW_SPACING * 1.25
+        row5_text = row4_text - DEFAULT_ROW_SPACING * 1.25
+
+        v_line1 = column1_text + 58
+        v_line2 = column3_text - 10
+        v_line3 = column3_text + 58
+        v_line4 = column5_text - 10
+
+        h_line1 = row3_text - 1.5
+        h_line2 = row5_text - company_height
+
+        column2_text = v_line1
+        column4_text = v_line3
+
+        # Adding Title
+        self.pdf.setFont(title_font, title_font_size)
+        self.pdf.drawString(column1_text, row1_text, 'Lockout Procedure Approval Data')
+
+        # Adding Description
+        self.pdf.setFont(body_font, body_font_size)
+        for line in range(description_num_lines):
+            self.pdf.drawString(column1_text, row2_text - (line * body_line_spacing), description_lines[line])
+
+        # Adding Prepared By Title
+        self.pdf.setFont(sub_title_font, sub_title_font_size)
+        self.pdf.drawString(column1_text, row3_text, 'Prepared by: ')
+
+        # Adding Approved By Title
+        self.pdf.setFont(sub_title_font, sub_title_font_size)
+        self.pdf.drawString(column3_text, row3_text, 'Approved by: ')
+
+        # Adding Date
+        self.pdf.setFont(sub_title_font, sub_title_font_size)
+        self.pdf.drawString(column5_text, row3_text, 'Date: ')
+
+        self.pdf.setFont(body_font, body_font_size)
+        self.pdf.drawString(column5_text + 30, row3_text, self.data.get('completed_date', ''))
+
+        # Adding Signature Lines
+        self.pdf.setLineWidth(bold_line_weight)
+        self.pdf.line(v_line1, h_line1, v_line2, h_line1)
+        self.pdf.line(v_line3, h_line1, v_line4, h_line1)
+
+        # Adding Printed Names
+        self.pdf.setFont(body_font, body_font_size)
+        if len(self.data.get('prepared_by', '')) > 30:
+            raise Exception('Prepared By name is too long')
         else:
-            if bottom - height <= PAGE_MARGIN:
-                bottom = new_page_title()
-
-        bottom = add_source(source, bottom, height)
-
-    return bottom
-
-
-# Add Restart Sequence
-def add_restart_sequence(import_bottom: float = PAGE_MARGIN) -> float:
-    # Sets default parameters for a clean slate
-    set_default()
-
-    title_font = 'DM Serif Display'
-    title_font_size = 10
-    title_line_spacing = 14
-    title_font_color = [255, 255, 255]
-
-    row_spacing = 14
-
-    body_font = 'Inter'
-    body_font_size = 8
-    body_line_spacing = 10
-    body_line_length = 135
-    body_line_limit = 5
-    body_background = str(INCLUDES_DIR / 'Green.png')
-
-    restart_sequence = ("1. Ensure all tools and items have been removed. 2. Confirm that all employees are safely "
-                        "located. 3. Verify that controls are in neutral. 4. Remove LOTO devices and reenergize "
-                        "machine. 5. Notify affected employees that servicing is complete.")
-
-    body_num_lines = num_lines(restart_sequence, body_line_length, body_line_limit)
-    body_lines = split_text(restart_sequence, body_line_length, body_line_limit)
-
-    total_height = title_line_spacing + body_num_lines * (body_line_spacing + 2)
-
-    # Checking if new page is needed
-    if import_bottom - total_height - DEFAULT_ROW_SPACING <= PAGE_MARGIN:
-        import_bottom = new_page()
-
-    h_line1 = import_bottom - DEFAULT_ROW_SPACING
-    h_line2 = h_line1 - title_line_spacing
-    h_line3 = h_line2 - body_num_lines * (body_line_spacing + 2)
-
-    v_line1 = PAGE_LEFT_MARGIN
-    v_line2 = PAGE_RIGHT_MARGIN
-
-    # Horizontal Lines
-    pdf.line(v_line1, h_line1, v_line2, h_line1)
-    pdf.line(v_line1, h_line2, v_line2, h_line2)
-    pdf.line(v_line1, h_line3, v_line2, h_line3)
-
-    # Vertical Lines
-    pdf.line(v_line1, h_line1, v_line1, h_line3)
-    pdf.line(v_line2, h_line1, v_line2, h_line3)
-
-    # Background color
-    pdf.drawImage(body_background, v_line1, h_line2, USABLE_WIDTH, title_line_spacing)
-
-    # Text
-    column1_text = PAGE_WIDTH_MIDDLE
-
-    row1_text = h_line1 - title_font_size
-    row2_text = h_line2 - body_font_size
-
-    # Title Text
-    pdf.setFillColorRGB(title_font_color[0], title_font_color[1], title_font_color[2])
-    pdf.setFont(title_font, title_font_size)
-    pdf.drawCentredString(column1_text, row1_text, 'RESTART SEQUENCE')
-
-    # Body Text
-    pdf.setFillColorRGB(DEFAULT_COLOR[0], DEFAULT_COLOR[1], DEFAULT_COLOR[2])
-    pdf.setFont(body_font, body_font_size)
-    for line in range(body_num_lines):
-        pdf.drawCentredString(column1_text, row2_text - (line * body_line_spacing), body_lines[line])
-
-    ic('Adding Restart Sequence')
-    return h_line3
-
-
-# Add Signatures on Bottom
-def add_signatures(import_bottom: float = PAGE_MARGIN) -> float:
-    # Sets default parameters for a clean slate
-    set_default()
+            self.pdf.drawString(column2_text, row4_text, self.data.get('prepared_by', ''))
+        if len(self.data.get('approved_by', '')) > 30:
+            raise Exception('Approved By name is too long')
+        else:
+            self.pdf.drawString(column4_text, row4_text, self.data.get('approved_by', ''))
+
+        # Adding Company Information
+        self.pdf.setFont(body_font, body_font_size)
+        for line in range(prepared_by_num_lines):
+            self.pdf.drawString(column2_text, row5_text - (line * body_line_spacing), prepared_by_lines[line])
+        for line in range(approved_by_num_lines):
+            self.pdf.drawString(column4_text, row5_text - (line * body_line_spacing), approved_by_lines[line])
+
+        # Prepared By Signature
+        signature_max_text_width = v_line2 - v_line1
+        signature_font_size = signature_font_size_max
+        while signature_font_size >= signature_font_size_min:
+            text_width = stringWidth(self.data.get('prepared_by', ''), signature_font, signature_font_size)
+            if text_width <= signature_max_text_width:
+                break
+            signature_font_size -= 0.5
+
+        self.pdf.setFont(signature_font, signature_font_size)
+        self.pdf.setFillColorRGB(signature_color[0], signature_color[1], signature_color[2])
+        self.pdf.setFillAlpha(signature_opacity)
+        self.pdf.drawString(column2_text, row3_text, self.data.get('prepared_by', ''))
+
+        # Approved By Signature
+        signature_max_text_width = v_line2 - v_line1
+        signature_font_size = signature_font_size_max
+        while signature_font_size >= signature_font_size_min:
+            text_width = stringWidth(self.data.get('approved_by', ''), signature_font, signature_font_size)
+            if text_width <= signature_max_text_width:
+                break
+            signature_font_size -= 0.5
+
+        self.pdf.setFont(signature_font, signature_font_size)
+        self.pdf.setFillColorRGB(signature_color[0], signature_color[1], signature_color[2])
+        self.pdf.setFillAlpha(signature_opacity)
+        self.pdf.drawString(column4_text, row3_text, self.data.get('approved_by', ''))
+
+        ic('Adding Signatures')
+        return h_line2
+
+    # Adds a planned block to the last page and returns the new bottom
+    def _place_block(self, pages: list, block: str, top: float, height: float, **extra) -> float:
+        pages[-1].append({'block': block, 'top': top, 'bottom': top - height, 'height': height, **extra})
+        return top - height
+
+    # Starts a planned page with its header and returns the bottom of the header
+    def _plan_new_page(self, pages: list) -> float:
+        h_lines = self.header_layout()['h_lines']
+        pages.append([])
+        return self._place_block(pages, 'header', h_lines[0], h_lines[0] - h_lines[4])
+
+    # Layout phase: assigns every block of the report to a page, without drawing anything
+    def plan_layout(self) -> list:
+        pages = []
+        source_titles_height = DEFAULT_ROW_SPACING + SOURCE_TITLE_BLOCK_HEIGHT
+
+        # First page
+        bottom = self._plan_new_page(pages)
+        bottom = self._place_block(pages, 'machine_info', bottom, self.machine_info_layout()['height'])
+
+        height = self.sequence_layout(SHUTDOWN_SEQUENCE)['height']
+        if bottom - height <= PAGE_MARGIN:
+            bottom = self._plan_new_page(pages)
+        bottom = self._place_block(pages, 'shutdown_sequence', bottom, height)
+
+        # Sources (every page they continue on starts with the source titles)
+        sources = self.data.get('sources', []) or [{}]
+        for source_num in range(len(sources)):
+            height = self.source_height(sources[source_num])
+
+            if source_num == 0:
+                if bottom - source_titles_height - height <= PAGE_MARGIN:
+                    bottom = self._plan_new_page(pages)
+                bottom = self._place_block(pages, 'source_titles', bottom, source_titles_height)
+            elif bottom - height <= PAGE_MARGIN:
+                bottom = self._plan_new_page(pages)
+                bottom = self._place_block(pages, 'source_titles', bottom, source_titles_height)
+
+            bottom = self._place_block(pages, 'source', bottom, height, source=source_num)
+
+        height = self.sequence_layout(RESTART_SEQUENCE)['height']
+        if bottom - height <= PAGE_MARGIN:
+            bottom = self._plan_new_page(pages)
+        bottom = self._place_block(pages, 'restart_sequence', bottom, height)
+
+        height = self.signatures_layout()['height']
+        if bottom - height <= PAGE_MARGIN:
+            bottom = self._plan_new_page(pages)
+        self._place_block(pages, 'signatures', bottom, height)
+
+        return pages
+
+    # Draw phase: draws the planned blocks page by page
+    def draw_layout(self, pages: list):
+        sources = self.data.get('sources', []) or [{}]
+        self.block_uses = Counter(block['block'] for page in pages for block in page)
+
+        for page_num in range(len(pages)):
+            if page_num > 0:
+                self.pdf.showPage()
+
+            for block in pages[page_num]:
+                match block['block']:
+                    case 'header':
+                        self.add_header()
+                    case 'machine_info':
+                        self.add_machine_info(block['top'])
+                    case 'shutdown_sequence':
+                        self.add_shutdown_sequence(block['top'])
+                    case 'source_titles':
+                        self.add_source_titles(block['top'])
+                    case 'source':
+                        self.add_source(sources[block['source']], block['top'], block['height'])
+                    case 'restart_sequence':
+                        self.add_restart_sequence(block['top'])
+                    case 'signatures':
+                        self.add_signatures(block['top'])
+
+    # Generate the PDF
+    def generate_pdf(self):
+        self.draw_layout(self.plan_layout())
+
+        ic('Saving PDF')
+        self.pdf.save()
+        ic('PDF Saved: ' + self.file_name + '.pdf')
 
-    title_font = 'DM Serif Display'
-    title_font_size = 10
-    title_font_spacing = 12
 
-    sub_title_font = 'Times'
-    sub_title_font_size = 10
-    sub_title_spacing = 12
+# Generate PDF from JSON data
+def generate_pdf_from_json(json_data: dict, output_path: str) -> bool:
+    ReportRenderer(json_data, Path(output_path).stem).render(output_path)
+    return True
 
-    body_font = 'Inter'
-    body_font_size = 10
-    body_line_spacing = 12
-    body_line_length = 108
-    body_line_limit = 5
 
-    company_line_length = 23
-    company_line_limit = 4
+# Generate PDF from JSON data and return the bytes (photos: provider or dict of photo name -> bytes)
+def render_pdf_bytes(json_data: dict, file_name: str, photos=None) -> bytes:
+    return ReportRenderer(json_data, file_name, photos).render_bytes()
 
-    signature_font = 'Signature'
-    signature_font_size_max = 20
-    signature_font_size_min = 10
-    signature_color = [0, 0, 0]
-    signature_opacity = 1.0
-    signature_line_length = 15
-
-    bold_line_weight = 0.75
-
-    description = ('The signatures below indicate that the lockout procedure covered on this sheet has been prepared '
-                   'by Cardinal Compliance and approved by ') + data.get(
-        'approved_by', '') + '.'
-    description_num_lines = num_lines(description, body_line_length, body_line_limit)
-    description_lines = split_text(description, body_line_length, body_line_limit)
-    description_height = (description_num_lines * body_line_spacing) + 2
-
-    prepared_by_company = 'Cardinal Compliance Consultants, LLC'
-    prepared_by_num_lines = num_lines(prepared_by_company, company_line_length, company_line_limit)
-    prepared_by_lines = split_text(prepared_by_company, company_line_length, company_line_limit)
-    approved_by_num_lines = num_lines(data.get('approved_by_company', ''), company_line_length, company_line_limit)
-    approved_by_lines = split_text(data.get('approved_by_company', ''), company_line_length, company_line_limit)
-    company_height = (max(approved_by_num_lines, prepared_by_num_lines) * body_line_spacing) + 2
-
-    total_height = description_height + company_height + (5.5 * DEFAULT_ROW_SPACING) + (title_font_size / 2)
 
-    # New Page Logic
-    if import_bottom - total_height <= PAGE_MARGIN:
-        import_bottom = new_page()
+# Page count and per-page blocks of a report, without rendering it
+def plan_report_layout(json_data: dict) -> dict:
+    pages = ReportRenderer(json_data).plan_layout()
+    return {
+        'page_count': len(pages),
+        'pages': [{'page': page_num + 1, 'blocks': pages[page_num]} for page_num in range(len(pages))],
+    }
 
-    column1_text = PAGE_LEFT_MARGIN
-    column3_text = PAGE_LEFT_MARGIN + (USABLE_WIDTH * (2 / 5))
-    column5_text = PAGE_LEFT_MARGIN + (USABLE_WIDTH * (4 / 5))
-
-    row1_text = import_bottom - DEFAULT_ROW_SPACING - (title_font_size / 2)
-    row2_text = row1_text - DEFAULT_ROW_SPACING
-    row3_text = row2_text - description_height - DEFAULT_ROW_SPACING
-    row4_text = row3_text - DEFAULT_ROW_SPACING * 1.25
-    row5_text = row4_text - DEFAULT_ROW_SPACING * 1.25
-
-    v_line1 = column1_text + 58
-    v_line2 = column3_text - 10
-    v_line3 = column3_text + 58
-    v_line4 = column5_text - 10
-
-    h_line1 = row3_text - 1.5
-    h_line2 = row5_text - company_height
-
-    column2_text = v_line1
-    column4_text = v_line3
-
-    # Adding Title
-    pdf.setFont(title_font, title_font_size)
-    pdf.drawString(column1_text, row1_text, 'Lockout Procedure Approval Data')
-
-    # Adding Description
-    pdf.setFont(body_font, body_font_size)
-    for line in range(description_num_lines):
-        pdf.drawString(column1_text, row2_text - (line * body_line_spacing), description_lines[line])
-
-    # Adding Prepared By Title
-    pdf.setFont(sub_title_font, sub_title_font_size)
-    pdf.drawString(column1_text, row3_text, 'Prepared by: ')
-
-    # Adding Approved By Title
-    pdf.setFont(sub_title_font, sub_title_font_size)
-    pdf.drawString(column3_text, row3_text, 'Approved by: ')
-
-    # Adding Date
-    pdf.setFont(sub_title_font, sub_title_font_size)
-    pdf.drawString(column5_text, row3_text, 'Date: ')
-
-    pdf.setFont(body_font, body_font_size)
-    pdf.drawString(column5_text + 30, row3_text, data.get('completed_date', ''))
-
-    # Adding Signature Lines
-    pdf.setLineWidth(bold_line_weight)
-    pdf.line(v_line1, h_line1, v_line2, h_line1)
-    pdf.line(v_line3, h_line1, v_line4, h_line1)
-
-    # Adding Printed Names
-    pdf.setFont(body_font, body_font_size)
-    if len(data.get('prepared_by', '')) > 30:
-        raise Exception('Prepared By name is too long')
-    else:
-        pdf.drawString(column2_text, row4_text, data.get('prepared_by', ''))
-    if len(data.get('approved_by', '')) > 30:
-        raise Exception('Approved By name is too long')
-    else:
-        pdf.drawString(column4_text, row4_text, data.get('approved_by', ''))
-
-    # Adding Company Information
-    pdf.setFont(body_font, body_font_size)
-    for line in range(prepared_by_num_lines):
-        pdf.drawString(column2_text, row5_text - (line * body_line_spacing), prepared_by_lines[line])
-    for line in range(approved_by_num_lines):
-        pdf.drawString(column4_text, row5_text - (line * body_line_spacing), approved_by_lines[line])
-
-    # Prepared By Signature
-    signature_max_text_width = v_line2 - v_line1
-    signature_font_size = signature_font_size_max
-    while signature_font_size >= signature_font_size_min:
-        text_width = stringWidth(data.get('prepared_by', ''), signature_font, signature_font_size)
-        if text_width <= signature_max_text_width:
-            break
-        signature_font_size -= 0.5
-
-    pdf.setFont(signature_font, signature_font_size)
-    pdf.setFillColorRGB(signature_color[0], signature_color[1], signature_color[2])
-    pdf.setFillAlpha(signature_opacity)
-    pdf.drawString(column2_text, row3_text, data.get('prepared_by', ''))
-
-    # Approved By Signature
-    signature_max_text_width = v_line2 - v_line1
-    signature_font_size = signature_font_size_max
-    while signature_font_size >= signature_font_size_min:
-        text_width = stringWidth(data.get('approved_by', ''), signature_font, signature_font_size)
-        if text_width <= signature_max_text_width:
-            break
-        signature_font_size -= 0.5
-
-    pdf.setFont(signature_font, signature_font_size)
-    pdf.setFillColorRGB(signature_color[0], signature_color[1], signature_color[2])
-    pdf.setFillAlpha(signature_opacity)
-    pdf.drawString(column4_text, row3_text, data.get('approved_by', ''))
-
-    ic('Adding Signatures')
-    return h_line2
-
-
-# Generate the PDF
-def generate_pdf():
-    bottom = first_page()
-    bottom = add_sources(bottom)
-    bottom = add_restart_sequence(bottom)
-    add_signatures(bottom)
-
-    ic('Saving PDF')
-    pdf.save()
-    ic('PDF Saved: ' + file_name + '.pdf')
 
-
-# Generate PDF from JSON data
-def generate_pdf_from_json(json_data: dict, output_path: str) -> bool:
-    global data, pdf, file_name
-    data = json_data
-    file_name = Path(output_path).stem
-    pdf = canvas.Canvas(output_path, PAGE_SIZE)
-    pdf.setTitle(file_name)
-
-    # Register fonts
-    pdfmetrics.registerFont(TTFont('DM Serif Display', str(INCLUDES_DIR / 'DMSerifDisplay_Regular.ttf')))
-    pdfmetrics.registerFont(TTFont('Inter', str(INCLUDES_DIR / 'Inter_Regular.ttf')))
-    pdfmetrics.registerFont(TTFont('Times', str(INCLUDES_DIR / 'times.ttf')))
-    pdfmetrics.registerFont(TTFont('Signature', str(INCLUDES_DIR / 'Pacifico.ttf')))
-
-    generate_pdf()
+# Load fonts and static assets ahead of the first real render (used by long-lived render workers)
+def warm_up() -> bool:
+    if not check_assets():
+        return False
+    register_fonts()
+    ReportRenderer({}, "warm_up", photos={}).render_bytes()
     return True
 
 
@@ -1259,10 +1638,11 @@ def main():
     if not json_filename:
         sys.exit(1)
 
-    if not initialize_pdf_generator(json_filename):
+    data = initialize_pdf_generator(json_filename)
+    if data is None:
         sys.exit(1)
 
-    generate_pdf_from_json(load_data(json_filename), json_filename.replace('.json', '.pdf'))
+    generate_pdf_from_json(data, json_filename.replace('.json', '.pdf'))
 
 
 if __name__ == "__main__":
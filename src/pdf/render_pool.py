@@ -0,0 +1,158 @@
+# DEPENDENCIES
+# reportlab (through generate_pdf)
+
+# Import Functions
+import os
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+from icecream import ic
+
+from src.pdf.generate_pdf import ReportRenderer, warm_up, font_cache_stats, IMAGE_CACHE
+
+
+# Pool configuration (overridable from the environment / .env)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+RENDER_MAX_JOBS_PER_WORKER = int(os.getenv("RENDER_MAX_JOBS_PER_WORKER", "50"))
+RENDER_TIMEOUT_SECONDS = float(os.getenv("RENDER_TIMEOUT_SECONDS", "120"))
+
+
+# Runs once in every worker process when it starts
+def _init_worker():
+    warm_up()
+    ic(f"Render worker {os.getpid()} ready")
+
+
+# Used to make the executor spawn its processes up front
+def _ping() -> int:
+    return os.getpid()
+
+
+# A single render job (executed inside a worker process); photos maps photo names to their bytes
+def render_job(json_data: dict, file_name: str, photos: dict = None) -> bytes:
+    return ReportRenderer(json_data, file_name, photos).render_bytes()
+
+
+# Render job that also reports the worker's cache counters back to the pool
+def _render_job_with_stats(json_data: dict, file_name: str, photos: dict = None) -> tuple:
+    pdf_bytes = render_job(json_data, file_name, photos)
+    return pdf_bytes, os.getpid(), {"fonts": font_cache_stats(), "images": IMAGE_CACHE.stats()}
+
+
+class RenderPool:
+    """
+    Pool of long-lived, pre-warmed render worker processes.
+
+    Jobs are queued on the executor and at most `workers` renders run at the same time.
+    Each worker is replaced after `max_jobs_per_worker` jobs so memory growth stays bounded.
+    With `workers` set to 0 renders run in the calling process instead.
+    """
+
+    def __init__(self, workers: int = RENDER_WORKERS, max_jobs_per_worker: int = RENDER_MAX_JOBS_PER_WORKER):
+        self.workers = workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._executor = None
+        self._lock = threading.Lock()
+        self._worker_stats = OrderedDict()    # pid -> latest counters, least recently reporting first
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            max_tasks_per_child=self.max_jobs_per_worker or None,
+        )
+
+    # Start the worker processes (fonts and assets are loaded by each worker on start)
+    def start(self):
+        if self.workers <= 0:
+            warm_up()
+            return
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            executor = self._executor
+
+        # Every submit while no worker is idle spawns one more process, up to `workers`
+        pings = [executor.submit(_ping) for _ in range(self.workers)]
+        for ping in pings:
+            ping.result()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._worker_stats.clear()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    # Keep the latest counters reported by a worker and hand the PDF bytes to the caller
+    def _finish(self, job: Future, result: Future):
+        try:
+            pdf_bytes, pid, stats = job.result()
+        except Exception as e:
+            result.set_exception(e)
+            return
+        with self._lock:
+            self._worker_stats[pid] = stats
+            self._worker_stats.move_to_end(pid)
+            # Workers are replaced after max_jobs_per_worker jobs; keep only the most recently
+            # reporting ones so the counters of recycled workers do not pile up
+            while len(self._worker_stats) > max(1, self.workers):
+                self._worker_stats.popitem(last=False)
+        result.set_result(pdf_bytes)
+
+    # Queue a render job and return a future of the PDF bytes
+    def submit(self, json_data: dict, file_name: str, photos: dict = None) -> Future:
+        if self.workers <= 0:
+            job = Future()
+            try:
+                job.set_result(_render_job_with_stats(json_data, file_name, photos))
+            except Exception as e:
+                job.set_exception(e)
+        else:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._create_executor()
+                try:
+                    job = self._executor.submit(_render_job_with_stats, json_data, file_name, photos)
+                except BrokenProcessPool:
+                    # A worker died (e.g. killed by the OOM killer); replace the whole pool
+                    ic("Render pool broken, restarting workers")
+                    broken, self._executor = self._executor, self._create_executor()
+                    broken.shutdown(wait=False, cancel_futures=True)
+                    self._worker_stats.clear()
+                    job = self._executor.submit(_render_job_with_stats, json_data, file_name, photos)
+
+        result = Future()
+        job.add_done_callback(lambda done: self._finish(done, result))
+        return result
+
+    # Render and wait for the PDF bytes
+    def render(self, json_data: dict, file_name: str, photos: dict = None,
+               timeout: float = RENDER_TIMEOUT_SECONDS) -> bytes:
+        return self.submit(json_data, file_name, photos).result(timeout=timeout)
+
+    # Font and image cache counters summed over the current workers
+    def stats(self) -> dict:
+        with self._lock:
+            per_worker = dict(self._worker_stats)
+
+        fonts = {"parsed": 0, "reused": 0, "parse_seconds": 0.0, "parse_seconds_saved": 0.0}
+        images = {"hits": 0, "misses": 0, "bytes": 0}
+        for worker in per_worker.values():
+            for key in fonts:
+                fonts[key] += worker["fonts"][key]
+            for key in images:
+                images[key] += worker["images"][key]
+
+        return {
+            "workers": self.workers,
+            "max_jobs_per_worker": self.max_jobs_per_worker,
+            "fonts": {key: round(value, 4) for key, value in fonts.items()},
+            "images": images,
+            "per_worker": {str(pid): worker for pid, worker in per_worker.items()},
+        }
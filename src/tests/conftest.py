@@ -136,4 +136,15 @@ def test_environment():
         yield 
         
     # Execution returns here after all tests have run
-    # The teardown_docker function is automatically called by ExitStack
\ No newline at end of file
+    # The teardown_docker function is automatically called by ExitStack
+
+@pytest.fixture
+def mongo_db():
+    """
+    In-memory Mongo database (mongomock, a dev dependency, with GridFS) for unit tests of the API modules.
+    """
+    import mongomock
+    import mongomock.gridfs
+
+    mongomock.gridfs.enable_gridfs_integration()
+    return mongomock.MongoClient().db
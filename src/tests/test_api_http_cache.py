@@ -0,0 +1,210 @@
+import io
+import os
+import sys
+import time
+import zipfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from starlette.requests import Request
+
+# === Resolve project paths ===
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.api.http_cache import parse_range, is_not_modified, http_date, StreamBuffer, STREAM_CHUNK_SIZE
+
+
+def make_request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+# === parse_range ===
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=900-5000", (900, 999)),       # end past the file is clipped
+    ("bytes=-5000", (0, 999)),            # suffix longer than the file
+    ("items=0-10", None),                 # other units are ignored
+    ("bytes=0-10,20-30", None),           # several ranges are ignored
+    ("bytes=abc-", None),
+    ("bytes=50-10", None),
+])
+def test_parse_range(header, expected):
+    """
+    Single byte ranges are resolved against the file size; anything else is ignored (full response).
+    """
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header, size", [("bytes=1000-", 1000), ("bytes=-0", 1000), ("bytes=-10", 0)])
+def test_parse_range_rejects_unsatisfiable_ranges(header, size):
+    """
+    Ranges starting past the end (or empty) cannot be satisfied (416).
+    """
+    with pytest.raises(ValueError):
+        parse_range(header, size)
+
+
+# === is_not_modified ===
+def test_is_not_modified_compares_etags_weakly():
+    """
+    If-None-Match matches the ETag (weak validators and "*" included), whatever If-Modified-Since says.
+    """
+    etag = '"abc"'
+    assert is_not_modified(make_request(if_none_match='"abc"'), etag)
+    assert is_not_modified(make_request(if_none_match='"x", W/"abc"'), etag)
+    assert is_not_modified(make_request(if_none_match="*"), etag)
+    assert not is_not_modified(make_request(if_none_match='"x"'), etag)
+    assert not is_not_modified(make_request(if_none_match='"abc"'), None)
+
+    modified = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    request = make_request(if_none_match='"x"', if_modified_since=http_date(modified))
+    assert not is_not_modified(request, etag, modified), "❌ If-Modified-Since was used although If-None-Match was sent"
+
+
+def test_is_not_modified_compares_dates_to_the_second():
+    """
+    Without If-None-Match, the resource is current when it did not change after If-Modified-Since.
+    """
+    modified = datetime(2025, 1, 1, 12, 0, 0, 500000, tzinfo=timezone.utc)
+    since = make_request(if_modified_since=http_date(modified))
+
+    assert is_not_modified(since, '"abc"', modified), "❌ Sub-second precision made an unchanged resource stale"
+    assert is_not_modified(since, None, modified.replace(tzinfo=None))
+    assert not is_not_modified(since, None, modified + timedelta(seconds=1))
+    assert not is_not_modified(make_request(if_modified_since="not a date"), None, modified)
+    assert not is_not_modified(make_request(), '"abc"', modified)
+
+
+@pytest.fixture
+def main_module():
+    # The app only connects to Mongo on first use; SECRET_KEY is required at import
+    os.environ.setdefault("SECRET_KEY", "unit-tests")
+    from src.api import main
+    return main
+
+
+@pytest.fixture
+def photo_client(main_module, mongo_db, monkeypatch):
+    """
+    Test client whose photo routes read from an in-memory GridFS, with authentication bypassed.
+    """
+    import gridfs
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(main_module, "fs", gridfs.GridFS(mongo_db))
+    monkeypatch.setattr(main_module, "photo_aliases", mongo_db["photo_aliases"])
+    main_module.app.dependency_overrides[main_module.get_current_user_no_redirect] = lambda: "tester"
+    yield TestClient(main_module.app, base_url="http://localhost")
+    main_module.app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("route", ["/photo", "/download_photo"])
+def test_photo_routes_check_existence_before_not_modified(photo_client, main_module, route):
+    """
+    A conditional request for a photo that does not exist is a 404, never a 304; existing photos still revalidate.
+    """
+    photo_id = main_module.fs.put(b"jpeg bytes", filename="photo.jpg")
+    missing_id = "0" * 24
+
+    response = photo_client.get(f"{route}/{missing_id}", headers={"If-None-Match": main_module.make_etag(missing_id)})
+    assert response.status_code == 404, "❌ A missing photo was reported as not modified"
+
+    response = photo_client.get(f"{route}/{photo_id}")
+    assert response.status_code == 200 and response.content == b"jpeg bytes"
+    response = photo_client.get(f"{route}/{photo_id}", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+
+
+
+@pytest.mark.parametrize("route", ["/photo", "/download_photo"])
+def test_photo_routes_follow_merged_photo_aliases(photo_client, main_module, mongo_db, route):
+    """
+    Ids of photos merged away by the hash backfill keep serving the surviving photo's bytes.
+    """
+    from bson.objectid import ObjectId
+
+    merged_id, kept_id = ObjectId(), main_module.fs.put(b"jpeg bytes", filename="photo.jpg")
+    mongo_db["photo_aliases"].insert_one({"_id": merged_id, "photo_id": kept_id})
+
+    response = photo_client.get(f"{route}/{merged_id}")
+    assert response.status_code == 200, "❌ A merged photo id was not resolved"
+    assert response.content == b"jpeg bytes"
+
+# === StreamBuffer + iter_bulk_zip ===
+def test_stream_buffer_hands_out_what_was_written_once():
+    """
+    take() returns everything written since the previous take().
+    """
+    buffer = StreamBuffer()
+    buffer.write(b"ab")
+    buffer.write(memoryview(b"cd"))
+    assert buffer.take() == b"abcd"
+    assert buffer.take() == b""
+
+
+def test_bulk_zip_streams_pdfs_and_lists_errors(main_module, monkeypatch):
+    """
+    The ZIP is produced piece by piece, holds one PDF per report and an errors.txt for the reports
+    that could not be fetched; on_result is called once per report.
+    """
+    pdfs = {"report_1": b"%PDF-1" * STREAM_CHUNK_SIZE, "report_2": b"%PDF-2"}
+
+    def fetch_bulk_pdf(report_name):
+        if report_name in pdfs:
+            return report_name, pdfs[report_name], None
+        return report_name, None, f"Report '{report_name}' not found"
+
+    monkeypatch.setattr(main_module, "fetch_bulk_pdf", fetch_bulk_pdf)
+    results = []
+    pieces = list(main_module.iter_bulk_zip(["report_1", "missing", "report_2"],
+                                            on_result=lambda name, error: results.append((name, error))))
+
+    largest = max(len(piece) for piece in pieces)
+    assert largest < len(pdfs["report_1"]), "❌ A whole PDF was buffered before being streamed"
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(pieces))) as archive:
+        assert archive.read("report_1.pdf") == pdfs["report_1"]
+        assert archive.read("report_2.pdf") == pdfs["report_2"]
+        assert archive.read("errors.txt").decode() == "missing: Report 'missing' not found"
+    assert sorted(results) == [("missing", "Report 'missing' not found"), ("report_1", None), ("report_2", None)]
+
+
+def test_export_job_heartbeats_while_a_slow_report_renders(main_module, mongo_db, monkeypatch):
+    """
+    A report taking longer than EXPORT_JOB_STALE_SECONDS must not let another worker take the job over.
+    """
+    import gridfs
+
+    stale_seconds = 0.3
+    monkeypatch.setattr(main_module, "EXPORT_JOB_STALE_SECONDS", stale_seconds)
+    monkeypatch.setattr(main_module, "export_jobs", mongo_db["export_jobs"])
+    monkeypatch.setattr(main_module, "fs", gridfs.GridFS(mongo_db))
+
+    now = datetime.now(timezone.utc)
+    job_id = mongo_db["export_jobs"].insert_one({
+        "status": "queued", "reports": [{"report_name": "slow", "status": "pending", "error": None}],
+        "created_at": now, "updated_at": now, "expires_at": None,
+    }).inserted_id
+    taken_over = []
+
+    def fetch_bulk_pdf(report_name):
+        deadline = time.monotonic() + stale_seconds * 4
+        while time.monotonic() < deadline:
+            time.sleep(stale_seconds / 4)
+            stale_before = datetime.now(timezone.utc) - timedelta(seconds=stale_seconds)
+            job = mongo_db["export_jobs"].find_one({"_id": job_id})
+            taken_over.append(job["updated_at"].replace(tzinfo=timezone.utc) < stale_before)
+        return report_name, b"%PDF", None
+
+    monkeypatch.setattr(main_module, "fetch_bulk_pdf", fetch_bulk_pdf)
+    main_module.run_export_job(job_id)
+
+    assert not any(taken_over), "❌ The job looked stale while its worker was still rendering"
+    assert mongo_db["export_jobs"].find_one({"_id": job_id})["status"] == "done"
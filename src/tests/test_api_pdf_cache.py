@@ -0,0 +1,177 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# === Resolve project paths ===
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.api.pdf_cache import SingleFlight, PdfMemoryCache, report_cache_key
+
+
+# === SingleFlight ===
+def test_single_flight_shares_one_call_between_concurrent_callers():
+    """
+    Callers arriving while a render of the same key is running must wait for it and get its result.
+    """
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def render():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return b"%PDF"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flights.run, "key", render)
+        assert started.wait(5)
+        followers = [executor.submit(flights.run, "key", render) for _ in range(3)]
+        # Followers register before the leader finishes
+        while flights.stats()["renders_avoided"] < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [leader.result(5)] + [future.result(5) for future in followers]
+
+    assert len(calls) == 1, "❌ The same key was rendered more than once"
+    assert results == [b"%PDF"] * 4
+    assert flights.stats() == {"in_flight": 0, "flights": 1, "renders_avoided": 3}
+
+
+def test_single_flight_shares_errors_and_forgets_finished_keys():
+    """
+    A failed call raises in every waiting caller, and the next call for the key runs again.
+    """
+    flights = SingleFlight()
+
+    def fail():
+        raise RuntimeError("render failed")
+
+    with pytest.raises(RuntimeError, match="render failed"):
+        flights.run("key", fail)
+    assert flights.run("key", lambda: b"%PDF") == b"%PDF", "❌ A failed flight was not cleared"
+    assert flights.stats()["flights"] == 2
+
+
+# === PdfMemoryCache ===
+def test_memory_cache_evicts_least_recently_used_by_size():
+    """
+    The cache holds at most max_bytes and drops the entries used least recently first.
+    """
+    cache = PdfMemoryCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"  # "b" is now the least recently used
+    cache.put("c", b"cccc")
+
+    assert cache.get("b") is None, "❌ The least recently used entry was kept"
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert cache.hits == 3 and cache.misses == 1
+
+
+def test_memory_cache_skips_pdfs_larger_than_its_budget():
+    """
+    A PDF that does not fit the whole budget must not push the other entries out.
+    """
+    cache = PdfMemoryCache(max_bytes=10)
+    cache.put("small", b"12345")
+    cache.put("large", b"x" * 11)
+
+    assert cache.get("large") is None
+    assert cache.get("small") == b"12345", "❌ An oversized PDF evicted the cache"
+
+
+class RecordingCollection:
+    """Stands in for cached_pdfs and records the bulk writes it receives."""
+
+    def __init__(self):
+        self.writes = []
+
+    def bulk_write(self, requests, ordered=True):
+        self.writes.append(requests)
+
+
+def test_memory_cache_flushes_access_times_in_bulk():
+    """
+    Hits are written to last_accessed in one bulk update on flush (never moving it backwards), then forgotten.
+    """
+    cached_pdfs = RecordingCollection()
+    cache = PdfMemoryCache(max_bytes=100)
+    cache.put("a", b"aaaa")
+    cache.get("a")
+    cache.touch("b")
+
+    assert cache.flush_access_times(cached_pdfs) == 2
+    assert len(cached_pdfs.writes) == 1, "❌ Access times were not written in one bulk update"
+    updates = cached_pdfs.writes[0]
+    assert sorted(update._filter["cache_key"] for update in updates) == ["a", "b"]
+    assert all("last_accessed" in update._doc["$max"] for update in updates)
+    assert cache.flush_access_times(cached_pdfs) == 0, "❌ Flushed access times were written again"
+
+
+# === Cache key (report_cache_key / report_doc_cache_key) ===
+def test_cache_key_covers_name_content_and_photos():
+    """
+    Reports with the same content under different names, or different photo bytes, get different keys.
+    """
+    key = report_cache_key("report_1", {"a": 1}, {"photo.jpg": "0" * 64})
+    assert key == report_cache_key("report_1", {"a": 1}, {"photo.jpg": "0" * 64})
+    assert key != report_cache_key("report_2", {"a": 1}, {"photo.jpg": "0" * 64}), "❌ The report name is not in the key"
+    assert key != report_cache_key("report_1", {"a": 1}, {"photo.jpg": "1" * 64})
+    assert key != report_cache_key("report_1", {"a": 2}, {"photo.jpg": "0" * 64})
+
+
+class RecordingUploads:
+    """Stands in for the reports collection and records the updates it receives."""
+
+    def __init__(self):
+        self.updates = []
+
+    def update_one(self, query, update, array_filters=None):
+        self.updates.append((query, update, array_filters))
+
+
+def test_report_photo_hashes_fill_in_only_missing_hashes(mongo_db, monkeypatch):
+    """
+    Photos without a hash in the report take it from their file metadata, or are hashed chunk by chunk;
+    only the missing entries are written back, and conditional requests never read photo bytes.
+    """
+    import gridfs
+    from src.api import rendering
+    from src.api.photo_store import gridfs_sha256
+
+    fs = gridfs.GridFS(mongo_db)
+    uploads = RecordingUploads()
+    monkeypatch.setattr(rendering, "fs", fs)
+    monkeypatch.setattr(rendering, "uploads", uploads)
+    hashed = []
+    monkeypatch.setattr(rendering, "gridfs_sha256", lambda grid_out: hashed.append(grid_out._id) or gridfs_sha256(grid_out))
+
+    in_report, in_metadata, unhashed = fs.put(b"one"), fs.put(b"two", metadata={"sha256": "2" * 64}), fs.put(b"three")
+    doc = {"_id": 1, "report_name": "report", "json_data": {}, "photos": [
+        {"photo_name": "1.jpg", "photo_id": in_report, "sha256": "1" * 64},
+        {"photo_name": "2.jpg", "photo_id": in_metadata},
+        {"photo_name": "3.jpg", "photo_id": unhashed},
+    ]}
+
+    assert rendering.report_doc_cache_key(doc, hash_missing=False) is None
+    assert not hashed and not uploads.updates, "❌ The conditional path read or wrote photo hashes"
+
+    hashes = rendering.report_photo_hashes(doc)
+    assert hashed == [unhashed], "❌ Only photos without any stored hash may be read"
+    assert hashes == {"1.jpg": "1" * 64, "2.jpg": "2" * 64, "3.jpg": gridfs_sha256(fs.get(unhashed))}
+
+    (query, update, array_filters), = uploads.updates
+    assert query == {"_id": 1}
+    assert sorted(update["$set"].values()) == sorted([hashes["2.jpg"], hashes["3.jpg"]])
+    assert all(path.startswith("photos.$[") and path.endswith("].sha256") for path in update["$set"]), \
+        "❌ The whole photos array was written back"
+    assert sorted((f[k] for f in array_filters for k in f if k.endswith(".photo_id")), key=str) == \
+        sorted([in_metadata, unhashed], key=str)
+    assert all(f[k] is None for f in array_filters for k in f if k.endswith(".sha256"))
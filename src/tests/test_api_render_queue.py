@@ -0,0 +1,139 @@
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+# === Resolve project paths ===
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.api.render_queue import RenderQueue, RenderJobFailed, PRIORITY_INTERACTIVE, PRIORITY_PRERENDER
+
+
+@pytest.fixture
+def queue(mongo_db):
+    queue = RenderQueue(mongo_db["render_jobs"], max_attempts=2, retry_seconds=0, dead_seconds=60)
+    queue.ensure_indexes()
+    return queue
+
+
+def test_enqueue_joins_the_open_job_for_a_pdf(queue):
+    """
+    Queueing the same PDF again returns the open job, raised to the most urgent priority asked for.
+    """
+    job = queue.enqueue("key", "report", PRIORITY_PRERENDER, snapshot={"json_data": {}})
+    again = queue.enqueue("key", "report", PRIORITY_INTERACTIVE)
+
+    assert again["_id"] == job["_id"], "❌ A second job was queued for the same PDF"
+    assert again["priority"] == PRIORITY_INTERACTIVE
+    assert again["snapshot"] == {"json_data": {}}, "❌ Joining a job replaced its snapshot"
+
+
+def test_claim_takes_the_most_urgent_job_first(queue):
+    """
+    Workers claim jobs by priority, then age, and each job only once while its lease runs.
+    """
+    queue.enqueue("prerender", "report_1", PRIORITY_PRERENDER)
+    queue.enqueue("interactive", "report_2", PRIORITY_INTERACTIVE)
+
+    first, second = queue.claim("worker-1"), queue.claim("worker-2")
+    assert (first["cache_key"], second["cache_key"]) == ("interactive", "prerender")
+    assert first["status"] == "running" and first["attempts"] == 1
+    assert queue.claim("worker-3") is None, "❌ A leased job was claimed twice"
+
+
+def test_failed_jobs_are_retried_then_dead_lettered(queue):
+    """
+    A failure requeues the job until max_attempts is used up; then it is dead-lettered and waiters fail.
+    """
+    job = queue.enqueue("key", "report")
+    queue.fail(queue.claim("worker"), "boom 1")
+    assert queue.collection.find_one({"_id": job["_id"]})["status"] == "queued"
+
+    queue.fail(queue.claim("worker"), "boom 2")
+    dead = queue.collection.find_one({"_id": job["_id"]})
+    assert dead["status"] == "dead"
+    assert dead["errors"] == ["boom 1", "boom 2"]
+    assert dead["expires_at"] > dead["dead_until"], "❌ Dead letters must outlive their fail-fast period"
+    with pytest.raises(RenderJobFailed, match="boom 2"):
+        queue.wait(job["_id"], timeout=1)
+
+
+def test_expired_leases_are_claimed_again_until_attempts_run_out(queue):
+    """
+    A job whose worker stopped heartbeating is claimed again; past max_attempts it is dead-lettered.
+    """
+    job = queue.enqueue("key", "report")
+    for worker in ("worker-1", "worker-2"):
+        assert queue.claim(worker)["worker"] == worker
+        queue.collection.update_one({"_id": job["_id"]}, {"$set": {"lease_until": datetime.now(timezone.utc)}})
+        time.sleep(0.01)
+
+    assert queue.claim("worker-3") is None
+    assert queue.collection.find_one({"_id": job["_id"]})["status"] == "dead"
+
+
+def test_dead_letters_give_their_pdf_up_after_the_fail_fast_period(queue):
+    """
+    While dead, requests for the PDF join the dead letter (fail fast); after dead_seconds a new job is
+    queued and the dead letter can no longer be requeued over it.
+    """
+    job = queue.enqueue("key", "report")
+    queue.fail(queue.claim("worker"), "boom")
+    queue.fail(queue.claim("worker"), "boom")
+    assert queue.enqueue("key", "report")["_id"] == job["_id"]
+
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+    queue.collection.update_one({"_id": job["_id"]}, {"$set": {"dead_until": past}})
+    fresh = queue.enqueue("key", "report")
+
+    assert fresh["_id"] != job["_id"], "❌ The dead letter kept the PDF's slot after its fail-fast period"
+    assert fresh["status"] == "queued"
+    assert not queue.requeue(job["_id"])
+
+
+def test_requeue_gives_a_dead_letter_new_attempts(queue):
+    """
+    Requeueing a dead letter that still holds its PDF queues it again with fresh attempts.
+    """
+    job = queue.enqueue("key", "report")
+    queue.fail(queue.claim("worker"), "boom")
+    queue.fail(queue.claim("worker"), "boom")
+
+    assert queue.requeue(job["_id"])
+    requeued = queue.collection.find_one({"_id": job["_id"]})
+    assert (requeued["status"], requeued["attempts"]) == ("queued", 0)
+    assert "expires_at" not in requeued, "❌ A requeued job would be removed by the TTL monitor"
+
+
+def test_render_jobs_render_their_snapshot(mongo_db, monkeypatch):
+    """
+    A job renders the report as it was queued even if it changed since, so it always completes with
+    its PDF in the cache; jobs without a snapshot fail when the report no longer matches.
+    """
+    import gridfs
+    from src.api import rendering
+    from src.api.pdf_cache import open_cached_pdf
+
+    fs = gridfs.GridFS(mongo_db)
+    monkeypatch.setattr(rendering, "uploads", mongo_db["reports"])
+    monkeypatch.setattr(rendering, "cached_pdfs", mongo_db["cached_pdfs"])
+    monkeypatch.setattr(rendering, "fs", fs)
+    rendered = []
+    monkeypatch.setattr(rendering.render_pool, "render",
+                        lambda json_data, report_name, photos: rendered.append(json_data) or b"%PDF-" + report_name.encode())
+
+    mongo_db["reports"].insert_one({"report_name": "report", "json_data": {"version": 1}, "photos": []})
+    doc = mongo_db["reports"].find_one()
+    cache_key = rendering.report_doc_cache_key(doc)
+    job = {"cache_key": cache_key, "report_name": "report", "snapshot": rendering.report_snapshot(doc)}
+    mongo_db["reports"].update_one({"_id": doc["_id"]}, {"$set": {"json_data": {"version": 2}}})
+
+    rendering.process_render_job(job)
+    assert rendered == [{"version": 1}], "❌ The job rendered the changed report"
+    assert open_cached_pdf(mongo_db["cached_pdfs"], fs, cache_key) is not None
+
+    with pytest.raises(ValueError):
+        rendering.process_render_job({"cache_key": "other", "report_name": "report"})
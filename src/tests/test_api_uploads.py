@@ -0,0 +1,201 @@
+import asyncio
+import io
+import os
+import sys
+import hashlib
+from pathlib import Path
+
+import pytest
+
+# === Resolve project paths ===
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.api.upload_sessions import chunk_ranges, SessionFileReader, UploadSessions, MAX_UPLOAD_CHUNK_SIZE
+from src.api.photo_store import (
+    ensure_photo_indexes, store_photo_stream, publish_photos, discard_pending_photos, find_photos,
+    backfill_photo_hashes, resolve_photo_alias, open_photo
+)
+
+
+@pytest.fixture
+def fs(mongo_db):
+    import gridfs
+
+    ensure_photo_indexes(mongo_db["fs.files"])
+    return gridfs.GridFS(mongo_db)
+
+
+# === chunk_ranges ===
+@pytest.mark.parametrize("received, size, expected", [
+    ([], 25, []),
+    ([0, 1, 2], 25, [[0, 25]]),
+    ([2, 0], 25, [[0, 10], [20, 25]]),     # any order, gaps split the ranges
+    ([1, 3, 2], 35, [[10, 35]]),
+])
+def test_chunk_ranges_merges_adjacent_chunks(received, size, expected):
+    """
+    Received chunk numbers become the byte ranges they cover (the last chunk is short).
+    """
+    assert chunk_ranges(received, 10, size) == expected
+
+
+# === SessionFileReader ===
+def test_session_file_reader_reads_across_chunks():
+    """
+    Reads of any size return the file's bytes in order, whatever the chunk boundaries.
+    """
+    reader = SessionFileReader(iter([{"data": b"abc"}, {"data": b"defg"}, {"data": b"h"}]))
+    assert reader.read(2) == b"ab"
+    assert reader.read(4) == b"cdef"
+    assert reader.read() == b"gh"
+    assert reader.read(10) == b""
+
+
+# === UploadSessions ===
+def test_upload_sessions_validate_chunks(mongo_db):
+    """
+    Chunks must belong to a listed file and have exactly the expected size; progress lists what is missing.
+    """
+    store = UploadSessions(mongo_db["upload_sessions"], mongo_db["upload_session_chunks"], chunk_size=4)
+    session = store.create("user", [{"name": "r.json", "size": 2}, {"name": "p.jpg", "size": 10}], {})
+
+    store.put_chunk(session, 1, 2, b"ij")
+    with pytest.raises(ValueError):
+        store.put_chunk(session, 1, 0, b"abc")      # chunks before the last are chunk_size bytes
+    with pytest.raises(ValueError):
+        store.put_chunk(session, 1, 3, b"")          # the file has chunks 0 to 2
+    with pytest.raises(ValueError):
+        store.put_chunk(session, 2, 0, b"ab")        # no file 2
+
+    photo = store.progress(session)[1]
+    assert photo["missing_chunks"] == [0, 1]
+    assert photo["received_ranges"] == [[8, 10]]
+
+
+def test_upload_chunk_size_is_capped():
+    """
+    Chunks are single Mongo documents (16 MB BSON limit), so larger chunk sizes are refused.
+    """
+    with pytest.raises(ValueError):
+        UploadSessions(None, None, chunk_size=MAX_UPLOAD_CHUNK_SIZE + 1)
+    with pytest.raises(ValueError):
+        UploadSessions(None, None, chunk_size=0)
+
+
+# === store_photo_stream ===
+def test_store_photo_stream_deduplicates_on_content(fs, mongo_db):
+    """
+    The first copy of a photo is stored with its hash; the same bytes under another name reuse it.
+    """
+    data = b"\xff\xd8photo" * 100_000
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    photo_id, stored_hash, reused = store_photo_stream(fs, mongo_db["fs.files"], io.BytesIO(data), "a.jpg")
+    assert (stored_hash, reused) == (sha256, False)
+    assert fs.get(photo_id).read() == data
+
+    again_id, _, reused = store_photo_stream(fs, mongo_db["fs.files"], io.BytesIO(data), "b.jpg")
+    assert reused and again_id == photo_id, "❌ Identical content was stored twice"
+    assert mongo_db["fs.files"].count_documents({}) == 1, "❌ The duplicate copy was not deleted"
+    assert find_photos(mongo_db["fs.files"], [sha256, "0" * 64]) == {sha256: photo_id}
+
+
+
+def test_pending_photos_stay_private_until_published(fs, mongo_db):
+    """
+    Photos of an upload that is not saved yet cannot be reused by other uploads, so a failed upload can
+    delete them; once published they are reusable and no longer discarded.
+    """
+    files = mongo_db["fs.files"]
+    data = b"\xff\xd8pending"
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    first_id, _, reused = store_photo_stream(fs, files, io.BytesIO(data), "a.jpg", pending=True)
+    second_id, _, reused_again = store_photo_stream(fs, files, io.BytesIO(data), "b.jpg", pending=True)
+    assert not reused and not reused_again and first_id != second_id, "❌ A pending photo was reused"
+    assert find_photos(files, [sha256]) == {}
+
+    photos = publish_photos(fs, files, [{"photo_name": "a.jpg", "photo_id": first_id, "sha256": sha256}])
+    assert photos[0]["photo_id"] == first_id and find_photos(files, [sha256]) == {sha256: first_id}
+
+    # The second upload publishes the same content: it takes the published photo and drops its own copy
+    photos = publish_photos(fs, files, [{"photo_name": "b.jpg", "photo_id": second_id, "sha256": sha256}])
+    assert photos[0]["photo_id"] == first_id
+    assert not fs.exists(second_id)
+
+    assert discard_pending_photos(fs, files, [first_id]) == 0, "❌ A published photo was discarded"
+    assert fs.exists(first_id)
+
+    third_id, _, _ = store_photo_stream(fs, files, io.BytesIO(b"other"), "c.jpg", pending=True)
+    assert discard_pending_photos(fs, files, [third_id]) == 1
+    assert not fs.exists(third_id)
+
+
+class FailingStream:
+    """A client stream that breaks after its first chunk."""
+
+    def __init__(self):
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        if self.reads > 1:
+            raise OSError("connection reset")
+        return b"partial"
+
+
+@pytest.fixture
+def main_module(fs, mongo_db, monkeypatch):
+    # The app only connects to Mongo on first use; SECRET_KEY is required at import
+    os.environ.setdefault("SECRET_KEY", "unit-tests")
+    from src.api import main
+
+    monkeypatch.setattr(main, "fs", fs)
+    monkeypatch.setattr(main, "db", mongo_db)
+    return main
+
+
+def test_failed_photo_upload_waits_for_and_discards_the_other_photos(main_module, fs):
+    """
+    When one photo of an upload fails, the other photos finish, the new pending ones are deleted
+    and the error is raised; photos already stored by earlier uploads are kept.
+    """
+    published_id, _, _ = store_photo_stream(fs, main_module.db["fs.files"], io.BytesIO(b"published"), "old.jpg")
+    streams = [("a.jpg", io.BytesIO(b"a" * 1000)), ("broken.jpg", FailingStream()),
+               ("b.jpg", io.BytesIO(b"b" * 1000)), ("old.jpg", io.BytesIO(b"published"))]
+
+    with pytest.raises(OSError, match="connection reset"):
+        asyncio.run(main_module.store_uploaded_photos(streams, pending=True))
+
+    assert all(stream.read() == b"" for _, stream in streams if isinstance(stream, io.BytesIO)), \
+        "❌ The other photos were not stored to the end"
+    files = main_module.db["fs.files"]
+    assert files.distinct("_id") == [published_id], "❌ Photos of the failed upload were left behind"
+    assert main_module.db["fs.chunks"].distinct("files_id") == [published_id]
+
+def test_backfill_merges_duplicates_and_keeps_their_ids_resolvable(fs, mongo_db):
+    """
+    Photos stored before hashing are hashed; duplicates are merged into one file and their old ids
+    resolve to it, since /photo/{id} URLs are cached as immutable.
+    """
+    uploads = mongo_db["reports"]
+    first, second, other = fs.put(b"same"), fs.put(b"same"), fs.put(b"other")
+    uploads.insert_many([
+        {"report_name": "r1", "photos": [{"photo_name": "a.jpg", "photo_id": first}]},
+        {"report_name": "r2", "photos": [{"photo_name": "b.jpg", "photo_id": second},
+                                         {"photo_name": "c.jpg", "photo_id": other}]},
+    ])
+
+    result = backfill_photo_hashes(fs, mongo_db["fs.files"], uploads, mongo_db["photo_aliases"])
+    assert result == {"hashed": 2, "merged": 1, "errors": 0}
+
+    kept, merged = (first, second) if fs.exists(first) else (second, first)
+    assert not fs.exists(merged)
+    assert resolve_photo_alias(mongo_db["photo_aliases"], merged) == kept, "❌ The merged photo id no longer resolves"
+    assert resolve_photo_alias(mongo_db["photo_aliases"], other) is None
+    assert open_photo(fs, mongo_db["photo_aliases"], merged).read() == b"same", "❌ The merged photo id cannot be downloaded"
+    assert set(uploads.distinct("photos.photo_id")) == {kept, other}
+
+    assert backfill_photo_hashes(fs, mongo_db["fs.files"], uploads, mongo_db["photo_aliases"]) == \
+        {"hashed": 0, "merged": 0, "errors": 0}
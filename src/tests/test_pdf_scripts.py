@@ -358,6 +358,7 @@ def test_transfer_first_run_copy_json_and_images():
     clear_dir(TEMP_DIR)
     clear_dir(directory=TEST_DIR / "generated_pdfs")
     clear_dir(directory=TEST_DIR / "automated_pdfs")
+    clear_dir(directory=TEST_DIR / "inprocess_pdfs")
 
 
 # Count expectations
@@ -468,3 +469,250 @@ def test_automated_pdfs_match_reference():
     actual_dir = TEST_DIR / "automated_pdfs"
     reference_dir = REFERENCE_DIR
     _assert_pdf_batch_matches(actual_dir, reference_dir, verbose=True)
+
+
+@pytest.mark.order(7)
+def test_inprocess_renderer_matches_reference():
+    """
+    Render each JSON in TEMP_DIR with the importable renderer (no subprocess) and compare against the references.
+    """
+    from src.pdf.generate_pdf import load_data, render_pdf_bytes
+
+    print("")
+    output_dir = TEST_DIR / "inprocess_pdfs"
+    clear_dir(output_dir)
+
+    for json_file in sorted(TEMP_DIR.glob("*.json")):
+        pdf_bytes = render_pdf_bytes(load_data(str(json_file)), json_file.stem)
+        assert pdf_bytes.startswith(b"%PDF"), f"❌ In-process render did not return a PDF for {json_file.name}"
+        (output_dir / f"{json_file.stem}.pdf").write_bytes(pdf_bytes)
+
+    _assert_pdf_batch_matches(output_dir, REFERENCE_DIR, verbose=True)
+
+
+@pytest.mark.order(8)
+def test_font_files_parsed_once_per_process():
+    """
+    Registering the report fonts again must reuse the parsed TTFonts instead of reading the files again.
+    """
+    from src.pdf.generate_pdf import REPORT_FONTS, register_fonts, font_cache_stats
+
+    register_fonts()
+    before = font_cache_stats()
+    register_fonts()
+    after = font_cache_stats()
+
+    assert after["fonts_cached"] == len(REPORT_FONTS)
+    assert after["parsed"] == before["parsed"], "❌ Font files were parsed again on a second registration"
+    assert after["reused"] == before["reused"] + len(REPORT_FONTS)
+
+
+@pytest.mark.order(8)
+def test_font_cache_counts_concurrent_lookups():
+    """
+    Render threads looking fonts up at the same time must get the cached font and lose no counts.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from src.pdf.generate_pdf import REPORT_FONTS, get_font, font_cache_stats
+
+    names = list(REPORT_FONTS) * 500
+    expected = {name: get_font(name) for name in REPORT_FONTS}
+    before = font_cache_stats()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        fonts = list(executor.map(get_font, names))
+    after = font_cache_stats()
+
+    assert all(font is expected[name] for name, font in zip(names, fonts))
+    assert after["parsed"] == before["parsed"]
+    assert after["reused"] == before["reused"] + len(names), "❌ Concurrent font lookups lost counts"
+
+
+@pytest.mark.order(9)
+def test_image_cache_reuses_images_across_renders():
+    """
+    A second render of the same report must not decode or encode any image again.
+    """
+    from src.pdf.generate_pdf import IMAGE_CACHE, load_data, render_pdf_bytes
+
+    json_file = sorted(TEMP_DIR.glob("*.json"))[0]
+    data = load_data(str(json_file))
+
+    first = render_pdf_bytes(data, json_file.stem)
+    misses = IMAGE_CACHE.stats()["misses"]
+    second = render_pdf_bytes(data, json_file.stem)
+
+    assert IMAGE_CACHE.stats()["misses"] == misses, "❌ Images were loaded again on a second render"
+    assert len(first) == len(second)
+
+
+@pytest.mark.order(9)
+def test_draw_image_reuses_cached_image_objects(monkeypatch):
+    """
+    Once the images are cached, drawImage must find them registered and never build an image object itself.
+    """
+    from reportlab.pdfbase import pdfdoc
+    from src.pdf.generate_pdf import load_data, render_pdf_bytes
+
+    json_file = sorted(TEMP_DIR.glob("*.json"))[0]
+    data = load_data(str(json_file))
+    render_pdf_bytes(data, json_file.stem)
+
+    built = []
+
+    class CountingImageXObject(pdfdoc.PDFImageXObject):
+        def __init__(self, *args, **kwargs):
+            built.append(args)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(pdfdoc, "PDFImageXObject", CountingImageXObject)
+    pdf_bytes = render_pdf_bytes(data, json_file.stem)
+
+    assert not built, f"❌ drawImage built {len(built)} image objects instead of using the cached ones"
+    assert b"/Subtype /Image" in pdf_bytes
+
+
+@pytest.mark.order(9)
+def test_register_cached_image_matches_draw_image():
+    """
+    The cached image registration relies on reportlab internals: on the pinned reportlab version it
+    must succeed and give drawImage exactly the image it would have encoded from the file itself.
+    """
+    from io import BytesIO
+    import reportlab
+    from reportlab.pdfgen import canvas
+    from src.pdf.generate_pdf import IMAGE_CACHE, register_cached_image
+
+    major, minor = (int(part) for part in reportlab.Version.split(".")[:2])
+    assert (4, 4) <= (major, minor) < (4, 5), f"❌ reportlab {reportlab.Version} is outside the pinned range"
+
+    def draw(register: bool) -> bytes:
+        buffer = BytesIO()
+        pdf = canvas.Canvas(buffer, invariant=1)
+        for filename in (str(INCLUDES_DIR / "CardinalLogo.png"), str(TEMP_DIR / "test_1.jpg")):
+            if register:
+                assert register_cached_image(pdf, filename, lambda: IMAGE_CACHE.xobject(filename)), \
+                    "❌ The reportlab internals used to register cached images are missing"
+            pdf.drawImage(filename, 10, 10, 100, 100)
+        pdf.save()
+        return buffer.getvalue()
+
+    assert draw(register=True) == draw(register=False), "❌ drawImage did not use the registered image as its own"
+
+
+@pytest.mark.order(9)
+def test_draw_image_falls_back_without_reportlab_internals(monkeypatch):
+    """
+    When the reportlab internals are gone, images (in-memory photos included) are drawn with plain drawImage.
+    """
+    from src.pdf import generate_pdf
+
+    built = []
+    assert not generate_pdf.register_cached_image(object(), "photo.jpg", lambda: built.append(1)), \
+        "❌ A canvas without the reportlab internals was reported as registered"
+    assert not built
+
+    json_file = sorted(TEMP_DIR.glob("*.json"))[0]
+    data = generate_pdf.load_data(str(json_file))
+    photos = {path.name: path.read_bytes() for path in TEMP_DIR.iterdir() if path.suffix.lower() != ".json"}
+    monkeypatch.setattr(generate_pdf, "register_cached_image", lambda pdf, filename, get_xobject: False)
+
+    pdf_bytes = generate_pdf.render_pdf_bytes(data, json_file.stem, photos)
+    assert pdf_bytes.count(b"/Subtype /Image") >= len(photos), "❌ Photos were not drawn without the reportlab internals"
+
+
+@pytest.mark.order(9)
+def test_repeated_blocks_share_one_form(monkeypatch):
+    """
+    On a long report the header must be one form placed on every page, and the PDF must be smaller
+    than with the header drawn on each page. A single-page report must not carry any form.
+    """
+    import re
+    from io import BytesIO
+    from PyPDF2 import PdfReader
+    import src.pdf.generate_pdf as generate_pdf
+
+    data = generate_pdf.load_data(str(TEMP_DIR / "test_data.json"))
+    data["sources"] = data["sources"] * 20
+
+    with_forms = generate_pdf.render_pdf_bytes(data, "long_report")
+    pages = PdfReader(BytesIO(with_forms)).pages
+    assert len(pages) >= 20
+    assert len(re.findall(rb"/Subtype /Form", with_forms)) == 2, "❌ Expected one header and one source-title form"
+    assert all("/FormXob.header" in page["/Resources"]["/XObject"] for page in pages), \
+        "❌ A page does not use the shared header form"
+
+    monkeypatch.setattr(generate_pdf, "FORM_MIN_USES", float("inf"))
+    without_forms = generate_pdf.render_pdf_bytes(data, "long_report")
+    assert len(with_forms) < len(without_forms), "❌ Shared forms did not make the long report smaller"
+
+    single_page = generate_pdf.render_pdf_bytes(generate_pdf.load_data(str(TEMP_DIR / "test_data_2.json")), "test_data_2")
+    assert b"/Subtype /Form" not in single_page, "❌ A block drawn once was stored as a form"
+
+
+@pytest.mark.order(10)
+def test_wrap_text_matches_word_wrapping_rules():
+    """
+    Wrapping keeps the original line breaking, and the layout of a text is computed only once.
+    """
+    from src.pdf.generate_pdf import split_text, num_lines, wrap_text
+
+    text = "Lock the main disconnect and verify zero energy at the motor terminals before work"
+    assert split_text(text, 20, 10) == ["Lock the main", "disconnect and", "verify zero energy", "at the motor",
+                                        "terminals before", "work"]
+    assert num_lines(text, 20, 3) == 3
+    # A first word longer than the line leaves an empty line in front of it
+    assert split_text("Electrical-disconnect", 10, 5) == ["", "Electrical-disconnect"]
+
+    assert wrap_text(text, 20, 10) is wrap_text(text, 20, 10), "❌ The wrapped lines were not memoized"
+
+
+@pytest.mark.order(10)
+def test_wrap_text_measures_width_with_the_font():
+    """
+    With a font and size, lines are filled up to a width in points measured with stringWidth.
+    """
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from src.pdf.generate_pdf import wrap_text
+
+    text = "iiii iiii iiii iiii WWWW WWWW WWWW WWWW"
+    lines = wrap_text(text, 60, 10, "Helvetica", 10)
+
+    assert all(stringWidth(line, "Helvetica", 10) <= 60 for line in lines), "❌ A line is wider than the width"
+    assert lines[0] == "iiii iiii iiii iiii", "❌ Narrow letters were wrapped as if they were wide"
+    assert len(lines) > len(wrap_text(text, 20, 10)), "❌ Wide letters were wrapped as if they were narrow"
+    assert " ".join(lines) == text
+
+
+@pytest.mark.order(11)
+def test_layout_plan_matches_rendered_pages():
+    """
+    The dry-run page plan must predict the same page count as a full render.
+    """
+    from io import BytesIO
+    from PyPDF2 import PdfReader
+    from src.pdf.generate_pdf import load_data, render_pdf_bytes, plan_report_layout
+
+    for json_file in sorted(TEMP_DIR.glob("*.json")):
+        data = load_data(str(json_file))
+        plan = plan_report_layout(data)
+        rendered_pages = len(PdfReader(BytesIO(render_pdf_bytes(data, json_file.stem))).pages)
+
+        assert plan["page_count"] == rendered_pages, f"❌ Layout plan page count differs for {json_file.name}"
+        assert all(page["blocks"][0]["block"] == "header" for page in plan["pages"])
+
+
+@pytest.mark.order(12)
+def test_render_from_in_memory_photos():
+    """
+    Rendering with photos passed in memory must match rendering with the photos read from disk.
+    """
+    from src.pdf.generate_pdf import DirectoryPhotoProvider, load_data, render_pdf_bytes
+
+    json_file = sorted(TEMP_DIR.glob("*.json"))[0]
+    data = load_data(str(json_file))
+    photos = {path.name: path.read_bytes() for path in TEMP_DIR.iterdir() if path.suffix != ".json"}
+
+    from_disk = render_pdf_bytes(data, json_file.stem, DirectoryPhotoProvider(TEMP_DIR))
+    from_memory = render_pdf_bytes(data, json_file.stem, photos)
+
+    assert len(from_memory) == len(from_disk), "❌ In-memory photos rendered a different PDF"
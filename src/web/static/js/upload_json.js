@@ -24,45 +24,29 @@ uploadButton.addEventListener("click", async () => {
     
     reportName = await getUniqueReportName(reportName);
 
-    // Create FormData
-    const formData = new FormData();
-
-    // Append JSON as a file
-    const jsonBlob = new Blob([JSON.stringify(jsonValue)], { type: "application/json" });
-    formData.append("files", jsonBlob, `${reportName}.json`);
-
-    // Append all selected images
-    const inputs = document.querySelectorAll('input.image-picker[type="file"]');
-    inputs.forEach(input => {
-        for (const file of input.files) {
-            formData.append("files", file, file.name);
-        }
+    // Collect all selected images
+    const files = [];
+    document.querySelectorAll('input.image-picker[type="file"]').forEach(input => {
+        files.push(...input.files);
     });
 
-    // Add metadata
-    formData.append("uploaded_by", "Web App");
-    ["web"].forEach(tag => formData.append("tags", tag));
-    formData.append("notes", "This was uploaded from the web");
+    // Metadata
+    const uploadedBy = "Web App";
+    const tags = ["web"];
+    const notes = "This was uploaded from the web";
 
     try {
-        const response = await fetch("/upload/", {
-            method: "POST",
-            body: formData
-        });
-
-        const data = await response.json();
-
-        if (response.ok) {
-            // Clear temp files on server after successful upload
-            await fetch("/clear/", { method: "POST" });
-
-            window.location.href = "/pdf_list";  // <-- redirects user
+        // Browsers without Web Crypto (plain http) send everything in one request
+        if (window.crypto?.subtle) {
+            await deltaUpload(reportName, jsonValue, files, tags, notes);
         } else {
-            alert(`Upload failed: ${data.error || JSON.stringify(data)}`);
+            await fullUpload(reportName, jsonValue, files, uploadedBy, tags, notes);
         }
+
+        window.location.href = "/pdf_list";  // <-- redirects user
     } catch (err) {
         console.error(err);
-        alert("Upload failed: see console for details.");
+        alert(`Upload failed: ${err.message || "see console for details."}`);
     }
 
 });
@@ -86,3 +70,79 @@ async function getUniqueReportName(baseName) {
 
     return name;
 }
+
+
+// -----------------------------
+// Delta upload: send the JSON and photo hashes first, then only the photos the server does not have
+// -----------------------------
+async function deltaUpload(reportName, jsonValue, files, tags, notes) {
+    const photos = await Promise.all(files.map(async file => ({
+        photo_name: file.name,
+        sha256: await sha256Hex(file)
+    })));
+    const manifest = { report_name: reportName, json_data: jsonValue, photos, tags, notes };
+
+    let data = await postManifest(manifest);
+    if (!data.committed) {
+        // Upload the missing photos, then commit the report with a second manifest
+        const missing = new Set(data.missing.map(p => p.sha256));
+        const formData = new FormData();
+        photos.forEach((photo, i) => {
+            if (missing.has(photo.sha256)) formData.append("files", files[i], files[i].name);
+        });
+
+        const response = await fetch("/upload_photos", { method: "POST", body: formData });
+        if (!response.ok) throw new Error(`Photo upload failed (${response.status})`);
+
+        data = await postManifest(manifest);
+        if (!data.committed) throw new Error(`Server is still missing ${data.missing.length} photo(s)`);
+    }
+    console.log(`Uploaded ${reportName} (${data.status})`);
+    return data;
+}
+
+async function postManifest(manifest) {
+    const response = await fetch("/upload_manifest", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(manifest)
+    });
+    const data = await response.json();
+    if (!response.ok) throw new Error(data.error || JSON.stringify(data));
+    return data;
+}
+
+// Hex SHA-256 of a file's bytes
+async function sha256Hex(file) {
+    const digest = await crypto.subtle.digest("SHA-256", await file.arrayBuffer());
+    return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, "0")).join("");
+}
+
+
+// -----------------------------
+// Full upload: JSON and every photo in one multipart request
+// -----------------------------
+async function fullUpload(reportName, jsonValue, files, uploadedBy, tags, notes) {
+    const formData = new FormData();
+
+    // Append JSON as a file
+    const jsonBlob = new Blob([JSON.stringify(jsonValue)], { type: "application/json" });
+    formData.append("files", jsonBlob, `${reportName}.json`);
+
+    // Append all selected images
+    files.forEach(file => formData.append("files", file, file.name));
+
+    // Add metadata
+    formData.append("uploaded_by", uploadedBy);
+    tags.forEach(tag => formData.append("tags", tag));
+    formData.append("notes", notes);
+
+    const response = await fetch("/upload/", {
+        method: "POST",
+        body: formData
+    });
+
+    const data = await response.json();
+    if (!response.ok) throw new Error(data.error || JSON.stringify(data));
+    return data;
+}